@@ -0,0 +1,642 @@
+"""
+Benchmark sintetis untuk pipeline olah data dashboard.
+
+Contoh:
+    python benchmark.py summary --rows 200000 --months 3
+
+Setiap section mencetak waktu eksekusi dan tambahan peak RSS selama pipeline berjalan
+(di luar memori data input yang sudah dibuat sebelumnya).
+"""
+import argparse
+import gc
+import logging
+import os
+import resource
+import time
+
+import numpy as np
+import pandas as pd
+
+from schema import (
+    TICKET_NO, CREATED, RESOLVED, BC, SEVERITY, SERVICE, CHANNEL, LOCATION, CATEGORY, ITEM, TITLE
+)
+
+BC_VALUES = ['1 - Critical', '2 - High', '3 - Medium', '4 - Low']
+SEV_VALUES = ['1 - High', '2 - Medium', '3 - Low']
+CHANNEL_VALUES = ['ESS', 'Self-Service', 'Email', 'Phone', 'Walk In', 'WhatsApp', 'Portal']
+LOCATION_VALUES = ['P. Lembar', 'Tanjung Perak', 'TANJUNGEMAS', 'Jakarta', 'Medan', 'Makassar']
+CATEGORY_VALUES = ['Hardware', 'Software', 'Network', 'Access']
+ITEM_VALUES = ['Video Conference', 'General Request for IT', 'Reset Password', 'Instalasi Software']
+# batas cache untuk section workbooks, satu-satunya yang memakai cache workbook (di folder sementara)
+BENCH_WORKBOOK_CACHE_MB = 2048
+
+def make_tickets(kind, n, month, rng, start_no=0, year=2024):
+    """
+    Membuat satu workbook sintetis (DataFrame) Incident ('inc') atau Request ('req')
+    untuk satu bulan, lengkap dengan kolom teks bebas seperti export aslinya.
+    """
+    base = pd.Timestamp(year=year, month=month, day=1)
+    created = base + pd.to_timedelta(rng.integers(0, 28 * 86400, n), unit='s')
+    resolved = pd.Series(created + pd.to_timedelta(rng.integers(600, 5 * 86400, n), unit='s'))
+    resolved = resolved.where(rng.random(n) > 0.1)
+    prefix = 'INC' if kind == 'inc' else 'RITM'
+
+    df = pd.DataFrame({
+        TICKET_NO: [f"{prefix}{start_no + i:08d}" for i in range(n)],
+        CREATED: created,
+        RESOLVED: resolved,
+        BC: rng.choice(BC_VALUES, n),
+        SEVERITY: rng.choice(SEV_VALUES, n),
+        SERVICE: rng.choice([f"Service {i}" for i in range(60)], n),
+        CHANNEL: rng.choice(CHANNEL_VALUES, n),
+        LOCATION: rng.choice(LOCATION_VALUES, n),
+        'Status': rng.choice(['Closed', 'Resolved', 'In Progress', 'Pending'], n),
+        'Assignment group': rng.choice([f"Group {i}" for i in range(25)], n),
+    })
+    if kind == 'inc':
+        df[CATEGORY] = rng.choice(CATEGORY_VALUES, n)
+    else:
+        df[ITEM] = rng.choice(ITEM_VALUES, n)
+    df[TITLE] = rng.choice([f"Permasalahan {i}" for i in range(500)], n)
+    df['Deskripsi Permasalahan'] = [f"deskripsi tiket {i} " * 6 for i in range(n)]
+    df['Comments and Work notes'] = [f"catatan pengerjaan {i} " * 10 for i in range(n)]
+    return df
+
+def make_monthly_uploads(kind, rows, months, carry_over=0.1, seed=42):
+    """Daftar workbook per bulan; sebagian nomor tiket muncul lagi di bulan berikutnya (carry-over)."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    start_no = 0
+    for m in range(months):
+        frames.append(make_tickets(kind, rows, m % 12 + 1, rng, start_no=start_no))
+        start_no += int(rows * (1 - carry_over))
+    return frames
+
+def _rss_status(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def _reset_peak_rss():
+    """Mereset high-water mark RSS (Linux). Mengembalikan False bila tidak didukung."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def measure(func, *args, **kwargs):
+    """
+    Menjalankan func dan mengukur waktu serta tambahan peak RSS (MB) terhadap RSS sebelum dijalankan.
+    Mengembalikan (hasil, stats).
+    """
+    gc.collect()
+    exact = _reset_peak_rss()
+    before = _rss_status("VmRSS:")
+    if before is None:
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    t0 = time.perf_counter()
+    result = func(*args, **kwargs)
+    seconds = time.perf_counter() - t0
+
+    peak = _rss_status("VmHWM:")
+    if peak is None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result, {
+        'seconds': seconds,
+        'rss_before_mb': before,
+        'peak_rss_mb': peak,
+        'peak_delta_mb': peak - before,
+        'exact_peak': exact,
+    }
+
+def print_stats(title, stats, extra=None):
+    note = "" if stats.get('exact_peak') else " (peak sejak proses mulai)"
+    print(f"{title}")
+    print(f"  waktu          : {stats['seconds']:.2f} s")
+    print(f"  RSS awal       : {stats['rss_before_mb']:.0f} MB")
+    print(f"  peak RSS       : {stats['peak_rss_mb']:.0f} MB{note}")
+    print(f"  tambahan peak  : {stats['peak_delta_mb']:.0f} MB")
+    for label, value in (extra or {}).items():
+        print(f"  {label:<15}: {value}")
+
+def summary_pipeline(inc_frames, req_frames, regional_only=False, sla_calendar=None):
+    """Bagian olah data dari summary.run() tanpa UI: SLA per file, filter + carry-over, index waktu, slice."""
+    import summary
+    from sla_policy import load_policy
+    from ticket_index import build_time_index
+
+    policy = load_policy()
+    inc = [summary.process_sla_dataframe(df, "Incident", policy, sla_calendar) for df in inc_frames]
+    req = [summary.process_sla_dataframe(df, "Request", policy, sla_calendar) for df in req_frames]
+
+    df_inc_all, _, inc_merged = summary.combine_processed(inc)
+    df_req_all, _, req_merged = summary.combine_processed(
+        req, regional_only=regional_only, regional_locations=summary.REGIONAL_3_LOCATIONS
+    )
+    del inc, req
+
+    inc_index = build_time_index(df_inc_all, CREATED)
+    req_index = build_time_index(df_req_all, CREATED)
+    del df_inc_all, df_req_all
+
+    slice_cols = [TICKET_NO, CREATED, RESOLVED, SERVICE, 'Target SLA (jam)', 'Time Breach', 'SLA']
+    df_slice = pd.concat([inc_index['df'][slice_cols], req_index['df'][slice_cols]], ignore_index=True)
+    service_max = df_slice.groupby(SERVICE)['Time Breach'].max()
+
+    return {
+        'incident': len(inc_index['df']),
+        'request': len(req_index['df']),
+        'merged': inc_merged + req_merged,
+        'breach': int((df_slice['SLA'] == 0).sum()),
+        'services': len(service_max),
+    }
+
+def bench_summary(args):
+    inc_frames = make_monthly_uploads('inc', args.rows, args.months, seed=args.seed)
+    req_frames = make_monthly_uploads('req', args.rows, args.months, seed=args.seed + 1)
+    input_mb = sum(df.memory_usage(deep=True).sum() for df in inc_frames + req_frames) / 2**20
+
+    result, stats = measure(summary_pipeline, inc_frames, req_frames, args.regional)
+    print_stats(
+        f"[summary] {args.months} bulan x {args.rows:,} baris x 2 tipe",
+        stats,
+        {'data input': f"{input_mb:.0f} MB", **{k: f"{v:,}" for k, v in result.items()}}
+    )
+
+def _to_excel_in_memory(df):
+    import io
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+        df.to_excel(writer, index=False)
+    return output.getvalue()
+
+def bench_export(args):
+    import summary
+    from sla_policy import load_policy
+    from report_export import build_report_workbook, build_csv
+
+    frames = make_monthly_uploads('inc', args.rows, args.months, seed=args.seed)
+    df, _, _ = summary.combine_processed(
+        [summary.process_sla_dataframe(f, "Incident", load_policy()) for f in frames]
+    )
+    del frames
+    title = f"[export] {len(df):,} baris x {df.shape[1]} kolom"
+
+    data, stats = measure(build_report_workbook, [], [('Detail Incident', df)])
+    print_stats(f"{title} — build_report_workbook (constant_memory)", stats, {'ukuran file': f"{len(data) / 2**20:.1f} MB"})
+    del data
+    data, stats = measure(_to_excel_in_memory, df)
+    print_stats(f"{title} — DataFrame.to_excel (pembanding)", stats, {'ukuran file': f"{len(data) / 2**20:.1f} MB"})
+    del data
+
+    csv_kwargs = dict(index=False, sep=';', decimal=',')
+    for name, func in [
+        ("to_csv().encode (pembanding)", lambda: df.to_csv(**csv_kwargs).encode('utf-8')),
+        ("build_csv", lambda: build_csv(df, **csv_kwargs)),
+        ("build_csv gzip", lambda: build_csv(df, compress=True, **csv_kwargs)),
+    ]:
+        data, stats = measure(func)
+        print_stats(f"{title} — {name}", stats, {'ukuran file': f"{len(data) / 2**20:.1f} MB"})
+        del data
+
+def bench_dates(args):
+    from schema import parse_dates, EXCEL_EPOCH
+
+    rng = np.random.default_rng(args.seed)
+    n = args.rows * args.months
+    truth = pd.Series(pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365 * 86400, n), unit='s'), name=CREATED)
+    layouts = {
+        'serial Excel (float)': (truth - EXCEL_EPOCH) / pd.Timedelta(days=1),
+        "string 'dd/mm/yyyy HH:MM:SS'": truth.dt.strftime('%d/%m/%Y %H:%M:%S'),
+        'objek datetime (object)': pd.Series(truth.dt.to_pydatetime(), dtype=object, name=CREATED),
+    }
+    header = [TICKET_NO, CREATED, RESOLVED]
+    print(f"[dates] {n:,} baris per layout")
+    for name, values in layouts.items():
+        values = values.rename(CREATED)
+        for label, func in [
+            ("pd.to_datetime(errors='coerce')", lambda: pd.to_datetime(values, errors='coerce')),
+            ("parse_dates", lambda: parse_dates(values, header)),
+        ]:
+            start = time.perf_counter()
+            parsed = func()
+            seconds = time.perf_counter() - start
+            wrong = int((parsed.to_numpy(dtype='datetime64[ns]') != truth.to_numpy(dtype='datetime64[ns]')).sum())
+            print(f"  {name:<30} {label:<32} {seconds:7.2f} s  salah/NaT: {wrong:,}")
+
+def bench_feed(args):
+    import tempfile
+    from live_feed import new_feed_store, poll_feed
+    from sla_policy import load_policy
+
+    policy = load_policy()
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        store = new_feed_store(directory)
+        path = os.path.join(directory, "events.jsonl")
+        print(f"[feed] {args.months} batch x {args.rows:,} event (JSONL), lalu satu batch update")
+        for month in range(1, args.months + 1):
+            df = make_tickets('inc', args.rows, month, rng, start_no=(month - 1) * args.rows)
+            df.to_json(path, orient='records', lines=True, date_format='iso', mode='a')
+            start = time.perf_counter()
+            rows = poll_feed(store, policy)
+            seconds = time.perf_counter() - start
+            print(f"  batch {month:<3} {rows:>9,} event  {seconds:6.2f} s  {seconds / rows * 1e6:6.1f} µs/event  tiket di store: {len(store['tickets']):,}")
+
+        # update: tiket open dari batch pertama ditutup
+        first = make_tickets('inc', args.rows, 1, np.random.default_rng(args.seed), start_no=0)
+        closed = first[first[RESOLVED].isna()].assign(**{RESOLVED: first[CREATED] + pd.Timedelta(hours=2)})
+        closed.to_json(path, orient='records', lines=True, date_format='iso', mode='a')
+        start = time.perf_counter()
+        rows = poll_feed(store, policy)
+        seconds = time.perf_counter() - start
+        print(f"  update    {rows:>9,} event  {seconds:6.2f} s  {seconds / max(rows, 1) * 1e6:6.1f} µs/event  upsert: {store['updates']:,}")
+
+def bench_history(args):
+    import tempfile
+    import summary
+    import ticket_store
+    from sla_policy import load_policy
+
+    policy = load_policy()
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tickets.sqlite")
+        start = time.perf_counter()
+        for m in range(args.months):
+            year, month = 2022 + m // 12, m % 12 + 1
+            for kind, type_name, category in [('inc', "Incident", CATEGORY), ('req', "Request", ITEM)]:
+                df = make_tickets(kind, args.rows, month, rng, start_no=m * args.rows, year=year)
+                processed = summary.process_sla_dataframe(df, type_name, policy)
+                ticket_store.upsert_tickets(ticket_store.history_rows(processed, type_name, category_col=category), "benchmark", path)
+        load_seconds = time.perf_counter() - start
+        months = ticket_store.history_months(path)
+        print(
+            f"[history] {args.months} bulan x {args.rows:,} baris x 2 tipe — olah + upsert {load_seconds:.1f} s, "
+            f"file {os.path.getsize(path) / 2**20:.0f} MB"
+        )
+        for name, func in [
+            ("monthly_volume", lambda: ticket_store.monthly_volume(months[0], months[-1], path)),
+            ("monthly_sla", lambda: ticket_store.monthly_sla(months[0], months[-1], path)),
+            ("max_breach_per_service", lambda: ticket_store.max_breach_per_service(months[0], months[-1], path=path)),
+            ("occurrence_counts (All)", lambda: ticket_store.occurrence_counts(months[0], months[-1], path=path)),
+            ("occurrence_counts (1 bulan)", lambda: ticket_store.occurrence_counts(months[-1], months[-1], path=path)),
+        ]:
+            start = time.perf_counter()
+            func()
+            print(f"  {name:<30} {(time.perf_counter() - start) * 1000:8.0f} ms")
+
+TITLE_VERBS = ['Permintaan', 'Penghapusan', 'Perubahan', 'Reset', 'Instalasi', 'Pendampingan', 'Penyediaan', 'Gangguan']
+TITLE_OBJECTS = ['Akun', 'Akses', 'Data', 'Server', 'Software', 'Printer', 'Jaringan', 'VPN', 'E-Mail', 'Database',
+                 'Laptop', 'Aplikasi', 'Hak Akses', 'Password', 'Video Conference', 'Storage']
+TITLE_SCOPES = ['Perusahaan', 'Teknis IT', 'Regional', 'Terminal', 'Cabang', 'Pusat', 'Vendor', 'Pegawai',
+                'Keuangan', 'SDM', 'Operasional', 'Komersial', 'Kepanduan', 'Pelabuhan', 'PKWT', 'Pemagang']
+
+def _perturb_title(title, rng):
+    """Variasi judul seperti di export: huruf besar/kecil, tanda baca, '&'/'dan', atau satu salah ketik."""
+    kind = rng.integers(0, 4)
+    if kind == 0:
+        return title.upper() if rng.random() < 0.5 else title.lower() + "."
+    if kind == 1:
+        return title.replace(' & ', ' dan ') if ' & ' in title else f"{title} -"
+    i = int(rng.integers(1, len(title) - 1))
+    if kind == 2:
+        return title[:i] + title[i + 1:]
+    return title[:i] + title[i + 1] + title[i] + title[i + 2:]
+
+def bench_titles(args):
+    import difflib
+    from title_match import build_title_index, match_titles, normalize_title
+
+    rng = np.random.default_rng(args.seed)
+    combos = [(v, o, s) for v in TITLE_VERBS for o in TITLE_OBJECTS for s in TITLE_SCOPES]
+    map_titles = [f"{v} {o} & {s}" if i % 3 == 0 else f"{v} {o} {s}" for i, (v, o, s) in enumerate(combos)]
+    map_ids = list(range(len(map_titles)))
+
+    # 5.000 judul unik: 50% persis, 40% variasi, 10% judul yang memang tidak ada di Map_Item
+    pool, truth = [], []
+    for _ in range(5000):
+        r, pos = rng.random(), int(rng.integers(0, len(map_titles)))
+        if r < 0.5:
+            pool.append(map_titles[pos]); truth.append(pos)
+        elif r < 0.9:
+            pool.append(_perturb_title(map_titles[pos], rng)); truth.append(pos)
+        else:
+            pool.append(f"Keluhan {rng.choice(TITLE_OBJECTS)} Lain {int(rng.integers(0, 10**6))}"); truth.append(None)
+    pick = rng.integers(0, len(pool), args.rows)
+    titles = pd.Series(np.array(pool, dtype=object)[pick])
+    expected = pd.Series(np.array(truth, dtype=object)[pick])
+    findable = expected.notna()
+    print(f"[titles] {args.rows:,} baris, {titles.nunique():,} judul unik, Map_Item {len(map_titles):,} judul")
+
+    start = time.perf_counter()
+    exact_ids = titles.map(dict(zip(map_titles, map_ids)))
+    exact_seconds = time.perf_counter() - start
+    print(f"  {'merge persis (lama)':<28} {exact_seconds:7.2f} s  cocok {exact_ids.notna().mean():6.1%}  benar {(exact_ids[findable] == expected[findable]).mean():6.1%}")
+
+    start = time.perf_counter()
+    index = build_title_index(map_titles, map_ids)
+    build_seconds = time.perf_counter() - start
+    for label in ["match_titles", "match_titles (memo hangat)"]:
+        start = time.perf_counter()
+        result = match_titles(titles, index)
+        seconds = time.perf_counter() - start
+        correct = (result['ID'][findable] == expected[findable]).mean()
+        wrong = int((result['ID'].notna() & (result['ID'] != expected)).sum())
+        print(
+            f"  {label:<28} {seconds:7.2f} s  cocok {result['ID'].notna().mean():6.1%}  benar {correct:6.1%}  "
+            f"salah petik {wrong:,}  ({titles.nunique() / seconds:,.0f} judul unik/s, index {build_seconds * 1000:.0f} ms)"
+        )
+
+    # pembanding O(N x M): difflib ke seluruh Map_Item, diukur pada sampel judul unik
+    sample = titles.drop_duplicates().head(200).tolist()
+    normalized_map = [normalize_title(t) for t in map_titles]
+    start = time.perf_counter()
+    for title in sample:
+        norm = normalize_title(title)
+        max(normalized_map, key=lambda t: difflib.SequenceMatcher(None, norm, t).ratio())
+    seconds = time.perf_counter() - start
+    print(f"  {'difflib semua pasangan':<28} {seconds:7.2f} s  untuk {len(sample)} judul unik ({len(sample) / seconds:,.0f} judul unik/s)")
+
+def _reqitem_like_flow(df):
+    """Langkah frame kerja halaman Request Item: copy, kolom turunan, dua merge, filter, proyeksi."""
+    work = df.copy()
+    work['Businesscriticality-Severity'] = work[BC] + work[SEVERITY]
+    items = pd.DataFrame({ITEM: ITEM_VALUES, 'ID_Item': range(len(ITEM_VALUES))})
+    sla = pd.DataFrame({'ID_Item': range(len(ITEM_VALUES)), 'SLA_Hours': [8, 16, 24, 48]})
+    work = work.merge(items, on=ITEM, how='left').merge(sla, on='ID_Item', how='left')
+    work = work[work['Status'] != 'Pending']
+    return work[[c for c in work.columns if c != 'Assignment group']]
+
+def bench_freetext(args):
+    from text_columns import split_free_text, attach_free_text, compact_strings, FREE_TEXT_COLUMNS
+
+    rng = np.random.default_rng(args.seed)
+    df = make_tickets('req', args.rows, 1, rng)
+    text_cols = [c for c in FREE_TEXT_COLUMNS if c in df.columns]
+    as_object = df[text_cols].astype(object)
+    object_mb = as_object.memory_usage(deep=True, index=False).sum() / 2**20
+    arrow_mb = sum(compact_strings(as_object[c]).memory_usage(deep=True, index=False) for c in text_cols) / 2**20
+    print(f"[freetext] {args.rows:,} tiket, kolom teks bebas: {', '.join(text_cols)}")
+    print(f"  memori teks    : object {object_mb:,.0f} MB -> Arrow {arrow_mb:,.0f} MB")
+
+    # frame input bertipe object seperti hasil read_excel di pandas 2.x
+    df[text_cols] = as_object
+    del as_object
+    result, stats = measure(_reqitem_like_flow, df)
+    resident = df.memory_usage(deep=True).sum() / 2**20
+    print_stats("teks ikut frame kerja", stats, {'frame input': f"{resident:,.0f} MB"})
+    del result
+
+    (work, text), stats = measure(split_free_text, df)
+    resident = (work.memory_usage(deep=True).sum() + text.memory_usage(deep=True).sum()) / 2**20
+    print_stats("split_free_text (sekali saat baca)", stats, {'kerja + teks': f"{resident:,.0f} MB"})
+    del df
+
+    def split_flow():
+        result = _reqitem_like_flow(work)
+        return attach_free_text(result.head(25), text)
+
+    page, stats = measure(split_flow)
+    print_stats("teks dipisah, pasang ulang per halaman", stats, {'halaman': f"{len(page)} baris, {len(page.columns)} kolom"})
+
+def _row_policy_hours(raw, created, label, service):
+    """Evaluasi aturan per baris (pembanding): cari versi yang berlaku, override service, lalu jam dasar."""
+    from sla_policy import normalize_label
+    for version in raw['versions']:
+        start, end = version['effective_from'], version['effective_to']
+        if (start is None or created >= pd.Timestamp(start)) and (end is None or created < pd.Timestamp(end)):
+            for key, hours in version['service_overrides'].get(service, {}).items():
+                if normalize_label(key) == label:
+                    return hours
+            for key, hours in version['hours'].items():
+                if normalize_label(key) == label:
+                    return hours
+            return np.nan
+    return np.nan
+
+def bench_policy(args):
+    from sla_policy import compile_policy, apply_policy, normalize_label
+
+    rng = np.random.default_rng(args.seed)
+    labels = [f"{bc} - {sev}" for bc in BC_VALUES for sev in SEV_VALUES]
+    base = dict(zip(labels, [4, 6, 8, 6, 8, 12, 8, 12, 16, 16, 24, 48]))
+    # kontrak berubah setiap 6 bulan sejak 2023; 10 service punya target khusus
+    bounds = [None, "2023-07-01", "2024-01-01", "2024-07-01", "2025-01-01", None]
+    versions = []
+    for i in range(len(bounds) - 1):
+        factor = 1 - 0.1 * i
+        versions.append({
+            'name': f"Kontrak {i + 1}",
+            'effective_from': bounds[i],
+            'effective_to': bounds[i + 1],
+            'hours': {k: round(v * factor, 2) for k, v in base.items()},
+            'service_overrides': {
+                f"Service {s}": {k: round(v * factor / 2, 2) for k, v in base.items() if rng.random() < 0.5}
+                for s in range(10)
+            },
+        })
+    raw = {'name': "benchmark", 'versions': versions}
+
+    frames = [make_tickets('inc', args.rows, m % 12 + 1, rng, start_no=m * args.rows, year=2023 + m // 12) for m in range(args.months)]
+    df = pd.concat(frames, ignore_index=True)
+    df['Businesscriticality-Severity'] = (df[BC] + " - " + df[SEVERITY]).map(normalize_label)
+    print(f"[policy] {len(df):,} tiket, {len(versions)} versi kebijakan, override untuk 10 service")
+
+    start = time.perf_counter()
+    policy = compile_policy(raw)
+    compile_seconds = time.perf_counter() - start
+    result, stats = measure(apply_policy, policy, df[CREATED], df['Businesscriticality-Severity'], df[SERVICE])
+    print_stats("apply_policy (interval join)", stats, {
+        'compile': f"{compile_seconds * 1000:.1f} ms",
+        'per versi': ", ".join(f"{n}: {(result['version'] == i).sum():,}" for i, n in enumerate(policy['versions'])),
+    })
+
+    sample = df.sample(min(len(df), 20_000), random_state=args.seed)
+    start = time.perf_counter()
+    expected = np.array([
+        _row_policy_hours(raw, c, label, s)
+        for c, label, s in zip(sample[CREATED], sample['Businesscriticality-Severity'], sample[SERVICE])
+    ], dtype=np.float64)
+    seconds = time.perf_counter() - start
+    got = result['hours'][sample.index.to_numpy()]
+    mismatch = int((~np.isclose(got, expected, equal_nan=True)).sum())
+    print(
+        f"  evaluasi per baris : {seconds:.2f} s untuk {len(sample):,} tiket "
+        f"(~{seconds / len(sample) * len(df):.1f} s untuk semua), beda hasil {mismatch:,}"
+    )
+
+def _warm_worker(_):
+    import summary  # noqa: F401 — impor berat (streamlit, plotly) dibayar sebelum pengukuran
+    return os.getpid()
+
+def bench_parallel(args):
+    import io
+    import pickle
+    import threading
+    import summary
+    from partition_pool import process_pool, pack_frame, unpack_frame, spool_directory
+    from result_cache import cache_clear
+    from sla_policy import load_policy
+
+    policy = load_policy()
+    start = time.perf_counter()
+    uploads = {}
+    for kind in ('inc', 'req'):
+        uploads[kind] = []
+        for m, df in enumerate(make_monthly_uploads(kind, args.rows, args.months, seed=args.seed)):
+            buf = io.BytesIO()
+            df.to_excel(buf, index=False, engine='xlsxwriter')
+            buf.name = f"{kind}_{m + 1}.xlsx"
+            uploads[kind].append(buf)
+    print(
+        f"[parallel] {args.months} bulan x 2 tipe x {args.rows:,} baris = {2 * args.months} partisi, "
+        f"cpu_count {os.cpu_count()} (workbook dibuat dalam {time.perf_counter() - start:.1f} s)"
+    )
+
+    baseline, reference = None, None
+    for workers in [int(w) for w in args.workers.split(",")]:
+        if workers > 1:
+            start = time.perf_counter()
+            list(process_pool(workers).map(_warm_worker, range(workers)))
+            warm = f", start pool {time.perf_counter() - start:.1f} s (tidak dihitung)"
+        else:
+            warm = " (serial di proses utama)"
+        cache_clear()
+        job = {'cancel': threading.Event(), 'progress': {'files': 0, 'rows': 0}}
+        result, stats = measure(summary.load_and_process_uploads, job, uploads['inc'], uploads['req'], policy, workers=workers)
+        frames = result[0] + result[1]
+        if reference is None:
+            baseline, reference = stats['seconds'], frames
+        same = all(a.equals(b) for a, b in zip(frames, reference))
+        print(
+            f"  {workers:>2} worker  {stats['seconds']:7.2f} s  speedup {baseline / stats['seconds']:5.2f}x  "
+            f"tambahan peak {stats['peak_delta_mb']:5.0f} MB  hasil sama: {same}{warm}"
+        )
+
+    # biaya kirim balik satu partisi: pickle frame vs Arrow IPC (stream) vs file Arrow di spool yang di-mmap
+    frame = reference[0]
+    with spool_directory() as spool:
+        for label, dump, load in [
+            ("pickle", lambda f: pickle.dumps(f, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads),
+            ("Arrow IPC", lambda f: pickle.dumps(pack_frame(f), protocol=pickle.HIGHEST_PROTOCOL), lambda b: unpack_frame(pickle.loads(b))),
+            ("mmap spool", lambda f: pickle.dumps(pack_frame(f, spool), protocol=pickle.HIGHEST_PROTOCOL), lambda b: unpack_frame(pickle.loads(b))),
+        ]:
+            start = time.perf_counter()
+            payload = dump(frame)
+            middle = time.perf_counter()
+            spooled = sum(e.stat().st_size for e in os.scandir(spool))
+            restored, stats = measure(load, payload)
+            assert restored.equals(frame)
+            print(
+                f"  kirim {label:<10} {len(payload) / 2**20:7.1f} MB (+ file {spooled / 2**20:5.1f} MB)  "
+                f"kemas {(middle - start) * 1000:6.1f} ms  buka {stats['seconds'] * 1000:6.1f} ms  "
+                f"salinan saat buka {stats['peak_delta_mb']:5.1f} MB  ({len(frame):,} baris)"
+            )
+            del restored
+
+def bench_workbooks(args):
+    import io
+    import tempfile
+    from workbook_cache import read_workbook
+
+    rng = np.random.default_rng(args.seed)
+    df = make_tickets('req', args.rows, 1, rng)
+    buf = io.BytesIO()
+    df.to_excel(buf, index=False, engine='xlsxwriter')
+    del df
+    print(f"[workbooks] {args.rows:,} baris, xlsx {len(buf.getvalue()) / 2**20:.1f} MB")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        parsed, stats = measure(pd.read_excel, io.BytesIO(buf.getvalue()))
+        print_stats("pd.read_excel (openpyxl)", stats)
+        for label in ["read_workbook, cache kosong (parse + tulis)", "read_workbook, cache terisi (mmap)"]:
+            cached, stats = measure(read_workbook, buf, cache_dir=cache_dir, max_mb=BENCH_WORKBOOK_CACHE_MB)
+            files = [e.stat().st_size for e in os.scandir(cache_dir)]
+            print_stats(label, stats, {'file cache': f"{sum(files) / 2**20:.1f} MB", 'hasil sama': cached.equals(parsed)})
+            del cached
+
+def bench_sketch(args):
+    from breach_sketch import sketch_by_group, merge_grouped, sketch_quantile, BREACH_QUANTILES
+
+    rng = np.random.default_rng(args.seed)
+    services = np.array([f"Service {i}" for i in range(40)])
+    print(f"[sketch] {args.months} bulan x {args.rows:,} tiket, {len(services)} service; sketch per bulan lalu digabung")
+
+    months, build_seconds = [], 0.0
+    for _ in range(args.months):
+        group = services[rng.integers(0, len(services), args.rows)]
+        # sebagian besar tiket tepat waktu (negatif), ekor breach panjang (lognormal) + outlier
+        hours = rng.lognormal(2, 1.2, args.rows) * np.where(rng.random(args.rows) < 0.4, 1, -1)
+        hours[rng.random(args.rows) < 0.001] *= 50
+        start = time.perf_counter()
+        grouped = sketch_by_group(group, hours)
+        build_seconds += time.perf_counter() - start
+        months.append((group, hours, grouped))
+
+    merged, stats = measure(merge_grouped, *[g for _, _, g in months])
+    group = np.concatenate([g for g, _, _ in months])
+    hours = np.concatenate([h for _, h, _ in months])
+    start = time.perf_counter()
+    exact = {
+        s: np.quantile(hours[(group == s) & (hours > 0)], BREACH_QUANTILES, method='lower')
+        for s in services
+    }
+    exact_seconds = time.perf_counter() - start
+
+    errors = [
+        abs(sketch_quantile(merged[s], q) - e) / e
+        for s in services for q, e in zip(BREACH_QUANTILES, exact[s])
+    ]
+    buckets = sum(len(sketch['buckets']) for sketch in merged.values())
+    breached = int((hours > 0).sum())
+    print_stats("merge_grouped", stats, {
+        'bangun sketch': f"{build_seconds:.2f} s ({build_seconds / args.months * 1000:.0f} ms per bulan)",
+        'np.quantile': f"{exact_seconds:.2f} s (butuh semua nilai)",
+        'galat relatif': f"maks {max(errors):.2%}, rata-rata {np.mean(errors):.2%}",
+        'disimpan': f"{buckets:,} bucket untuk {breached:,} tiket breach",
+    })
+
+SECTIONS = {
+    'summary': bench_summary,
+    'export': bench_export,
+    'dates': bench_dates,
+    'feed': bench_feed,
+    'history': bench_history,
+    'titles': bench_titles,
+    'freetext': bench_freetext,
+    'policy': bench_policy,
+    'parallel': bench_parallel,
+    'workbooks': bench_workbooks,
+    'sketch': bench_sketch,
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark sintetis pipeline dashboard.")
+    parser.add_argument("section", choices=sorted(SECTIONS))
+    parser.add_argument("--rows", type=int, default=100_000, help="jumlah baris per file per bulan")
+    parser.add_argument("--months", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--regional", action="store_true", help="aktifkan filter Regional 3 pada Request")
+    parser.add_argument("--workers", default="1,2,4", help="jumlah worker yang dibandingkan (section parallel), mis. 1,4,8,16")
+    args = parser.parse_args(argv)
+
+    # pemanggilan st.* di luar `streamlit run` hanya menghasilkan warning context
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    # cache workbook persisten dimatikan agar setiap pengukuran mem-parse xlsx sungguhan (bukan cache hit
+    # dari pengukuran sebelumnya); environment ikut diwarisi worker process pool (spawn)
+    import workbook_cache
+    os.environ["SLA_WORKBOOK_CACHE_MAX_MB"] = "0"
+    workbook_cache.DEFAULT_WORKBOOK_CACHE_MAX_MB = 0
+    SECTIONS[args.section](args)
+
+if __name__ == "__main__":
+    main()
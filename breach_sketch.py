@@ -0,0 +1,140 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from collections import Counter
+
+from chart_data import chart_figure
+
+# akurasi relatif kuantil: nilai yang dilaporkan berada dalam ±1% dari nilai sebenarnya
+BREACH_SKETCH_ACCURACY = 0.01
+# breach di bawah satu menit masuk bucket terendah, sehingga jumlah bucket tetap terbatas
+MIN_BREACH_HOURS = 1 / 60
+BREACH_QUANTILES = [0.5, 0.9, 0.99]
+HISTOGRAM_EDGES = [0, 1, 4, 8, 24, 72, 168, np.inf]
+HISTOGRAM_LABELS = ['≤ 1 jam', '1–4 jam', '4–8 jam', '8–24 jam', '1–3 hari', '3–7 hari', '> 7 hari']
+ALL_SERVICES = "(Semua Service)"
+
+_GAMMA = (1 + BREACH_SKETCH_ACCURACY) / (1 - BREACH_SKETCH_ACCURACY)
+_LOG_GAMMA = np.log(_GAMMA)
+
+def _buckets(hours):
+    return np.ceil(np.log(np.maximum(hours, MIN_BREACH_HOURS)) / _LOG_GAMMA).astype(np.int64)
+
+def _bucket_hours(buckets):
+    # titik tengah bucket (gamma^(i-1), gamma^i] dengan galat relatif <= BREACH_SKETCH_ACCURACY
+    return 2 * np.power(_GAMMA, np.asarray(buckets, dtype=np.float64)) / (_GAMMA + 1)
+
+def new_sketch():
+    """
+    Sketch kuantil Time Breach (gaya DDSketch): jumlah tiket per bucket logaritmik.
+    Hanya tiket yang breach (> 0 jam) yang masuk bucket; tiket tepat waktu cukup dihitung.
+    Dua sketch digabung dengan menjumlahkan bucket, tanpa menyimpan nilai aslinya.
+    """
+    return {'buckets': Counter(), 'breached': 0, 'on_time': 0, 'max': 0.0}
+
+def merge_sketches(*sketches):
+    merged = new_sketch()
+    for sketch in sketches:
+        merged['buckets'].update(sketch['buckets'])
+        merged['breached'] += sketch['breached']
+        merged['on_time'] += sketch['on_time']
+        merged['max'] = max(merged['max'], sketch['max'])
+    return merged
+
+def sketch_by_group(groups, breach_hours):
+    """
+    Sketch per grup (mis. Service offering) dari Time Breach dalam jam, dihitung vektor untuk satu chunk.
+    Nilai kosong (tiket open) diabaikan. Mengembalikan {grup: sketch}.
+    """
+    hours = pd.to_numeric(pd.Series(breach_hours), errors='coerce').to_numpy(dtype=np.float64)
+    groups = pd.Series(groups).to_numpy()
+    valid = ~np.isnan(hours) & pd.notna(groups)
+    breached = valid & (hours > 0)
+
+    result = {}
+    for group, n in pd.Series(groups[valid & ~breached]).value_counts().items():
+        result.setdefault(group, new_sketch())['on_time'] = int(n)
+
+    frame = pd.DataFrame({'group': groups[breached], 'bucket': _buckets(hours[breached]), 'hours': hours[breached]})
+    if frame.empty:
+        return result
+    stats = frame.groupby('group', sort=False)['hours'].agg(['size', 'max'])
+    for group, row in stats.iterrows():
+        sketch = result.setdefault(group, new_sketch())
+        sketch['breached'] = int(row['size'])
+        sketch['max'] = float(row['max'])
+    for (group, bucket), n in frame.groupby(['group', 'bucket'], sort=False).size().items():
+        result[group]['buckets'][int(bucket)] = int(n)
+    return result
+
+def merge_grouped(*grouped):
+    """Menggabungkan beberapa hasil sketch_by_group (mis. per bulan, per chunk, Incident + Request)."""
+    merged = {}
+    for part in grouped:
+        for group, sketch in part.items():
+            merged[group] = merge_sketches(merged[group], sketch) if group in merged else merge_sketches(sketch)
+    return merged
+
+def sketch_quantile(sketch, q):
+    """Perkiraan kuantil q dari Time Breach tiket yang breach (jam); NaN bila tidak ada tiket breach."""
+    if not sketch['breached']:
+        return np.nan
+    buckets = np.array(sorted(sketch['buckets']), dtype=np.int64)
+    cumulative = np.cumsum([sketch['buckets'][b] for b in buckets])
+    rank = int(q * (sketch['breached'] - 1))
+    pos = np.searchsorted(cumulative, rank, side='right')
+    return float(min(_bucket_hours(buckets[pos]), sketch['max']))
+
+def sketch_histogram(sketch):
+    """Jumlah tiket breach per rentang HISTOGRAM_LABELS."""
+    if not sketch['buckets']:
+        return np.zeros(len(HISTOGRAM_LABELS), dtype=np.int64)
+    buckets = np.fromiter(sketch['buckets'].keys(), dtype=np.int64)
+    counts = np.fromiter(sketch['buckets'].values(), dtype=np.int64)
+    bins = np.searchsorted(HISTOGRAM_EDGES, _bucket_hours(buckets), side='left') - 1
+    return np.bincount(np.clip(bins, 0, len(HISTOGRAM_LABELS) - 1), weights=counts, minlength=len(HISTOGRAM_LABELS)).astype(np.int64)
+
+def breach_distribution_table(grouped):
+    """Tabel persentil breach per service, diurutkan dari p90 terbesar."""
+    rows = []
+    for group, sketch in grouped.items():
+        if not sketch['breached']:
+            continue
+        row = {'Service Offering': group, 'Tiket Breach': sketch['breached'], 'Tiket Tepat Waktu': sketch['on_time']}
+        for q in BREACH_QUANTILES:
+            row[f"p{int(q * 100)} (jam)"] = round(sketch_quantile(sketch, q), 1)
+        row['Max (jam)'] = round(sketch['max'], 1)
+        rows.append(row)
+    columns = ['Service Offering', 'Tiket Breach', 'Tiket Tepat Waktu'] + [f"p{int(q * 100)} (jam)" for q in BREACH_QUANTILES] + ['Max (jam)']
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    return pd.DataFrame(rows, columns=columns).sort_values(['p90 (jam)', 'Tiket Breach'], ascending=False, kind='stable').reset_index(drop=True)
+
+def render_breach_distribution(grouped, key, top=10):
+    """
+    Section distribusi Time Breach: persentil per service (tidak didominasi satu tiket outlier
+    seperti ranking Max Breach) dan histogram rentang breach. Mengembalikan tabel lengkap untuk export.
+    """
+    table = breach_distribution_table(grouped)
+    if table.empty:
+        st.info("Tidak ada tiket breach pada periode ini.")
+        return table
+
+    st.caption(
+        f"Persentil dihitung dari sketch kuantil yang bisa digabung antar bulan/file "
+        f"(akurasi relatif ±{BREACH_SKETCH_ACCURACY:.0%}); p90 = 90% tiket breach selesai dalam waktu tersebut."
+    )
+    col_table, col_hist = st.columns([3, 2])
+    with col_table:
+        st.markdown(f"**Top {min(top, len(table))} Service berdasarkan p90 Time Breach**")
+        st.dataframe(table.head(top), hide_index=True, use_container_width=True)
+    with col_hist:
+        choice = st.selectbox("Histogram untuk", [ALL_SERVICES] + table['Service Offering'].tolist(), key=f"{key}_service")
+        sketch = grouped[choice] if choice != ALL_SERVICES else merge_sketches(*grouped.values())
+        hist = pd.DataFrame({'Rentang Breach': HISTOGRAM_LABELS, 'Jumlah Tiket': sketch_histogram(sketch)})
+        fig = chart_figure(
+            'bar', hist, x='Rentang Breach', y='Jumlah Tiket', text='Jumlah Tiket', title=f"Distribusi Time Breach — {choice}",
+            layout=dict(height=400, xaxis=dict(fixedrange=True), yaxis=dict(fixedrange=True), dragmode=False, margin=dict(t=50, b=50, l=20, r=20))
+        )
+        st.plotly_chart(fig, use_container_width=True, key=f"{key}_hist")
+    return table
@@ -0,0 +1,68 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+DEFAULT_TOP_N = 15
+OTHERS_LABEL = "Others"
+
+_PX_KINDS = {
+    'bar': px.bar,
+    'pie': px.pie,
+    'line': px.line,
+    'sunburst': px.sunburst,
+}
+
+def top_n_with_others(data, label_col, value_col, n=DEFAULT_TOP_N, ascending=False,
+                      others_agg='sum', other_label=OTHERS_LABEL, others_ratio=None):
+    """
+    Membatasi data agregat (satu baris per kategori) menjadi n kategori teratas
+    berdasarkan value_col, sisanya digabung menjadi satu baris "Others".
+    others_agg menentukan nilai baris Others ('sum' untuk jumlah, 'min'/'max' untuk persentase).
+    others_ratio = (kolom pembilang, kolom penyebut): value_col baris Others dihitung ulang sebagai
+    jumlah pembilang / jumlah penyebut, sehingga persentase Others tertimbang (mis. per jumlah tiket).
+    Urutan baris teratas mengikuti urutan data masukan; baris Others selalu terakhir.
+    Kolom numerik lain pada baris Others diisi dengan agregat yang sama.
+    """
+    if len(data) <= n + 1:
+        return data
+
+    data = data.reset_index(drop=True)
+    ranked = data.sort_values(by=[value_col, label_col], ascending=[ascending, True])
+    in_top = data.index.isin(ranked.index[:n])
+    top = data[in_top]
+    rest = data[~in_top]
+
+    others = {label_col: f"{other_label} ({len(rest)})"}
+    for col in data.columns:
+        if col == label_col:
+            continue
+        if col == value_col and others_ratio:
+            num_col, den_col = others_ratio
+            den = rest[den_col].sum()
+            value = rest[num_col].sum() / den if den else rest[col].mean()
+            others[col] = round(float(value), 1)
+        elif pd.api.types.is_numeric_dtype(data[col]):
+            value = rest[col].agg(others_agg)
+            if pd.api.types.is_integer_dtype(data[col]) and others_agg != 'mean':
+                value = int(value)
+            elif others_agg == 'mean':
+                value = round(float(value), 1)
+            others[col] = value
+    return pd.concat([top, pd.DataFrame([others])], ignore_index=True)
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def _build_figure(kind, data, px_kwargs, traces, layout):
+    fig = _PX_KINDS[kind](data, **px_kwargs)
+    if traces:
+        fig.update_traces(**traces)
+    if layout:
+        fig.update_layout(**layout)
+    return fig
+
+def chart_figure(kind, data, traces=None, layout=None, **px_kwargs):
+    """
+    Membuat figure Plotly dari data yang sudah diagregasi.
+    Figure di-cache berdasarkan hash isi data agregat + parameter chart,
+    sehingga rerun dengan agregat yang sama tidak membangun figure ulang.
+    """
+    return _build_figure(kind, data, px_kwargs, traces or {}, layout or {})
@@ -0,0 +1,91 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+SAMPLE_SIZE = 5
+
+# alasan penolakan yang dipakai bersama oleh halaman Incident, Request Item dan Summary
+REASON_DATE_EMPTY = "Tanggal kosong"
+REASON_DATE_FORMAT = "Format tanggal tidak dikenali"
+REASON_UNKNOWN_COMBO = "Kombinasi BC/Severity tidak ada di mapping SLA"
+REASON_NO_POLICY = "Tanggal dibuat di luar masa berlaku kebijakan SLA"
+REASON_UNKNOWN_TITLE = "Judul Permasalahan tidak ada di Map_Item"
+REASON_UNKNOWN_SLA_ID = "ID SLA tidak ada di Map_Durasi"
+
+def record_rejects(report, source, reason, column, mask, values, tickets=None):
+    """
+    Mencatat baris yang ditolak untuk satu alasan: jumlah dan beberapa contoh.
+    mask dan values/tickets sejajar dengan frame yang diperiksa. Contoh hanya diambil dari
+    beberapa posisi pertama, jadi biayanya cukup satu sum() atas mask yang sudah ada.
+    report None berarti profiling tidak diminta.
+    """
+    if report is None:
+        return 0
+    mask = np.asarray(mask, dtype=bool)
+    count = int(mask.sum())
+    if count == 0:
+        return 0
+
+    positions = np.flatnonzero(mask)[:SAMPLE_SIZE]
+    sample_values = pd.Series(values).iloc[positions].tolist()
+    if tickets is not None:
+        sample_tickets = pd.Series(tickets).iloc[positions].tolist()
+        samples = [f"{t}: {v!r}" for t, v in zip(sample_tickets, sample_values)]
+    else:
+        samples = [repr(v) for v in sample_values]
+
+    report.append({
+        'Sumber': source,
+        'Kolom': column,
+        'Alasan': reason,
+        'Jumlah': count,
+        'Total Baris': len(mask),
+        'Contoh': ", ".join(samples),
+    })
+    return count
+
+def check_dates(report, source, column, raw, parsed, tickets=None, allow_empty=False):
+    """
+    Membedakan tanggal kosong dan tanggal yang gagal di-parse (NaT hasil errors='coerce').
+    Hanya baris NaT yang diperiksa ulang, jadi file bersih nyaris tanpa biaya tambahan.
+    allow_empty=True untuk kolom yang memang boleh kosong (mis. tanggal tutup tiket open).
+    """
+    if report is None:
+        return
+    is_nat = pd.Series(parsed).isna().to_numpy()
+    if not is_nat.any():
+        return
+    raw = pd.Series(raw)
+    positions = np.flatnonzero(is_nat)
+    candidates = raw.iloc[positions]
+    blank = (candidates.isna() | candidates.astype(str).str.strip().eq('')).to_numpy()
+
+    empty = np.zeros(len(raw), dtype=bool)
+    empty[positions[blank]] = True
+    if not allow_empty:
+        record_rejects(report, source, REASON_DATE_EMPTY, column, empty, raw, tickets)
+    record_rejects(report, source, REASON_DATE_FORMAT, column, is_nat & ~empty, raw, tickets)
+
+def quality_frame(report):
+    """Rekap penolakan sebagai DataFrame, diurutkan dari jumlah terbanyak."""
+    columns = ['Sumber', 'Kolom', 'Alasan', 'Jumlah', 'Total Baris', 'Contoh']
+    if not report:
+        return pd.DataFrame(columns=columns)
+    df = pd.DataFrame(report, columns=columns)
+    df.insert(df.columns.get_loc('Total Baris') + 1, '% Baris', (df['Jumlah'] / df['Total Baris'] * 100).round(2))
+    return df.sort_values(by=['Jumlah', 'Sumber'], ascending=[False, True], ignore_index=True)
+
+def render_quality_panel(report, title="🩺 Kualitas Data"):
+    """Panel ringkasan kualitas data: baris yang keluar dari perhitungan SLA per file, kolom dan alasan."""
+    df = quality_frame(report)
+    if df.empty:
+        st.caption(f"{title}: semua baris lolos validasi tanggal dan mapping SLA.")
+        return
+
+    with st.expander(f"{title} — {int(df['Jumlah'].sum()):,} baris bermasalah", expanded=False):
+        by_reason = df.groupby('Alasan', sort=False)['Jumlah'].sum()
+        cols = st.columns(min(len(by_reason), 4))
+        for i, (reason, count) in enumerate(by_reason.items()):
+            cols[i % len(cols)].metric(reason, f"{int(count):,}")
+        st.dataframe(df, use_container_width=True, hide_index=True)
+        st.caption("Baris di atas tidak ikut dihitung pada SLA (tanggal tidak valid) atau tidak memiliki target SLA (mapping tidak ditemukan).")
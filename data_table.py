@@ -0,0 +1,111 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from schema import TICKET_NO
+
+PAGE_SIZE_OPTIONS = [25, 50, 100, 250]
+MAX_FILTER_CHOICES = 50
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def build_search_index(values):
+    """
+    Index pencarian No. Tiket: kunci huruf besar yang diurutkan beserta posisi barisnya.
+    Pencarian prefix cukup dua binary search (searchsorted) pada kunci terurut.
+    """
+    keys = pd.Series(values).astype(str).str.strip().str.upper().to_numpy(dtype=object)
+    order = np.argsort(keys, kind='stable')
+    return {'keys': keys[order], 'positions': order}
+
+def search_positions(index, query):
+    """Posisi baris yang No. Tiket-nya diawali query (tidak case-sensitive), urut sesuai data asli."""
+    query = str(query).strip().upper()
+    lo = np.searchsorted(index['keys'], query, side='left')
+    hi = np.searchsorted(index['keys'], query + '\uffff', side='left')
+    return np.sort(index['positions'][lo:hi])
+
+def _sorted_positions(column, positions, ascending):
+    values = column.iloc[positions].reset_index(drop=True)
+    try:
+        order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index
+    except TypeError:
+        # kolom campuran (mis. SLA berisi 1/0/"WP") diurutkan sebagai teks
+        order = values.astype(str).sort_values(ascending=ascending, kind='stable').index
+    return positions[order.to_numpy()]
+
+def paginated_table(df, key, search_col=TICKET_NO, page_size_options=None, detail=None):
+    """
+    Tabel data dengan paging di sisi server: pencarian No. Tiket, filter kolom,
+    dan sorting dikerjakan di pandas, lalu hanya baris pada halaman aktif
+    yang dikirim ke browser.
+    detail(page_df) (opsional) melengkapi baris halaman aktif dengan kolom yang tidak
+    disimpan di df (mis. teks bebas). Kolom berawalan '_' adalah kolom bantu dan tidak ditampilkan.
+    """
+    page_size_options = page_size_options or PAGE_SIZE_OPTIONS
+    if df.empty:
+        st.info("Tidak ada data untuk ditampilkan.")
+        return
+
+    columns = [str(c) for c in df.columns if not str(c).startswith('_')]
+    positions = np.arange(len(df))
+
+    col_search, col_filter, col_value = st.columns([1, 1, 2])
+    with col_search:
+        query = ""
+        if search_col in df.columns:
+            query = st.text_input(f"Cari {search_col}", key=f"{key}_search", placeholder="mis. RITM00123")
+    with col_filter:
+        filter_col = st.selectbox("Filter kolom", ["(Tanpa filter)"] + columns, key=f"{key}_filter_col")
+
+    if query:
+        index = build_search_index(df[search_col])
+        positions = search_positions(index, query)
+
+    if filter_col != "(Tanpa filter)":
+        column = df[filter_col]
+        choices = column.dropna().astype(str).unique()
+        with col_value:
+            if len(choices) <= MAX_FILTER_CHOICES:
+                selected = st.multiselect("Nilai", sorted(choices), key=f"{key}_filter_val_{filter_col}")
+                if selected:
+                    mask = column.iloc[positions].astype(str).isin(selected).to_numpy()
+                    positions = positions[mask]
+            else:
+                text = st.text_input("Mengandung teks", key=f"{key}_filter_txt_{filter_col}")
+                if text:
+                    mask = column.iloc[positions].astype(str).str.contains(text, case=False, regex=False).to_numpy()
+                    positions = positions[mask]
+
+    col_sort, col_dir, col_size, col_page = st.columns([2, 1, 1, 1])
+    with col_sort:
+        sort_col = st.selectbox("Urutkan", ["(Urutan asli)"] + columns, key=f"{key}_sort")
+    with col_dir:
+        ascending = st.radio("Arah", ["Naik", "Turun"], horizontal=True, key=f"{key}_dir") == "Naik"
+    with col_size:
+        page_size = st.selectbox("Baris/hal.", page_size_options, key=f"{key}_size")
+
+    total = len(positions)
+    n_pages = max(1, -(-total // page_size))
+    page_key = f"{key}_page"
+    # pencarian/filter/urutan berubah -> kembali ke halaman pertama
+    view = (query, filter_col, total, sort_col, ascending, page_size)
+    if st.session_state.get(f"{key}_view") != view:
+        st.session_state[f"{key}_view"] = view
+        st.session_state[page_key] = 1
+    elif st.session_state.get(page_key, 1) > n_pages:
+        st.session_state[page_key] = n_pages
+    with col_page:
+        page = int(st.number_input("Halaman", min_value=1, max_value=n_pages, step=1, key=page_key))
+
+    if sort_col != "(Urutan asli)" and total:
+        positions = _sorted_positions(df[sort_col], positions, ascending)
+
+    start = (page - 1) * page_size
+    page_positions = positions[start:start + page_size]
+    page_df = df.iloc[page_positions]
+    if detail is not None:
+        page_df = detail(page_df)
+    st.dataframe(page_df[[c for c in page_df.columns if not str(c).startswith('_')]], use_container_width=True)
+    if total:
+        st.caption(f"Baris {start + 1:,}–{start + len(page_positions):,} dari {total:,} (halaman {page}/{n_pages}).")
+    else:
+        st.caption("Tidak ada baris yang cocok.")
@@ -1,28 +1,23 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import io
-import re
 from datetime import time, timedelta, datetime
 import numpy as np
 import calendar
-
-def normalize_label(s: str) -> str:
-    if pd.isna(s):
-        return ""
-    s = str(s).strip()
-    s = re.sub(r'\s+', ' ', s)
-    s = re.sub(r'\s*-\s*', ' - ', s)
-    s = re.sub(r'(?<=\d)(?=[A-Za-z])', ' ', s)
-    s = re.sub(r'(?<=\D)(?=\d)', ' ', s)
-    s = re.sub(r'\s+', ' ', s).strip()
-    return s
-
-def to_excel(df):
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-        df.to_excel(writer, index=False)
-    return output.getvalue()
+from ticket_index import build_time_index, date_range_picker, apply_range
+from sla_clock import compute_sla, sla_clock_selector
+from sla_pause import compute_paused_hours, status_log_uploader
+from sla_risk import render_sla_risk
+from schema import read_tickets, parse_dates, RESOLVED_FIRST, TICKET_NO, CREATED, RESOLVED, BC, SEVERITY, SERVICE, CHANNEL, CATEGORY
+from chart_data import chart_figure, top_n_with_others
+from data_table import paginated_table
+from report_export import report_table, build_report_workbook, export_download
+from result_cache import fingerprint
+from data_quality import check_dates, record_rejects, render_quality_panel, REASON_UNKNOWN_COMBO, REASON_NO_POLICY
+from ticket_store import history_rows, history_save_panel
+from text_columns import split_free_text, attach_free_text
+from breach_sketch import sketch_by_group, render_breach_distribution
+from sla_policy import normalize_label, apply_policy, sla_policy_status
 
 def format_hari_jam_menit(total_hours_decimal):
     if pd.isna(total_hours_decimal) or total_hours_decimal <= 0:
@@ -50,20 +45,6 @@ def format_jam_menit_saja(total_hours_decimal):
         
     return f"{hours} jam {minutes} menit"
 
-def calculate_time_breach(row, date_created_col, date_resolved_col):
-    sla_val = row.get('SLA')
-    
-    if pd.isna(sla_val):
-        return pd.NA
-
-    if pd.notna(row[date_resolved_col]) and pd.notna(row[date_created_col]) and pd.notna(row['Waktu SLA']):
-        resolution_duration = row[date_resolved_col] - row[date_created_col]
-        sla_timedelta = pd.to_timedelta(row['Waktu SLA'], unit='h')
-        breach = resolution_duration - sla_timedelta
-        return breach.total_seconds() / (3600 * 24) 
-    else:
-        return pd.NA
-
 def make_styled_table_simple(df):
     """
     Mengubah DataFrame menjadi HTML string dengan class CSS 'manual-sla-table'.
@@ -156,7 +137,7 @@ def run():
         return
 
     try:
-        df = pd.read_excel(uploaded_file)
+        df = read_tickets(uploaded_file, prefer=RESOLVED_FIRST)
     except Exception as e:
         st.error(f"Gagal membaca file Excel: {e}")
         return
@@ -164,93 +145,136 @@ def run():
     st.success("File berhasil dibaca.")
     st.subheader("Data Preview")
     st.dataframe(df.head(10))
+    # teks bebas tidak ikut perhitungan; dipasang lagi hanya untuk tabel hasil dan export
+    file_columns = list(df.columns)
+    df, free_text = split_free_text(df)
 
-    possible_bc_cols = ['Business criticality', 'Businesscriticality', 'Business criticality', 'BusinessCriticality']
-    possible_sev_cols = ['Severity', 'severity', 'SEVERITY']
-    bc_col = next((c for c in possible_bc_cols if c in df.columns), None)
-    sev_col = next((c for c in possible_sev_cols if c in df.columns), None)
+    bc_col = BC if BC in df.columns else None
+    sev_col = SEVERITY if SEVERITY in df.columns else None
 
     if bc_col is None or sev_col is None:
         st.error(f"Kolom 'Business criticality' atau 'Severity' tidak ditemukan. Tidak bisa menghitung SLA.")
         st.write("Kolom yang ada di file:", list(df.columns))
         return
 
-    date_created_col = next((c for c in ['Tiket Dibuat', 'Tiket dibuat', 'Created', 'Created Date', 'CreatedAt'] if c in df.columns), None)
-    date_resolved_col = next((c for c in ['Resolved', 'Tiket Ditutup', 'Closed', 'Closed At', 'Tiket ditutup'] if c in df.columns), None)
+    date_created_col = CREATED if CREATED in df.columns else None
+    date_resolved_col = RESOLVED if RESOLVED in df.columns else None
 
     if date_created_col is None:
         st.error("Kolom tanggal 'Tiket Dibuat' (atau variasinya) tidak ditemukan.")
         return
 
-    df[date_created_col] = pd.to_datetime(df[date_created_col], errors='coerce')
+    quality = []
+    quality_tickets = df[TICKET_NO] if TICKET_NO in df.columns else None
+    created_raw = df[date_created_col]
+    df[date_created_col] = parse_dates(created_raw, df.columns)
+    check_dates(quality, uploaded_file.name, date_created_col, created_raw, df[date_created_col], quality_tickets)
     if date_resolved_col:
-        df[date_resolved_col] = pd.to_datetime(df[date_resolved_col], errors='coerce')
+        resolved_raw = df[date_resolved_col]
+        df[date_resolved_col] = parse_dates(resolved_raw, df.columns)
+        check_dates(quality, uploaded_file.name, date_resolved_col, resolved_raw, df[date_resolved_col], quality_tickets, allow_empty=True)
     else:
         st.warning("Kolom 'Resolved' atau 'Tiket Ditutup' tidak ditemukan. Perhitungan SLA dan Time Breach mungkin tidak akurat.")
 
-    total_hours_in_month = 744 
-    
-    first_valid_date = df[date_created_col].dropna().min()
-    
-    if pd.notna(first_valid_date):
-        ref_year = first_valid_date.year
-        ref_month = first_valid_date.month
-        days_in_month = calendar.monthrange(ref_year, ref_month)[1]
-        total_hours_in_month = days_in_month * 24
-        
-        st.info(f"Bulan terdeteksi: **{first_valid_date.strftime('%B %Y')}** ({days_in_month} hari). Total jam digunakan untuk SLA%: **{total_hours_in_month} jam**.")
-    else:
-        st.warning("Tidak dapat mendeteksi tanggal di 'Tiket Dibuat'. Menggunakan default 744 jam (31 hari).")
-
-    sla_mapping_hours = {
-        '1 - Critical - 1 - High': 4.0,
-        '1 - Critical - 2 - Medium': 6.0,
-        '1 - Critical - 3 - Low': 8.0,
-        '2 - High - 1 - High': 6.0,
-        '2 - High - 2 - Medium': 8.0,
-        '2 - High - 3 - Low': 12.0,
-        '3 - Medium - 1 - High': 8.0,
-        '3 - Medium - 2 - Medium': 12.0,
-        '3 - Medium - 3 - Low': 16.0,
-        '4 - Low - 1 - High': 16.0,
-        '4 - Low - 2 - Medium': 24.0,
-        '4 - Low - 3 - Low': 48.0
-    }
+    sla_policy = sla_policy_status()
+    if sla_policy is None:
+        return
 
     df['_bc_raw'] = df[bc_col].astype(str).fillna('').str.strip()
     df['_sev_raw'] = df[sev_col].astype(str).fillna('').str.strip()
-    df['Business criticality-Severity'] = (df['_bc_raw'] + " - " + df['_sev_raw']).apply(normalize_label)
-
-    def map_to_hours(label: str):
-        if not label:
-            return None
-        norm_label = normalize_label(label)
-        for key in sla_mapping_hours.keys():
-            if norm_label == normalize_label(key):
-                return sla_mapping_hours[key]
-        return None
-
-    df['Waktu SLA'] = df['Business criticality-Severity'].apply(map_to_hours)
-    
-    df['Target Selesai Baru'] = df.apply(
-        lambda r: (r[date_created_col] + pd.to_timedelta(r['Waktu SLA'], unit='h'))
-        if pd.notna(r[date_created_col]) and pd.notna(r['Waktu SLA']) else pd.NaT,
-        axis=1
-    )
+    combo = df['_bc_raw'] + " - " + df['_sev_raw']
+    label_map = {v: normalize_label(v) for v in combo.unique()}
+    df['Business criticality-Severity'] = combo.map(label_map)
 
-    if date_resolved_col:
-        df['SLA'] = df.apply(
-            lambda r: 1 if (pd.notna(r['Target Selesai Baru']) and pd.notna(r[date_resolved_col]) and r[date_resolved_col] <= r['Target Selesai Baru'])
-            else (0 if (pd.notna(r['Target Selesai Baru']) and pd.notna(r[date_resolved_col])) else pd.NA),
-            axis=1
+    policy = apply_policy(
+        sla_policy, df[date_created_col], df['Business criticality-Severity'],
+        df[SERVICE] if SERVICE in df.columns else None
+    )
+    df['Waktu SLA'] = policy['hours']
+    in_force = policy['version'] >= 0
+    record_rejects(
+        quality, uploaded_file.name, REASON_NO_POLICY, date_created_col,
+        ~in_force & df[date_created_col].notna().to_numpy(), df[date_created_col], quality_tickets
+    )
+    record_rejects(
+        quality, uploaded_file.name, REASON_UNKNOWN_COMBO, 'Business criticality-Severity',
+        in_force & np.isnan(policy['hours']), df['Business criticality-Severity'], quality_tickets
+    )
+    
+    sla_calendar = sla_clock_selector("incident_sla_clock")
+    resolved_values = df[date_resolved_col] if date_resolved_col else pd.Series(pd.NaT, index=df.index)
+
+    paused_hours = None
+    status_log = status_log_uploader("incident_status_log")
+    log_tiket_col = TICKET_NO if TICKET_NO in df.columns else None
+    if status_log and log_tiket_col:
+        log, pause_states = status_log
+        # tiket open: jeda dihitung sampai sekarang, bukan nol
+        paused_hours = compute_paused_hours(
+            log, df[log_tiket_col], df[date_created_col], resolved_values, pause_states, sla_calendar, ref_time=pd.Timestamp.now()
         )
-    else:
-        df['SLA'] = pd.NA
+        df['Waktu Jeda (jam)'] = paused_hours
+    elif status_log:
+        st.warning("Kolom 'No. Tiket' tidak ditemukan, log status tidak dapat dipakai.")
+
+    sla_result = compute_sla(df[date_created_col], resolved_values, df['Waktu SLA'], sla_calendar, paused_hours)
 
-    df['Time Breach'] = df.apply(
-        lambda r: calculate_time_breach(r, date_created_col, date_resolved_col), axis=1
+    df['Target Selesai Baru'] = sla_result['target']
+    df['SLA'] = sla_result['sla']
+    df['Time Breach'] = sla_result['breach_hours'] / 24
+
+    def sla_status(row):
+        sla_val = row.get("SLA")
+        if not date_resolved_col or pd.isna(row.get(date_resolved_col)):
+            return "Open"
+        if pd.isna(sla_val):
+            return "Unknown"
+        if sla_val == 1:
+            return "Achieved"
+        elif sla_val == 0:
+            return "Not Achieved"
+        return "Unknown"
+
+    df["Status SLA"] = df.apply(sla_status, axis=1)
+    render_quality_panel(quality)
+    # Time Breach halaman ini dalam hari, riwayat menyimpan jam
+    history_save_panel(
+        lambda full=df: [history_rows(
+            full, "Incident", target_hours=full['Waktu SLA'], breach_hours=full['Time Breach'] * 24,
+            category_col=CATEGORY if CATEGORY in full.columns else None
+        )],
+        source=uploaded_file.name, key="incident"
     )
 
+    st.subheader("Filter Periode")
+    time_index = build_time_index(df, date_created_col)
+    range_selection = date_range_picker([time_index], key="incident_range")
+    df = apply_range(time_index, range_selection)
+
+    total_hours_in_month = 744 
+
+    if range_selection['month']:
+        ref_year, ref_month = range_selection['month']
+        days_in_month = calendar.monthrange(ref_year, ref_month)[1]
+        total_hours_in_month = days_in_month * 24
+        st.info(f"Bulan dipilih: **{range_selection['label']}** ({days_in_month} hari). Total jam digunakan untuk SLA%: **{total_hours_in_month} jam**.")
+    elif range_selection['start'] is not None:
+        range_days = max(1, (range_selection['end'] - range_selection['start']).days)
+        total_hours_in_month = range_days * 24
+        st.info(f"Rentang dipilih: **{range_selection['label']}** ({range_days} hari). Total jam digunakan untuk SLA%: **{total_hours_in_month} jam**.")
+    else:
+        first_valid_date = time_index['keys'][0] if time_index['n_valid'] else None
+        if first_valid_date is not None:
+            first_valid_date = pd.Timestamp(first_valid_date)
+            ref_year = first_valid_date.year
+            ref_month = first_valid_date.month
+            days_in_month = calendar.monthrange(ref_year, ref_month)[1]
+            total_hours_in_month = days_in_month * 24
+            
+            st.info(f"Bulan terdeteksi: **{first_valid_date.strftime('%B %Y')}** ({days_in_month} hari). Total jam digunakan untuk SLA%: **{total_hours_in_month} jam**.")
+        else:
+            st.warning("Tidak dapat mendeteksi tanggal di 'Tiket Dibuat'. Menggunakan default 744 jam (31 hari).")
+
     sla_tercapai = int((df['SLA'] == 1).sum())
     sla_tidak_tercapai = int((df['SLA'] == 0).sum())
     if date_resolved_col:
@@ -301,8 +325,7 @@ def run():
         st.markdown("**Top 5 Kombinasi Business criticality-Severity:**")
         st.markdown(make_styled_table_simple(top5), unsafe_allow_html=True)
 
-    possible_contacttype_cols = ['Channel', 'Contact Type', 'ContactType', 'Contact type']
-    contact_col = next((c for c in possible_contacttype_cols if c in df.columns), None)
+    contact_col = CHANNEL if CHANNEL in df.columns else None
 
     if contact_col:
         contact_summary = df[contact_col].value_counts(dropna=False).reset_index()
@@ -317,12 +340,16 @@ def run():
             st.markdown("**Rekapitulasi Semua Channel**")
             st.markdown(make_styled_table_simple(contact_summary), unsafe_allow_html=True)
         with col_channel_2:
-            fig_contact = px.pie(contact_summary, names='Channel', values='Jumlah', hole=0.4, title='Proporsi Channel')
-            fig_contact.update_layout(margin=dict(t=40, b=0, l=0, r=0))
+            contact_chart = top_n_with_others(
+                contact_summary[['Channel', 'Jumlah']].astype({'Channel': str}), 'Channel', 'Jumlah', n=8
+            )
+            fig_contact = chart_figure(
+                'pie', contact_chart, names='Channel', values='Jumlah', hole=0.4, title='Proporsi Channel',
+                layout=dict(margin=dict(t=40, b=0, l=0, r=0))
+            )
             st.plotly_chart(fig_contact, use_container_width=True)
 
-    possible_service_cols = ['Service offering', 'Service Offering', 'ServiceOffering', 'Service offering']
-    service_col = next((c for c in possible_service_cols if c in df.columns), None)
+    service_col = SERVICE if SERVICE in df.columns else None
 
     if service_col:
         st.subheader("Analisis Service Offering")
@@ -362,8 +389,9 @@ def run():
             )
             st.plotly_chart(fig_service, use_container_width=True)
 
+    export_sheets = {}  # nama sheet -> [report_table]
     if service_col and 'SLA' in df.columns:
-        tiket_col = next((c for c in ['No. Tiket', 'Ticket No', 'No Ticket', 'No Tiket', 'Ticket'] if c in df.columns), 'No. Tiket')
+        tiket_col = TICKET_NO
 
         sla_service_agg = (
             df.groupby(service_col)
@@ -410,6 +438,23 @@ def run():
         bottom3_sla = bottom3_sla[['No_Bottom', service_col, 'Jumlah_Tiket', 'Total Waktu Breach (jam)', 'SLA_Breach_%']] 
         bottom3_sla.columns = ['No', 'Service Offering', 'Σ Tiket (Closed)', 'Total Waktu Breach (jam)', 'SLA (%)']
 
+        export_sheets['SLA Evaluation'] = [
+            report_table("Top 3 SLA Service", pd.DataFrame({
+                'No': top3_sla['No'],
+                'Service Offering': top3_sla['Service Offering'],
+                'Jmlh Tiket': top3_sla['Σ Tiket (Closed)'],
+                'Total Waktu Breach': top3_sla['Total Waktu Breach (jam)'].map(format_hari_jam_menit),
+                'SLA': top3_sla['SLA (%)'].astype(str) + "%",
+            }), group_col='No', bold_cols=['Service Offering'], highlight_cols=['SLA']),
+            report_table("Bottom 3 SLA Service", pd.DataFrame({
+                'No': bottom3_sla['No'],
+                'Service Offering': bottom3_sla['Service Offering'],
+                'Jmlh Tiket': bottom3_sla['Σ Tiket (Closed)'],
+                'Total Waktu Breach': bottom3_sla['Total Waktu Breach (jam)'].map(format_jam_menit_saja),
+                'SLA': "-" + bottom3_sla['SLA (%)'].astype(str) + "%",
+            }), group_col='No', bold_cols=['Service Offering'], highlight_cols=['SLA']),
+        ]
+
         html_top = '<table class="manual-sla-table"><thead><tr>'
         html_top += "<th>No</th><th>Service Offering</th><th>Jmlh Tiket</th><th>Total Waktu Breach</th><th>SLA</th></tr></thead><tbody>"
         for no in sorted(top3_sla['No'].unique()):
@@ -449,17 +494,25 @@ def run():
             chart_config = {'displayModeBar': True, 'modeBarButtonsToRemove': ['zoom2d', 'pan2d', 'select2d', 'lasso2d', 'zoomIn2d', 'zoomOut2d', 'autoScale2d', 'resetScale2d'], 'displaylogo': False}
             
             if 'SLA_Pencapaian_%' in sla_service_agg.columns:
-                chart_data = sla_service_agg.sort_values(by=service_col, ascending=True)
-                fig_sla_percent = px.bar(chart_data, x=service_col, y='SLA_Pencapaian_%', text='SLA_Pencapaian_%', title="SLA Total per Service Offering")
-                fig_sla_percent.update_traces(texttemplate='%{text}%', textposition='outside')
+                # hanya service dengan SLA terendah yang digambar; sisanya dirata-rata ke "Others" tertimbang jumlah tiket
+                chart_source = sla_service_agg[[service_col, 'SLA_Pencapaian_%', 'Jumlah_Tiket']].copy()
+                chart_source['_sla_x_tiket'] = chart_source['SLA_Pencapaian_%'] * chart_source['Jumlah_Tiket']
+                chart_data = top_n_with_others(
+                    chart_source.sort_values(by=service_col),
+                    service_col, 'SLA_Pencapaian_%', ascending=True, others_ratio=('_sla_x_tiket', 'Jumlah_Tiket')
+                )
                 y_max = chart_data['SLA_Pencapaian_%'].max()
-                fig_sla_percent.update_layout(
-                    height=600, 
-                    yaxis_range=[0, max(100, y_max * 1.25)], 
-                    xaxis=dict(fixedrange=True), 
-                    yaxis=dict(fixedrange=True), 
-                    dragmode=False, 
-                    margin=dict(t=50, b=50, l=20, r=20)
+                fig_sla_percent = chart_figure(
+                    'bar', chart_data, x=service_col, y='SLA_Pencapaian_%', text='SLA_Pencapaian_%', title="SLA Total per Service Offering",
+                    traces=dict(texttemplate='%{text}%', textposition='outside'),
+                    layout=dict(
+                        height=600, 
+                        yaxis_range=[0, max(100, y_max * 1.25)], 
+                        xaxis=dict(fixedrange=True), 
+                        yaxis=dict(fixedrange=True), 
+                        dragmode=False, 
+                        margin=dict(t=50, b=50, l=20, r=20)
+                    )
                 )
                 st.plotly_chart(fig_sla_percent, use_container_width=True, config=chart_config)
 
@@ -496,6 +549,24 @@ def run():
             bottom3_max_breach['No'] = bottom3_max_breach['Time Breach'].rank(method='dense', ascending=False).astype(int)
             bottom3_max_breach = bottom3_max_breach[bottom3_max_breach['No'] <= 3]
 
+            top3_max_sorted = top3_min_max_breach.sort_values(by='No', kind='stable')
+            bottom3_max_sorted = bottom3_max_breach.sort_values(by='No', kind='stable')
+            export_sheets['Max Breach'] = [
+                report_table("Top 3 SLA Service", pd.DataFrame({
+                    'No': top3_max_sorted['No'],
+                    'Service Offering': top3_max_sorted[service_col],
+                    'Waktu Breach': top3_max_sorted['Time Breach (jam)'].map(format_hari_jam_menit),
+                    'SLA': top3_max_sorted['SLA Service (%)'].astype(str) + "%",
+                }), group_col='No', bold_cols=['Service Offering'], highlight_cols=['SLA']),
+                report_table("Bottom 3 SLA Service", pd.DataFrame({
+                    'No': bottom3_max_sorted['No'],
+                    'Service Offering': bottom3_max_sorted[service_col],
+                    'Waktu Breach': bottom3_max_sorted['Time Breach (jam)'].map(format_hari_jam_menit),
+                    'No Tiket': bottom3_max_sorted[tiket_col],
+                    'SLA': bottom3_max_sorted['SLA Service (%)'].astype(str) + "%",
+                }), group_col='No', bold_cols=['Service Offering'], highlight_cols=['SLA']),
+            ]
+
             html_top_max = '<table class="manual-sla-table"><thead><tr>'
             html_top_max += "<th>No</th><th>Service Offering</th><th>Waktu Breach</th><th>SLA</th></tr></thead><tbody>"
             for no in sorted(top3_min_max_breach['No'].unique()):
@@ -533,44 +604,65 @@ def run():
                 st.markdown(html_bottom_max, unsafe_allow_html=True)
 
             with col_s2_right:                
-                chart_data_max_breach = max_breach_df.sort_values(by=service_col, ascending=True)
-                fig_max_breach = px.bar(chart_data_max_breach, x=service_col, y='SLA Service (%)', text='SLA Service (%)', title="SLA Tiket Max Breach per Service Offering")
-                fig_max_breach.update_traces(texttemplate='%{text}%', textposition='outside')
+                chart_source_max = max_breach_df[[service_col, 'SLA Service (%)']].copy()
+                chart_source_max['Jumlah_Tiket'] = chart_source_max[service_col].map(all_tickets_df[service_col].value_counts())
+                chart_source_max['_sla_x_tiket'] = chart_source_max['SLA Service (%)'] * chart_source_max['Jumlah_Tiket']
+                chart_data_max_breach = top_n_with_others(
+                    chart_source_max.sort_values(by=service_col),
+                    service_col, 'SLA Service (%)', ascending=True, others_ratio=('_sla_x_tiket', 'Jumlah_Tiket')
+                )
                 y_max_2 = chart_data_max_breach['SLA Service (%)'].max()
-                fig_max_breach.update_layout(
-                    height=600, 
-                    yaxis_range=[0, max(100, y_max_2 * 1.25)], 
-                    xaxis=dict(fixedrange=True), 
-                    yaxis=dict(fixedrange=True), 
-                    dragmode=False, 
-                    margin=dict(t=50, b=50, l=20, r=20)
+                fig_max_breach = chart_figure(
+                    'bar', chart_data_max_breach, x=service_col, y='SLA Service (%)', text='SLA Service (%)', title="SLA Tiket Max Breach per Service Offering",
+                    traces=dict(texttemplate='%{text}%', textposition='outside'),
+                    layout=dict(
+                        height=600, 
+                        yaxis_range=[0, max(100, y_max_2 * 1.25)], 
+                        xaxis=dict(fixedrange=True), 
+                        yaxis=dict(fixedrange=True), 
+                        dragmode=False, 
+                        margin=dict(t=50, b=50, l=20, r=20)
+                    )
                 )
                 st.plotly_chart(fig_max_breach, use_container_width=True, config=chart_config)
 
-    def sla_status(row):
-        sla_val = row.get("SLA")
-        if not date_resolved_col or pd.isna(row.get(date_resolved_col)):
-            return "Open"
-        if pd.isna(sla_val):
-            return "Unknown"
-        if sla_val == 1:
-            return "Achieved"
-        elif sla_val == 0:
-            return "Not Achieved"
-        return "Unknown"
+        st.divider()
+        st.header("Distribusi Time Breach per Service Offering")
+        # Time Breach di halaman ini dalam hari; sketch memakai jam seperti Summary
+        breach_table = render_breach_distribution(
+            sketch_by_group(df[service_col], df['Time Breach'] * 24), key="incident_breach_dist"
+        )
+        if not breach_table.empty:
+            export_sheets['Distribusi Breach'] = [
+                report_table("Persentil Time Breach per Service Offering", breach_table, bold_cols=['Service Offering'])
+            ]
 
-    df["Status SLA"] = df.apply(sla_status, axis=1)
+    st.divider()
+    render_sla_risk(
+        df, date_created_col, date_resolved_col, 'Waktu SLA', service_col, log_tiket_col,
+        cal=sla_calendar, status_log=status_log, key="incident_sla_risk"
+    )
 
     st.divider()
     st.subheader("Hasil Kalkulasi")
-    st.dataframe(df)
-
-    excel_bytes = to_excel(df)
-    st.download_button(
-        "Download Hasil XLSX",
-        data=excel_bytes,
-        file_name="incident_hasil_kalkulasi.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    result_columns = file_columns + [c for c in df.columns if c not in file_columns]
+    paginated_table(df, key="incident_result", detail=lambda d: attach_free_text(d, free_text, result_columns))
+
+    # workbook hanya dibuat saat diminta, lalu dipakai ulang selama input tidak berubah
+    export_download(
+        "Hasil XLSX", key="incident_report",
+        signature=(
+            getattr(uploaded_file, "file_id", None) or (uploaded_file.name, uploaded_file.size),
+            fingerprint(sla_calendar),
+            sla_policy['key'],
+            fingerprint(status_log[0], sorted(status_log[1])) if status_log else None,
+            range_selection['start'], range_selection['end'],
+        ),
+        build=lambda: build_report_workbook(
+            list(export_sheets.items()),
+            [('Hasil Kalkulasi', attach_free_text(df, free_text, result_columns))]
+        ),
+        file_name="incident_hasil_kalkulasi.xlsx"
     )
 
 if __name__ == "__main__":
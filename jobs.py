@@ -0,0 +1,109 @@
+import streamlit as st
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+EXECUTOR_KEY = "_job_executor"
+
+class JobCancelled(Exception):
+    """Dilempar di dalam job saat pengguna menekan tombol batal."""
+
+def _session_executor():
+    """Satu executor (1 worker) per sesi browser, sehingga job antar sesi tidak saling antre."""
+    if EXECUTOR_KEY not in st.session_state:
+        st.session_state[EXECUTOR_KEY] = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dashboard-job")
+    return st.session_state[EXECUTOR_KEY]
+
+def _run(job, func, args, kwargs):
+    job['started'] = time.monotonic()
+    try:
+        return func(job, *args, **kwargs)
+    finally:
+        job['finished'] = time.monotonic()
+
+def submit_job(key, signature, func, *args, **kwargs):
+    """
+    Menjalankan func(job, *args) di background thread milik sesi dan menyimpannya di session_state[key].
+    Bila job dengan signature yang sama sudah ada (berjalan atau selesai), job itu yang dikembalikan,
+    sehingga rerun karena klik widget tidak memulai ulang proses. Signature berbeda membatalkan job lama.
+    """
+    job = st.session_state.get(key)
+    if job is not None and job['signature'] == signature:
+        return job
+    if job is not None:
+        job['cancel'].set()
+
+    job = {
+        'signature': signature,
+        'cancel': threading.Event(),
+        'progress': {'done': 0, 'total': 1, 'label': "Menunggu giliran...", 'files': 0, 'rows': 0},
+        'started': None,
+        'finished': None,
+    }
+    job['future'] = _session_executor().submit(_run, job, func, args, kwargs)
+    st.session_state[key] = job
+    return job
+
+def clear_job(key):
+    """Membatalkan (bila masih berjalan) dan melupakan job, agar rerun berikutnya memulai job baru."""
+    job = st.session_state.pop(key, None)
+    if job is not None:
+        job['cancel'].set()
+
+def report_progress(job, done, total, label, files=0, rows=0):
+    """
+    Dipanggil dari dalam job untuk memperbarui progres. files/rows adalah penambahan.
+    Melempar JobCancelled bila pengguna sudah meminta pembatalan.
+    """
+    if job['cancel'].is_set():
+        raise JobCancelled()
+    progress = job['progress']
+    progress['files'] += files
+    progress['rows'] += rows
+    progress.update(done=done, total=max(total, 1), label=label)
+
+def job_status(job):
+    """'running', 'done', 'cancelled' atau 'failed'."""
+    future = job['future']
+    if not future.done():
+        return 'running'
+    if future.cancelled():
+        return 'cancelled'
+    exc = future.exception()
+    if exc is None:
+        return 'done'
+    return 'cancelled' if isinstance(exc, JobCancelled) else 'failed'
+
+def job_eta(job):
+    """Perkiraan sisa waktu (detik) dari laju langkah yang sudah selesai, None bila belum bisa dihitung."""
+    progress = job['progress']
+    if not job['started'] or progress['done'] <= 0:
+        return None
+    elapsed = time.monotonic() - job['started']
+    return elapsed / progress['done'] * (progress['total'] - progress['done'])
+
+def render_job_progress(key, poll_seconds=1.0):
+    """
+    Panel progres yang diperbarui sendiri (st.fragment) selama job berjalan, lengkap dengan tombol batal.
+    Saat job selesai, seluruh halaman di-rerun agar hasilnya dirender.
+    """
+    @st.fragment(run_every=poll_seconds)
+    def _panel():
+        job = st.session_state.get(key)
+        if job is None or job_status(job) != 'running':
+            st.rerun()
+
+        progress = job['progress']
+        st.progress(min(progress['done'] / progress['total'], 1.0), text=progress['label'])
+        eta = job_eta(job)
+        eta_text = f"{int(eta // 60)}m {int(eta % 60)}s" if eta is not None else "menghitung..."
+        st.caption(
+            f"File diproses: **{progress['files']}** — baris: **{progress['rows']:,}** — "
+            f"perkiraan sisa waktu: **{eta_text}**"
+        )
+        if job['cancel'].is_set():
+            st.caption("Membatalkan setelah langkah yang sedang berjalan selesai...")
+        elif st.button("Batalkan proses", key=f"{key}_cancel"):
+            job['cancel'].set()
+
+    _panel()
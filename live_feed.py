@@ -0,0 +1,326 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import io
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from schema import apply_schema, TICKET_NO, CREATED, RESOLVED, SERVICE
+from sla_clock import sla_clock_selector
+from sla_risk import compute_sla_risk, RISK_BUCKETS
+from result_cache import fingerprint
+from summary import process_sla_dataframe
+from sla_policy import sla_policy_status
+
+DEFAULT_FEED_DIR = os.environ.get("SLA_FEED_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "feed")
+DEFAULT_REFRESH_SECONDS = int(os.environ.get("SLA_FEED_REFRESH_SECONDS", "5"))
+FEED_SUFFIXES = (".jsonl", ".csv")
+RECENT_EVENTS = 50
+SLA_STATES = ["Achieved", "Breached", "Open", "Unknown"]
+
+def new_feed_store(directory):
+    """
+    State ingestion untuk satu folder feed:
+    - files: posisi baca (offset byte) dan header CSV per file
+    - tickets: No. Tiket -> kontribusi terakhirnya ke agregat (untuk upsert)
+    - counts/service_counts: agregat (tipe, bulan|service, status SLA) -> jumlah tiket
+    - open_tickets: data minimal tiket open untuk proyeksi SLA at-risk
+    """
+    return {
+        'directory': directory,
+        'lock': threading.Lock(),
+        'files': {},
+        'tickets': {},
+        'counts': Counter(),
+        'service_counts': Counter(),
+        'open_tickets': {},
+        'recent': deque(maxlen=RECENT_EVENTS),
+        'errors': deque(maxlen=20),
+        'events': 0,
+        'updates': 0,
+        'rejected': 0,
+        'last_poll': None,
+        'last_batch_seconds': 0.0,
+    }
+
+def feed_directories(root=DEFAULT_FEED_DIR):
+    """
+    Folder feed yang boleh dibaca: folder SLA_FEED_DIR sendiri dan subfolder langsungnya.
+    Path di-resolve (termasuk symlink); subfolder yang mengarah ke luar root diabaikan.
+    Mengembalikan {label: path absolut}.
+    """
+    root = os.path.realpath(root)
+    if not os.path.isdir(root):
+        return {}
+    choices = {".": root}
+    for entry in sorted(os.scandir(root), key=lambda e: e.name):
+        if not entry.is_dir() or entry.name.startswith("."):
+            continue
+        path = os.path.realpath(entry.path)
+        if os.path.commonpath([root, path]) == root:
+            choices[entry.name] = path
+    return choices
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def feed_store(directory, settings_key):
+    """Store dipakai bersama semua sesi yang membuka folder dan mode jam SLA yang sama."""
+    return new_feed_store(directory)
+
+def _read_new_lines(path, state):
+    """Baris lengkap yang ditambahkan sejak poll terakhir; baris yang belum selesai ditulis ditunda."""
+    size = os.path.getsize(path)
+    if size < state['offset']:
+        # file diganti/terpotong: baca ulang dari awal
+        state.update(offset=0, header=None)
+    if size == state['offset']:
+        return []
+    with open(path, "rb") as f:
+        f.seek(state['offset'])
+        data = f.read(size - state['offset'])
+    end = data.rfind(b"\n")
+    if end < 0:
+        return []
+    state['offset'] += end + 1
+    return data[:end].decode("utf-8", errors="replace").splitlines()
+
+def _parse_lines(store, path, state, lines):
+    if path.endswith(".jsonl"):
+        records = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                store['rejected'] += 1
+                store['errors'].append(f"{os.path.basename(path)}: JSON tidak valid ({e.msg})")
+        return pd.DataFrame.from_records(records) if records else None
+
+    if state['header'] is None:
+        if not lines:
+            return None
+        state['header'] = lines[0]
+        state['sep'] = ";" if lines[0].count(";") > lines[0].count(",") else ","
+        lines = lines[1:]
+    if not lines:
+        return None
+    return pd.read_csv(io.StringIO("\n".join([state['header'], *lines])), sep=state['sep'], dtype=str)
+
+def _sla_state(resolved, sla):
+    if pd.isna(resolved):
+        return "Open"
+    if sla == 1:
+        return "Achieved"
+    if sla == 0:
+        return "Breached"
+    return "Unknown"
+
+def _apply_batch(store, batch, sla_policy, cal):
+    """Upsert satu batch event (kolom sudah baku): SLA dihitung hanya untuk baris baru, agregat diperbarui per tiket."""
+    if TICKET_NO not in batch.columns:
+        store['rejected'] += len(batch)
+        store['errors'].append("Event tanpa kolom No. Tiket diabaikan.")
+        return
+    batch = batch.loc[batch[TICKET_NO].notna()].copy()
+    batch[TICKET_NO] = batch[TICKET_NO].astype(str).str.strip()
+    batch = batch.drop_duplicates(subset=TICKET_NO, keep='last')
+    is_incident = batch[TICKET_NO].str.upper().str.startswith("INC").to_numpy()
+
+    for type_name, mask in [("Incident", is_incident), ("Request", ~is_incident)]:
+        part = batch[mask]
+        if part.empty:
+            continue
+        messages = []
+        processed = process_sla_dataframe(part, type_name, sla_policy, cal, messages=messages)
+        for _, text in messages:
+            store['errors'].append(text)
+        store['rejected'] += len(part) - len(processed)
+        if 'SLA' not in processed.columns:
+            continue
+
+        n = len(processed)
+        resolved = processed[RESOLVED].to_numpy() if RESOLVED in processed.columns else np.full(n, pd.NaT)
+        services = processed[SERVICE].fillna("Unknown").astype(str).to_numpy() if SERVICE in processed.columns else np.full(n, "Unknown")
+        for ticket, created, closed, month, service, sla, hours in zip(
+            processed[TICKET_NO].to_numpy(), processed[CREATED].to_numpy(), resolved,
+            processed['Month'].to_numpy(), services, processed['SLA'].to_numpy(), processed['Target SLA (jam)'].to_numpy()
+        ):
+            state = _sla_state(closed, sla)
+            contribution = ((type_name, month, state), (type_name, service, state))
+            previous = store['tickets'].get(ticket)
+            if previous is not None:
+                store['updates'] += 1
+                for counter, key in zip((store['counts'], store['service_counts']), previous):
+                    counter[key] -= 1
+                    if counter[key] <= 0:
+                        del counter[key]
+            store['tickets'][ticket] = contribution
+            store['counts'][contribution[0]] += 1
+            store['service_counts'][contribution[1]] += 1
+
+            if state == "Open":
+                store['open_tickets'][ticket] = (type_name, created, hours, service)
+            else:
+                store['open_tickets'].pop(ticket, None)
+            store['recent'].append((ticket, type_name, service, state))
+        store['events'] += n
+
+def poll_feed(store, sla_policy, cal=None):
+    """
+    Membaca event baru dari semua file .jsonl/.csv di folder feed lalu menerapkannya ke store.
+    Biaya per poll sebanding dengan jumlah event baru, bukan dengan histori yang sudah dibaca.
+    Mengembalikan jumlah baris event baru.
+    """
+    with store['lock']:
+        directory = store['directory']
+        names = sorted(n for n in os.listdir(directory) if n.endswith(FEED_SUFFIXES))
+        frames = []
+        for name in names:
+            path = os.path.join(directory, name)
+            state = store['files'].setdefault(path, {'offset': 0, 'header': None, 'sep': ","})
+            try:
+                lines = _read_new_lines(path, state)
+                frame = _parse_lines(store, path, state, lines) if lines else None
+            except (OSError, ValueError) as e:
+                store['errors'].append(f"{name}: {e}")
+                continue
+            if frame is not None and not frame.empty:
+                # alias kolom bisa berbeda antar file, samakan sebelum digabung
+                frames.append(apply_schema(frame))
+
+        start = time.perf_counter()
+        rows = 0
+        if frames:
+            batch = pd.concat(frames, ignore_index=True)
+            rows = len(batch)
+            _apply_batch(store, batch, sla_policy, cal)
+        store['last_batch_seconds'] = time.perf_counter() - start
+        store['last_poll'] = pd.Timestamp.now()
+        return rows
+
+def reset_feed(store):
+    """Melupakan semua posisi baca dan agregat, sehingga folder dibaca ulang dari awal."""
+    with store['lock']:
+        fresh = new_feed_store(store['directory'])
+        fresh.pop('lock')
+        store.update(fresh)
+
+def feed_summary(store):
+    """Agregat store sebagai DataFrame (tipe, bulan, status SLA -> jumlah) untuk ditampilkan."""
+    with store['lock']:
+        counts = list(store['counts'].items())
+    if not counts:
+        return pd.DataFrame(columns=['Tipe', 'Bulan', *SLA_STATES])
+    df = pd.DataFrame([(t, m, s, c) for (t, m, s), c in counts], columns=['Tipe', 'Bulan', 'Status', 'Jumlah'])
+    table = df.pivot_table(index=['Tipe', 'Bulan'], columns='Status', values='Jumlah', aggfunc='sum', fill_value=0)
+    return table.reindex(columns=SLA_STATES, fill_value=0).reset_index()
+
+def _open_risk(store, cal):
+    with store['lock']:
+        open_items = list(store['open_tickets'].values())
+    if not open_items:
+        return pd.Series(dtype=int)
+    types, created, hours, services = zip(*open_items)
+    risk = compute_sla_risk(pd.Series(created), pd.Series(hours, dtype='float64'), pd.Timestamp.now(), cal)
+    return risk['Risiko SLA'].value_counts()
+
+def render_feed(store, cal=None):
+    """Metrik, agregat bulanan, service dengan breach terbanyak, risiko tiket open dan event terakhir."""
+    summary = feed_summary(store)
+    totals = summary.groupby('Tipe')[SLA_STATES].sum() if not summary.empty else pd.DataFrame(columns=SLA_STATES)
+
+    cols = st.columns(4)
+    cols[0].metric("Event diproses", f"{store['events']:,}", f"{store['updates']:,} update")
+    cols[1].metric("Tiket unik", f"{len(store['tickets']):,}")
+    cols[2].metric("Tiket open", f"{len(store['open_tickets']):,}")
+    cols[3].metric("Event ditolak", f"{store['rejected']:,}")
+
+    cols = st.columns(2)
+    for col, type_name in zip(cols, ["Incident", "Request"]):
+        if type_name in totals.index:
+            row = totals.loc[type_name]
+            closed = row['Achieved'] + row['Breached']
+            percent = row['Achieved'] / closed * 100 if closed else 0.0
+            col.metric(f"SLA {type_name}", f"{percent:.1f}%", f"{int(row['Achieved']):,}/{int(closed):,} tercapai")
+        else:
+            col.metric(f"SLA {type_name}", "-")
+
+    last_poll = store['last_poll'].strftime('%H:%M:%S') if store['last_poll'] is not None else "-"
+    st.caption(f"Poll terakhir {last_poll} — batch terakhir diproses dalam {store['last_batch_seconds'] * 1000:.0f} ms.")
+
+    left, right = st.columns(2)
+    with left:
+        st.markdown("**Rekap per Bulan**")
+        st.dataframe(summary, use_container_width=True, hide_index=True)
+    with right:
+        st.markdown("**Risiko SLA Tiket Open**")
+        risk = _open_risk(store, cal)
+        st.dataframe(
+            risk.reindex(RISK_BUCKETS + ["Tanpa Target"], fill_value=0).rename_axis('Risiko').reset_index(name='Jumlah'),
+            use_container_width=True, hide_index=True
+        )
+
+        with store['lock']:
+            breached = [(t, s, c) for (t, s, state), c in store['service_counts'].items() if state == "Breached"]
+        st.markdown("**Service dengan Breach Terbanyak**")
+        if breached:
+            top = pd.DataFrame(breached, columns=['Tipe', 'Service', 'Breach']).nlargest(10, 'Breach')
+            st.dataframe(top, use_container_width=True, hide_index=True)
+        else:
+            st.caption("Belum ada tiket breach.")
+
+    with st.expander("Event terakhir"):
+        with store['lock']:
+            recent = list(store['recent'])[::-1]
+        st.dataframe(pd.DataFrame(recent, columns=['No. Tiket', 'Tipe', 'Service', 'Status SLA']), use_container_width=True, hide_index=True)
+    if store['errors']:
+        with st.expander(f"⚠️ Peringatan feed ({len(store['errors'])})"):
+            for text in list(store['errors'])[::-1]:
+                st.write(text)
+
+def run():
+    st.title("📡 Live Feed Tiket")
+    st.caption(
+        "Membaca event tiket dari file .jsonl/.csv di folder feed secara bertahap. "
+        "Tiket dengan No. Tiket yang sama diperbarui (upsert); hanya event baru yang dihitung SLA-nya."
+    )
+
+    # folder dibatasi ke SLA_FEED_DIR: pengguna dashboard tidak boleh membaca folder lain di server
+    directories = feed_directories()
+    col_dir, col_interval = st.columns([3, 1])
+    with col_dir:
+        if directories:
+            choice = st.selectbox(
+                "Folder feed", list(directories),
+                format_func=lambda name: f"{DEFAULT_FEED_DIR} (utama)" if name == "." else name,
+                key="live_feed_dir"
+            )
+    with col_interval:
+        interval = st.number_input("Refresh (detik)", min_value=1, max_value=300, value=DEFAULT_REFRESH_SECONDS, step=1, key="live_feed_interval")
+    sla_policy = sla_policy_status()
+    if sla_policy is None:
+        return
+    sla_calendar = sla_clock_selector("live_sla_clock")
+
+    if not directories:
+        st.info(
+            f"Folder '{DEFAULT_FEED_DIR}' belum ada. Buat folder tersebut (atau atur SLA_FEED_DIR) "
+            f"lalu letakkan file .jsonl/.csv event tiket di dalamnya atau di subfoldernya."
+        )
+        return
+
+    store = feed_store(directories[choice], fingerprint(sla_policy['key'], sla_calendar))
+    if st.button("Baca ulang dari awal", key="live_feed_reset"):
+        reset_feed(store)
+
+    @st.fragment(run_every=int(interval))
+    def _live_panel():
+        poll_feed(store, sla_policy, sla_calendar)
+        render_feed(store, sla_calendar)
+
+    _live_panel()
+
+if __name__ == "__main__":
+    run()
@@ -14,7 +14,7 @@ st.markdown(
 
 col1, col2, col3 = st.columns([1, 2, 1])
 with col2:
-    menu = st.selectbox("Choose one page below:", ["Home", "Reqitem", "Incident", "Summary"])
+    menu = st.selectbox("Choose one page below:", ["Home", "Reqitem", "Incident", "Summary", "Live Feed"])
 
 if menu == "Home":
     st.markdown(
@@ -38,3 +38,7 @@ elif menu == "Incident":
 elif menu == "Summary":
     summary = importlib.import_module("summary")
     summary.run()
+
+elif menu == "Live Feed":
+    live_feed = importlib.import_module("live_feed")
+    live_feed.run()
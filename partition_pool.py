@@ -0,0 +1,172 @@
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+import atexit
+import multiprocessing as mp
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# 0 = otomatis (jumlah core, maksimal 8); 1 = selalu serial di proses Streamlit
+SLA_WORKERS = int(os.environ.get("SLA_WORKERS", "0"))
+MAX_AUTO_WORKERS = 8
+# /dev/shm hanya dipakai bila cukup lega (Docker default hanya 64 MB)
+MIN_SHM_FREE_MB = 1024
+
+def _default_spool_root():
+    try:
+        if shutil.disk_usage("/dev/shm").free >= MIN_SHM_FREE_MB * 2**20:
+            return "/dev/shm"
+    except OSError:
+        pass
+    return tempfile.gettempdir()
+
+# hasil worker ditulis sebagai file Arrow di sini lalu di-mmap oleh proses utama; /dev/shm = RAM bersama
+SPOOL_DIR = os.environ.get("SLA_SPOOL_DIR") or os.path.join(_default_spool_root(), "sla-dashboard")
+
+_POOL = {'executor': None, 'workers': 0}
+_POOL_LOCK = threading.Lock()
+
+def worker_count(requested=None):
+    """Jumlah proses worker yang dipakai: SLA_WORKERS, atau jumlah core (maks. MAX_AUTO_WORKERS) bila 0."""
+    requested = SLA_WORKERS if requested is None else requested
+    if requested > 0:
+        return requested
+    return max(1, min(os.cpu_count() or 1, MAX_AUTO_WORKERS))
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+def _sweep_stale_spools():
+    """Menghapus folder spool milik proses dashboard yang sudah mati (mis. server di-kill)."""
+    if not os.path.isdir(SPOOL_DIR):
+        return
+    for name in os.listdir(SPOOL_DIR):
+        pid = name.split("-", 1)[0]
+        if pid.isdigit() and int(pid) != os.getpid() and not _pid_alive(int(pid)):
+            shutil.rmtree(os.path.join(SPOOL_DIR, name), ignore_errors=True)
+
+def _remove_own_spools():
+    if os.path.isdir(SPOOL_DIR):
+        for name in os.listdir(SPOOL_DIR):
+            if name.startswith(f"{os.getpid()}-"):
+                shutil.rmtree(os.path.join(SPOOL_DIR, name), ignore_errors=True)
+
+atexit.register(_remove_own_spools)
+
+@contextmanager
+def spool_directory():
+    """
+    Folder spool sementara untuk satu job (mis. satu proses Summary milik sebuah sesi).
+    Dihapus saat job selesai, gagal atau dibatalkan; file yang masih di-mmap tetap terbaca
+    karena mapping tidak ikut hilang saat file di-unlink. Sisa folder dari proses yang mati
+    dibersihkan saat job berikutnya dimulai, dan folder proses ini saat proses berhenti.
+    """
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+    _sweep_stale_spools()
+    path = tempfile.mkdtemp(prefix=f"{os.getpid()}-", dir=SPOOL_DIR)
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+def pack_frame(df, spool=None):
+    """
+    Mengemas DataFrame hasil worker dalam format kolom Arrow, bukan pickle objek per sel.
+    Dengan spool (lihat spool_directory) frame ditulis sebagai file Arrow IPC dan yang dikirim
+    hanya path-nya; tanpa spool dikirim sebagai buffer stream Arrow IPC. Bila folder spool tidak
+    cukup lega atau penulisan gagal (mis. /dev/shm penuh), frame juga dikirim sebagai buffer stream.
+    Kolom object campuran (mis. SLA berisi 1/0/"WP") tidak bisa dikonversi; frame seperti itu dikirim apa adanya.
+    """
+    if pa is None:
+        return ('pickle', df)
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return ('pickle', df)
+    if spool is not None and _spool_has_room(spool, table.nbytes):
+        path = os.path.join(spool, f"{uuid.uuid4().hex}.arrow")
+        try:
+            with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            return ('mmap', path)
+        except OSError:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return ('arrow', sink.getvalue())
+
+def _spool_has_room(spool, nbytes):
+    # cadangan 10% + 16 MB untuk metadata IPC dan file worker lain yang ditulis bersamaan
+    try:
+        return shutil.disk_usage(spool).free >= nbytes * 1.1 + 16 * 2**20
+    except OSError:
+        return False
+
+def unpack_frame(packed):
+    """
+    Kebalikan pack_frame. File spool di-mmap tanpa disalin: kolom string (Arrow) langsung memakai
+    halaman file yang di-mmap; hanya kolom numerik/tanggal yang berisi null yang dibuat ulang oleh pandas.
+    File langsung di-unlink, memorinya dilepas saat frame tidak dipakai lagi.
+    """
+    kind, payload = packed
+    if kind == 'mmap':
+        table = pa.ipc.open_file(pa.memory_map(payload)).read_all()
+        try:
+            os.unlink(payload)
+        except OSError:
+            pass  # Windows: file yang masih di-mmap ikut terhapus bersama folder spool
+        return table.to_pandas(split_blocks=True)
+    if kind == 'arrow':
+        return pa.ipc.open_stream(payload).read_all().to_pandas()
+    return payload
+
+def process_pool(workers):
+    """
+    Process pool bersama (spawn) yang dipakai ulang antar job, sehingga biaya start worker
+    hanya dibayar sekali. Pool dibuat ulang bila jumlah worker berubah.
+    """
+    with _POOL_LOCK:
+        if _POOL['executor'] is None or _POOL['workers'] != workers:
+            if _POOL['executor'] is not None:
+                _POOL['executor'].shutdown(wait=False, cancel_futures=True)
+            _POOL['executor'] = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"))
+            _POOL['workers'] = workers
+        return _POOL['executor']
+
+def map_partitions(func, partitions, workers=None, on_done=None):
+    """
+    Menjalankan func(*args) untuk setiap partisi (tuple argumen) di process pool.
+    Hasil dikembalikan sesuai urutan partisi, bukan urutan selesai. on_done(posisi, hasil)
+    (opsional) dipanggil di proses ini setiap kali satu partisi selesai, dan nilai kembaliannya
+    yang disimpan sebagai hasil partisi (mis. frame yang sudah di-unpack), sehingga hasil mentah
+    tidak ditahan sampai semua partisi selesai. Exception dari on_done membatalkan partisi yang belum berjalan.
+    """
+    executor = process_pool(worker_count(workers))
+    futures = {executor.submit(func, *args): pos for pos, args in enumerate(partitions)}
+    results = [None] * len(partitions)
+    try:
+        for future in as_completed(futures):
+            pos = futures[future]
+            result = future.result()
+            results[pos] = on_done(pos, result) if on_done is not None else result
+    finally:
+        for future in futures:
+            future.cancel()
+    return results
@@ -0,0 +1,200 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import io
+import gzip
+import xlsxwriter
+
+# Warna disamakan dengan get_table_css() (.manual-sla-table)
+HEADER_COLOR = "#305496"
+GROUP_COLOR = "#D9D9D9"
+ROW_COLOR = "#E9E9E9"
+GRID_COLOR = "#FFFFFF"
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_MIME = "text/csv"
+GZIP_MIME = "application/gzip"
+EXCEL_MAX_ROWS = 1_048_576
+EXCEL_EPOCH = np.datetime64("1899-12-30T00:00:00", "ns")
+DATETIME_FORMAT = "dd/mm/yyyy hh:mm"
+MAX_COL_WIDTH = 60
+DETAIL_CHUNK_ROWS = 20_000
+CSV_CHUNK_ROWS = 50_000
+
+def report_table(title, df, group_col=None, bold_cols=(), highlight_cols=()):
+    """
+    Deskripsi satu tabel laporan untuk sheet ringkasan.
+    group_col: kolom pengelompokan (No/Type) berwarna abu gelap, nilainya hanya ditulis di baris pertama grup.
+    bold_cols: kolom yang ditebalkan (mis. Service Offering). highlight_cols: kolom berwarna seperti kolom grup (mis. SLA).
+    """
+    return {'title': title, 'df': df, 'group_col': group_col, 'bold_cols': tuple(bold_cols), 'highlight_cols': tuple(highlight_cols)}
+
+def _formats(wb):
+    base = {'border': 1, 'border_color': GRID_COLOR, 'valign': 'vcenter', 'font_size': 10}
+    return {
+        'title': wb.add_format({'bold': True, 'font_size': 12}),
+        'header': wb.add_format({**base, 'bold': True, 'font_color': 'white', 'bg_color': HEADER_COLOR, 'align': 'center', 'text_wrap': True}),
+        'cell': wb.add_format({**base, 'bg_color': ROW_COLOR}),
+        'center': wb.add_format({**base, 'bg_color': ROW_COLOR, 'align': 'center'}),
+        'bold': wb.add_format({**base, 'bg_color': ROW_COLOR, 'bold': True}),
+        'group': wb.add_format({**base, 'bg_color': GROUP_COLOR, 'bold': True, 'align': 'center'}),
+        'datetime': wb.add_format({'num_format': DATETIME_FORMAT}),
+        'detail_header': wb.add_format({'bold': True, 'font_color': 'white', 'bg_color': HEADER_COLOR, 'border': 1, 'border_color': GRID_COLOR}),
+    }
+
+def _write_value(ws, row, col, value, fmt=None):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        ws.write_blank(row, col, None, fmt)
+    elif isinstance(value, (bool, np.bool_)):
+        ws.write_boolean(row, col, bool(value), fmt)
+    elif isinstance(value, (int, float, np.integer, np.floating)):
+        ws.write_number(row, col, float(value), fmt)
+    else:
+        ws.write_string(row, col, str(value), fmt)
+
+def _write_summary_sheet(ws, tables, fmt):
+    widths = {}
+    row = 0
+    for table in tables:
+        df = table['df']
+        columns = [str(c) for c in df.columns]
+        ws.write_string(row, 0, table['title'], fmt['title'])
+        row += 1
+        for c, name in enumerate(columns):
+            ws.write_string(row, c, name, fmt['header'])
+            widths[c] = max(widths.get(c, 0), len(name))
+        row += 1
+
+        if df.empty:
+            ws.write_string(row, 0, "Tidak ada data untuk ditampilkan.", fmt['cell'])
+            row += 1
+
+        col_formats = []
+        for name, series in zip(columns, (df.iloc[:, i] for i in range(df.shape[1]))):
+            if name == table['group_col'] or name in table['highlight_cols']:
+                col_formats.append(fmt['group'])
+            elif name in table['bold_cols']:
+                col_formats.append(fmt['bold'])
+            elif pd.api.types.is_numeric_dtype(series):
+                col_formats.append(fmt['center'])
+            else:
+                col_formats.append(fmt['cell'])
+
+        previous_group = object()
+        for values in df.itertuples(index=False, name=None):
+            for c, value in enumerate(values):
+                if columns[c] == table['group_col']:
+                    # pengganti rowspan: merge_range tidak didukung pada mode constant_memory
+                    if value == previous_group:
+                        ws.write_blank(row, c, None, col_formats[c])
+                        continue
+                    previous_group = value
+                _write_value(ws, row, c, value, col_formats[c])
+                widths[c] = max(widths.get(c, 0), len(str(value)))
+            row += 1
+        row += 1  # satu baris kosong antar tabel
+
+    for c, width in widths.items():
+        ws.set_column(c, c, min(width + 2, MAX_COL_WIDTH))
+
+def _column_writer(series):
+    """Mengubah satu kolom menjadi (jenis, nilai per baris) sekali jalan, tanpa konversi per sel."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = series.dt.tz_localize(None) if getattr(series.dt, 'tz', None) is not None else series
+        serial = (values.to_numpy(dtype="datetime64[ns]") - EXCEL_EPOCH) / np.timedelta64(1, "D")
+        return 'datetime', serial.tolist()
+    if pd.api.types.is_bool_dtype(series):
+        return 'number', series.astype(float).tolist()
+    if pd.api.types.is_numeric_dtype(series):
+        return 'number', series.astype(float).tolist()
+    return 'string', series.astype(str).where(series.notna(), None).tolist()
+
+def _write_detail_sheet(ws, df, fmt, start, stop):
+    columns = [str(c) for c in df.columns]
+    for c, name in enumerate(columns):
+        ws.write_string(0, c, name, fmt['detail_header'])
+        ws.set_column(c, c, min(max(len(name) + 2, 12), MAX_COL_WIDTH))
+    ws.freeze_panes(1, 0)
+    ws.autofilter(0, 0, max(stop - start, 1), max(len(columns) - 1, 0))
+
+    for c in range(len(columns)):
+        if pd.api.types.is_datetime64_any_dtype(df.iloc[:, c]):
+            ws.set_column(c, c, 17, fmt['datetime'])
+
+    # konversi per potongan agar objek Python sementara tidak sebanyak seluruh sheet
+    row = 1
+    for chunk_start in range(start, stop, DETAIL_CHUNK_ROWS):
+        chunk = df.iloc[chunk_start:min(chunk_start + DETAIL_CHUNK_ROWS, stop)]
+        writers = [(c, *_column_writer(chunk.iloc[:, c])) for c in range(len(columns))]
+        for r in range(len(chunk)):
+            for c, kind, values in writers:
+                value = values[r]
+                if value is None or value != value:  # None / NaN / NaT
+                    continue
+                if kind == 'string':
+                    ws.write_string(row, c, value)
+                elif kind == 'datetime':
+                    ws.write_number(row, c, value, fmt['datetime'])
+                else:
+                    ws.write_number(row, c, value)
+            row += 1
+
+def build_report_workbook(summary_sheets, detail_sheets=()):
+    """
+    Menulis laporan xlsx dalam satu kali jalan dengan mode constant_memory xlsxwriter:
+    setiap baris langsung di-flush ke file sementara, jadi sheet detail ratusan ribu baris
+    tidak menahan seluruh sel di memori.
+    summary_sheets: [(nama_sheet, [report_table(...), ...])], detail_sheets: [(nama_sheet, DataFrame)].
+    Sheet detail yang melebihi batas baris Excel dipecah menjadi beberapa sheet.
+    Mengembalikan bytes file xlsx.
+    """
+    output = io.BytesIO()
+    wb = xlsxwriter.Workbook(output, {'constant_memory': True, 'strings_to_urls': False})
+    fmt = _formats(wb)
+
+    for name, tables in summary_sheets:
+        _write_summary_sheet(wb.add_worksheet(name[:31]), tables, fmt)
+
+    per_sheet = EXCEL_MAX_ROWS - 1
+    for name, df in detail_sheets:
+        for part, start in enumerate(range(0, max(len(df), 1), per_sheet)):
+            sheet_name = name[:31] if part == 0 else f"{name[:26]} ({part + 1})"
+            _write_detail_sheet(wb.add_worksheet(sheet_name), df, fmt, start, min(start + per_sheet, len(df)))
+
+    wb.close()
+    return output.getvalue()
+
+def iter_csv_chunks(df, chunk_rows=CSV_CHUNK_ROWS, **to_csv_kwargs):
+    """Menghasilkan teks CSV per potongan baris; header hanya pada potongan pertama."""
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(header=(start == 0), **to_csv_kwargs)
+
+def build_csv(df, compress=False, chunk_rows=CSV_CHUNK_ROWS, **to_csv_kwargs):
+    """
+    CSV (UTF-8) dari DataFrame, ditulis per potongan sehingga tidak ada string CSV utuh
+    di samping hasil bytes-nya. compress=True menghasilkan .csv.gz.
+    """
+    output = io.BytesIO()
+    stream = gzip.GzipFile(fileobj=output, mode="wb", compresslevel=6, mtime=0) if compress else output
+    for text in iter_csv_chunks(df, chunk_rows, **to_csv_kwargs):
+        stream.write(text.encode("utf-8"))
+    if compress:
+        stream.close()
+    return output.getvalue()
+
+def export_download(label, key, signature, build, file_name, mime=XLSX_MIME):
+    """
+    Tombol unduh yang file-nya baru dibuat saat diminta.
+    build() dipanggil sekali per signature; hasilnya disimpan di session_state
+    sehingga rerun berikutnya tidak membangun file ulang.
+    """
+    state_key = f"{key}_export"
+    cached = st.session_state.get(state_key)
+    if cached is None or cached[0] != signature:
+        if st.button(f"Siapkan {label}", key=f"{key}_prepare"):
+            with st.spinner(f"Menyiapkan {label}..."):
+                st.session_state[state_key] = (signature, build())
+            cached = st.session_state[state_key]
+        else:
+            return
+    st.download_button(f"Download {label}", data=cached[1], file_name=file_name, mime=mime, key=f"{key}_download")
@@ -0,0 +1,95 @@
+import streamlit as st
+import plotly.io as pio
+import gzip
+import json
+import os
+import re
+from datetime import datetime
+
+SNAPSHOT_DIR = os.environ.get("SLA_SNAPSHOT_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots")
+SNAPSHOT_SUFFIX = ".json.gz"
+SNAPSHOT_FORMAT = 1
+
+def new_snapshot():
+    """Bundle kosong untuk menampung hasil agregasi satu laporan."""
+    return {'format': SNAPSHOT_FORMAT, 'meta': {}, 'metrics': {}, 'figures': {}, 'html': {}, 'notes': {}}
+
+def _slug(text):
+    return re.sub(r'[^0-9A-Za-z]+', '-', str(text)).strip('-')[:60] or "snapshot"
+
+def save_snapshot(bundle, title):
+    """
+    Menyimpan bundle sebagai JSON ter-gzip. Figure Plotly disimpan sebagai spesifikasi JSON,
+    tabel sebagai HTML jadi, sehingga memuat ulang tidak butuh data tiket sama sekali.
+    Mengembalikan path file.
+    """
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    created = datetime.now()
+    payload = {
+        **bundle,
+        'meta': {**bundle['meta'], 'title': title, 'created_at': created.isoformat(timespec='seconds')},
+        'figures': {name: fig.to_json() for name, fig in bundle['figures'].items() if fig is not None},
+    }
+    path = os.path.join(SNAPSHOT_DIR, f"{created:%Y%m%d-%H%M%S}_{_slug(title)}{SNAPSHOT_SUFFIX}")
+    tmp = path + ".tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"), default=str)
+    os.replace(tmp, path)
+    return path
+
+def list_snapshots():
+    """Daftar file snapshot, terbaru lebih dulu."""
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return []
+    names = [n for n in os.listdir(SNAPSHOT_DIR) if n.endswith(SNAPSHOT_SUFFIX)]
+    return [os.path.join(SNAPSHOT_DIR, n) for n in sorted(names, reverse=True)]
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _read_snapshot(path, mtime):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+def load_snapshot(path):
+    """Membaca snapshot; figure dikembalikan sebagai objek Plotly siap render."""
+    payload = _read_snapshot(path, os.path.getmtime(path))
+    return {**payload, 'figures': {name: pio.from_json(spec) for name, spec in payload['figures'].items()}}
+
+def snapshot_label(path):
+    name = os.path.basename(path)[:-len(SNAPSHOT_SUFFIX)]
+    stamp, _, slug = name.partition("_")
+    try:
+        stamp = datetime.strptime(stamp, "%Y%m%d-%H%M%S").strftime("%d/%m/%Y %H:%M")
+    except ValueError:
+        pass
+    return f"{stamp} — {slug.replace('-', ' ')}"
+
+def snapshot_save_panel(bundle, default_title, key, finalize=None):
+    """
+    Form kecil untuk menyimpan bundle laporan yang sedang ditampilkan.
+    finalize(bundle) (opsional) dipanggil hanya saat menyimpan, untuk bagian yang mahal
+    dan tidak perlu dihitung di setiap rerun.
+    """
+    with st.expander("💾 Simpan Snapshot Laporan"):
+        title = st.text_input("Judul snapshot", value=default_title, key=f"{key}_title")
+        if st.button("Simpan snapshot", key=f"{key}_save"):
+            try:
+                if finalize is not None:
+                    finalize(bundle)
+                path = save_snapshot(bundle, title)
+            except Exception as e:
+                st.error(f"Gagal menyimpan snapshot: {e}")
+                return
+            st.success(f"Snapshot tersimpan: {os.path.basename(path)} ({os.path.getsize(path) / 1024:.0f} KB)")
+
+def snapshot_browser(key):
+    """Pemilih snapshot tersimpan. Mengembalikan bundle yang dipilih atau None."""
+    paths = list_snapshots()
+    if not paths:
+        st.info("Belum ada snapshot tersimpan. Olah file lalu gunakan 'Simpan Snapshot Laporan'.")
+        return None
+    path = st.selectbox("Pilih snapshot:", paths, format_func=snapshot_label, key=f"{key}_select")
+    try:
+        return load_snapshot(path)
+    except Exception as e:
+        st.error(f"Gagal membaca snapshot: {e}")
+        return None
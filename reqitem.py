@@ -4,9 +4,41 @@ import numpy as np
 import plotly.express as px
 from datetime import datetime, time, timedelta
 import os
+from ticket_index import build_time_index, date_range_picker, apply_range
+from sla_clock import compute_sla, sla_clock_selector
+from sla_pause import compute_paused_hours, status_log_uploader
+from sla_risk import render_sla_risk
+from schema import read_tickets, parse_dates, TICKET_NO, CREATED, RESOLVED, BC, SEVERITY, SERVICE, CHANNEL, LOCATION, ITEM, TITLE, DUE
+from data_table import paginated_table
+from report_export import build_csv, export_download, CSV_MIME, GZIP_MIME
+from result_cache import fingerprint
+from data_quality import (
+    check_dates, record_rejects, render_quality_panel,
+    REASON_UNKNOWN_COMBO, REASON_UNKNOWN_TITLE, REASON_UNKNOWN_SLA_ID,
+)
+from ticket_store import history_rows, history_save_panel
+from text_columns import split_free_text, attach_free_text, ROW_KEY
+from title_match import title_index_for, match_titles, MATCH_FUZZY, MATCH_NONE
+from workbook_cache import read_workbook
 
 st.set_page_config(page_title="SLA Analytics Dashboard", layout="wide")
 
+def render_title_match_summary(titles, title_match):
+    """Ringkasan pencocokan Judul Permasalahan ke Map_Item, termasuk daftar pasangan fuzzy untuk diperiksa."""
+    filled = titles.ne('')
+    counts = title_match.loc[filled, 'Metode'].value_counts()
+    matched = int(filled.sum()) - int(counts.get(MATCH_NONE, 0))
+    st.caption(
+        f"Judul Permasalahan cocok dengan Map_Item: {matched:,}/{int(filled.sum()):,} baris "
+        f"({', '.join(f'{m}: {int(n):,}' for m, n in counts.items())})."
+    )
+    fuzzy = title_match['Metode'].eq(MATCH_FUZZY)
+    if fuzzy.any():
+        with st.expander(f"Judul yang dicocokkan secara fuzzy ({int(fuzzy.sum()):,} baris)"):
+            pairs = pd.DataFrame({'Judul Permasalahan': titles[fuzzy], 'Judul Map': title_match.loc[fuzzy, 'Judul Map'], 'Skor': title_match.loc[fuzzy, 'Skor']})
+            pairs = pairs.groupby(['Judul Permasalahan', 'Judul Map'], as_index=False).agg(Skor=('Skor', 'first'), Baris=('Skor', 'size'))
+            st.dataframe(pairs.sort_values('Baris', ascending=False), use_container_width=True, hide_index=True)
+
 def run():
     st.title("📊 SLA Analytics & Handling Dashboard")
     st.markdown("""
@@ -75,18 +107,19 @@ def run():
 
     if uploaded_req is not None:
         try:
-            df_req = pd.read_excel(uploaded_req)
+            # teks bebas dipisah sejak awal; dipasang lagi hanya untuk preview dan export
+            df_req, free_text = split_free_text(read_tickets(uploaded_req))
             
-            col_loc = find_col(df_req, ["Lokasi", "Location"]) or "Lokasi Pelapor"
-            col_judul = find_col(df_req, ["Judul", "Short"]) or "Judul Permasalahan"
-            col_bc = find_col(df_req, ["Business", "Criticality"]) or "Businesscriticality"
-            col_sev = find_col(df_req, ["Severity"]) or "Severity"
-            col_dibuat = find_col(df_req, ["Dibuat", "Created"]) or "Tiket Dibuat"
-            col_ditutup = find_col(df_req, ["Ditutup", "Closed"]) or "Tiket Ditutup"
-            col_target_asli = find_col(df_req, ["TargetSelesai", "Due"]) or "Target Selesai"
-            col_contact = find_col(df_req, ["Contact", "Type"]) or "Contact type"
-            col_item = find_col(df_req, ["Item"]) or "Item"
-            col_service = find_col(df_req, ["Service", "Offering"]) or "Service offering"
+            col_loc = LOCATION
+            col_judul = TITLE
+            col_bc = BC
+            col_sev = SEVERITY
+            col_dibuat = CREATED
+            col_ditutup = RESOLVED
+            col_target_asli = DUE
+            col_contact = CHANNEL
+            col_item = ITEM
+            col_service = SERVICE
 
             #bersih data
             if col_loc in df_req.columns: df_req[col_loc] = clean_string_col(df_req[col_loc])
@@ -114,12 +147,15 @@ def run():
                 st.error("Kolom Lokasi Pelapor tidak ditemukan.")
                 st.stop()
 
+            sla_calendar = sla_clock_selector("reqitem_sla_clock")
+            status_log = status_log_uploader("reqitem_status_log")
+
             #mapping sla
             if uploaded_sla is not None:
                 try:
-                    map_item = pd.read_excel(uploaded_sla, sheet_name='Map_Item')
-                    map_sev = pd.read_excel(uploaded_sla, sheet_name='Map_Severity')
-                    map_dur = pd.read_excel(uploaded_sla, sheet_name='Map_Durasi')
+                    map_item = read_workbook(uploaded_sla, sheet_name='Map_Item')
+                    map_sev = read_workbook(uploaded_sla, sheet_name='Map_Severity')
+                    map_dur = read_workbook(uploaded_sla, sheet_name='Map_Durasi')
 
                     for m in [map_item, map_sev, map_dur]:
                         m.columns = m.columns.str.strip()
@@ -134,8 +170,11 @@ def run():
                     )
                     df_main['Businesscriticality-Severity'] = df_main[col_bc] + df_main[col_sev]
 
-                    df_merged = pd.merge(df_main, map_item[['Judul Permasalahan', 'ID']], left_on=col_judul, right_on='Judul Permasalahan', how='left')
-                    df_merged.rename(columns={'ID': 'ID_Item'}, inplace=True)
+                    # judul dicocokkan persis -> normalisasi -> fuzzy (index n-gram Map_Item, memo per judul unik)
+                    title_index = title_index_for(map_item['Judul Permasalahan'], map_item['ID'])
+                    title_match = match_titles(df_main[col_judul], title_index)
+                    df_merged = df_main.assign(ID_Item=title_match['ID'].to_numpy())
+                    render_title_match_summary(df_main[col_judul], title_match)
 
                     df_merged = pd.merge(df_merged, map_sev[['Clean_Key_Map', 'ID']], left_on='Key_Clean_Req', right_on='Clean_Key_Map', how='left')
                     df_merged.rename(columns={'ID': 'ID_Sev'}, inplace=True)
@@ -150,45 +189,100 @@ def run():
                     df_final = pd.merge(df_merged, map_dur[['ID SLA', 'SLA']], left_on='ID SLA Final', right_on='ID SLA', how='left')
                     df_final.rename(columns={'SLA': 'Target SLA Raw'}, inplace=True)
 
+                    #validasi mapping (baris tanpa target SLA)
+                    quality = []
+                    source = uploaded_req.name
+                    quality_tickets = df_final[TICKET_NO] if TICKET_NO in df_final.columns else None
+                    if col_judul in df_final.columns:
+                        record_rejects(
+                            quality, source, REASON_UNKNOWN_TITLE, col_judul,
+                            df_final['ID_Item'].isna() & df_final[col_judul].ne(''), df_final[col_judul], quality_tickets
+                        )
+                    record_rejects(
+                        quality, source, REASON_UNKNOWN_COMBO, 'Businesscriticality-Severity',
+                        df_final['ID_Sev'].isna(), df_final['Businesscriticality-Severity'], quality_tickets
+                    )
+                    record_rejects(
+                        quality, source, REASON_UNKNOWN_SLA_ID, 'ID SLA Final',
+                        df_final['ID SLA Final'].notna() & df_final['Target SLA Raw'].isna(), df_final['ID SLA Final'], quality_tickets
+                    )
+
                     #hitung n konversi
-                    df_final[col_dibuat] = pd.to_datetime(df_final[col_dibuat], errors='coerce')
+                    created_raw = df_final[col_dibuat]
+                    df_final[col_dibuat] = parse_dates(created_raw, df_req.columns)
+                    check_dates(quality, source, col_dibuat, created_raw, df_final[col_dibuat], quality_tickets)
                     if col_ditutup in df_final.columns:
-                        df_final[col_ditutup] = pd.to_datetime(df_final[col_ditutup], errors='coerce')
+                        closed_raw = df_final[col_ditutup]
+                        df_final[col_ditutup] = parse_dates(closed_raw, df_req.columns)
+                        check_dates(quality, source, col_ditutup, closed_raw, df_final[col_ditutup], quality_tickets, allow_empty=True)
 
                     df_final['SLA_Timedelta'] = df_final['Target SLA Raw'].apply(parse_sla_duration)
                     df_final['Target SLA'] = df_final['SLA_Timedelta'].apply(timedelta_to_excel_float)
 
-                    df_final['Target Selesai Hitung'] = df_final.apply(
-                        lambda row: row[col_dibuat] + row['SLA_Timedelta'] if pd.notnull(row['SLA_Timedelta']) and row['SLA_Timedelta'] != pd.Timedelta(0) else pd.NaT, axis=1
-                    )
+                    sla_hours = pd.to_timedelta(df_final['SLA_Timedelta']).dt.total_seconds() / 3600
+                    sla_hours = sla_hours.where(sla_hours > 0)
+                    if col_ditutup in df_final.columns:
+                        closed_values = df_final[col_ditutup]
+                    else:
+                        closed_values = pd.Series(pd.NaT, index=df_final.index)
+
+                    paused_hours = None
+                    if status_log and TICKET_NO in df_final.columns:
+                        log, pause_states = status_log
+                        # tiket open: jeda dihitung sampai sekarang, bukan nol
+                        paused_hours = compute_paused_hours(
+                            log, df_final[TICKET_NO], df_final[col_dibuat], closed_values, pause_states, sla_calendar,
+                            ref_time=pd.Timestamp.now()
+                        )
+                        df_final['Waktu Jeda (jam)'] = paused_hours
+                    elif status_log:
+                        st.warning("Kolom 'No. Tiket' tidak ditemukan, log status tidak dapat dipakai.")
+
+                    sla_result = compute_sla(df_final[col_dibuat], closed_values, sla_hours, sla_calendar, paused_hours)
+                    df_final['Target Selesai Hitung'] = sla_result['target']
+                    df_final['_sla_hours'] = sla_hours
 
                     #hitung status SLA
-                    def hitung_status(row):
-                        if pd.isna(row['Target Selesai Hitung']): return ""
-                        if col_ditutup not in row or pd.isna(row[col_ditutup]): return "WP"
-                        return 1 if row[col_ditutup] <= row['Target Selesai Hitung'] else 0
-
-                    df_final['SLA'] = df_final.apply(hitung_status, axis=1)
+                    df_final['SLA'] = sla_result['sla'].astype(object)
+                    df_final.loc[sla_result['target'].notna() & closed_values.isna(), 'SLA'] = "WP"
+                    df_final.loc[sla_result['target'].isna(), 'SLA'] = ""
 
                     if col_target_asli in df_final.columns:
                         df_final.rename(columns={col_target_asli: "Target Selesai (Due Date Asli)"}, inplace=True)
                     df_final.rename(columns={'Target Selesai Hitung': 'Target Selesai'}, inplace=True)
 
+                    render_quality_panel(quality)
+                    # SLA halaman ini berisi teks "WP"/"" untuk tiket open/tanpa target; di riwayat menjadi NULL
+                    history_save_panel(
+                        lambda full=df_final: [history_rows(
+                            full, "Request", target_hours=full['_sla_hours'], breach_hours=sla_result['breach_hours'],
+                            sla=pd.to_numeric(full['SLA'], errors='coerce'), category_col=col_item
+                        )],
+                        source=uploaded_req.name, key="reqitem"
+                    )
+
+                    #filter periode
+                    st.subheader("Filter Periode")
+                    time_index = build_time_index(df_final, col_dibuat)
+                    range_selection = date_range_picker([time_index], key="reqitem_range")
+                    df_final = apply_range(time_index, range_selection)
+
                     desired_columns = [
                         "No. Tiket", col_dibuat, "Disetujui", "Status", "Item", "Permintaan", 
                         "Requested for", "Target Selesai (Due Date Asli)", "Tahapan", 
                         "Dibuka Oleh", "Jumlah", "Name", "PIC", "Comments and Work notes", 
                         "Deskripsi Permasalahan", col_judul, "Komentar Tambahan", 
                         "Root Cause and Solution", "Service offering", col_loc, 
-                        "Deskripsi Permasalahan", col_ditutup, col_bc, 
+                        col_ditutup, col_bc, 
                         "Contact type", col_sev, "Data Reg3", 
-                        "Businesscriticality-Severity", "Target SLA", "Target Selesai", "SLA"
+                        "Businesscriticality-Severity", "Target SLA", "Waktu Jeda (jam)", "Target Selesai", "SLA"
                     ]
                     
                     seen = set()
                     final_cols = [x for x in desired_columns if not (x in seen or seen.add(x))]
-                    available_cols = [c for c in final_cols if c in df_final.columns]
-                    df_display = df_final[available_cols]
+                    available_cols = [c for c in final_cols if c in df_final.columns or c in free_text.columns]
+                    df_display = df_final[[c for c in available_cols if c in df_final.columns] + [ROW_KEY]]
+                    with_text = lambda d: attach_free_text(d, free_text, available_cols)
 
                     #visualisasi
                     st.success("✅ Data berhasil diproses!")
@@ -269,22 +363,45 @@ def run():
 
                         if not df_late_full.empty:
                             st.info(f"Terdapat {len(df_late_full)} tiket yang melewati target SLA.")
-                            st.dataframe(df_late_full, use_container_width=False)
+                            paginated_table(df_late_full, key="reqitem_late", detail=with_text)
                         else:
                             st.success(" Tidak ada tiket yang terlambat.")
 
+                        st.markdown("---")
+                        render_sla_risk(
+                            df_final, col_dibuat, col_ditutup if col_ditutup in df_final.columns else None,
+                            '_sla_hours', col_service, TICKET_NO,
+                            cal=sla_calendar, status_log=status_log, key="reqitem_sla_risk"
+                        )
+
                     with tab2:
                         st.subheader("📄 Data Preview (Excel Format)")
-                        st.dataframe(df_display, use_container_width=False)
+                        paginated_table(df_display, key="reqitem_preview", detail=with_text)
 
                     st.markdown("### 📥 Download Report")
-                    csv = df_display.to_csv(index=False, sep=';', decimal=',').encode('utf-8')
-                    st.download_button("Download Hasil (.csv)", csv, "SLA_Dashboard_Report.csv", "text/csv")
+                    compress = st.checkbox("Kompres sebagai .csv.gz", key="reqitem_csv_gzip")
+                    extension = ".csv.gz" if compress else ".csv"
+                    # CSV hanya dibuat saat diminta dan dipakai ulang selama input yang menentukan hasilnya sama
+                    export_download(
+                        f"Hasil ({extension})", key="reqitem_csv",
+                        signature=(
+                            getattr(uploaded_req, "file_id", None) or (uploaded_req.name, uploaded_req.size),
+                            filter_option,
+                            fingerprint(uploaded_sla) if not isinstance(uploaded_sla, str) else (uploaded_sla, os.path.getmtime(uploaded_sla)),
+                            fingerprint(sla_calendar),
+                            fingerprint(status_log[0], sorted(status_log[1])) if status_log else None,
+                            range_selection['start'], range_selection['end'],
+                            compress,
+                        ),
+                        build=lambda: build_csv(with_text(df_display), compress=compress, index=False, sep=';', decimal=','),
+                        file_name=f"SLA_Dashboard_Report{extension}",
+                        mime=GZIP_MIME if compress else CSV_MIME
+                    )
 
                 except Exception as e:
                     st.error(f"Error Proses: {e}")
             else:
-                st.dataframe(df_main, use_container_width=False)
+                paginated_table(df_main, key="reqitem_raw", detail=lambda d: attach_free_text(d, free_text))
 
         except Exception as e:
             st.error(f"Gagal Baca File: {e}")
@@ -0,0 +1,217 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Batas default; bisa diubah lewat environment variable saat server dijalankan.
+DEFAULT_MAX_MB = int(os.environ.get("SLA_CACHE_MAX_MB", "512"))
+DEFAULT_TTL_HOURS = float(os.environ.get("SLA_CACHE_TTL_HOURS", "12"))
+DEFAULT_DISK_DIR = os.environ.get("SLA_CACHE_DIR") or None
+DEFAULT_DISK_MAX_MB = int(os.environ.get("SLA_CACHE_DISK_MAX_MB", "2048"))
+
+# State cache bersama untuk seluruh sesi di proses server ini.
+_LOCK = threading.Lock()
+_ENTRIES = OrderedDict()  # key -> (value, size_bytes, expires_at)
+_CONFIG = {
+    'max_bytes': DEFAULT_MAX_MB * 2**20,
+    'ttl': DEFAULT_TTL_HOURS * 3600,
+    'disk_dir': DEFAULT_DISK_DIR,
+    'disk_max_bytes': DEFAULT_DISK_MAX_MB * 2**20,
+}
+_STATS = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0}
+
+def configure_cache(max_mb=None, ttl_hours=None, disk_dir=None, disk_max_mb=None):
+    """Mengubah batas ukuran, TTL dan direktori disk cache (None = tidak diubah)."""
+    with _LOCK:
+        if max_mb is not None:
+            _CONFIG['max_bytes'] = max_mb * 2**20
+        if ttl_hours is not None:
+            _CONFIG['ttl'] = ttl_hours * 3600
+        if disk_dir is not None:
+            _CONFIG['disk_dir'] = disk_dir or None
+        if disk_max_mb is not None:
+            _CONFIG['disk_max_bytes'] = disk_max_mb * 2**20
+        _evict_locked()
+
+def fingerprint(*parts):
+    """
+    Hash stabil (hex) dari gabungan bagian input: bytes/file upload, DataFrame,
+    array numpy, dict/list/tuple, atau nilai lain lewat repr().
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        _update_hash(h, part)
+    return h.hexdigest()
+
+def _update_hash(h, part):
+    if part is None:
+        h.update(b"\x00none")
+    elif isinstance(part, (bytes, bytearray, memoryview)):
+        h.update(b"\x00bytes")
+        h.update(part)
+    elif hasattr(part, "getvalue"):
+        h.update(b"\x00file")
+        h.update(part.getvalue())
+    elif isinstance(part, (pd.DataFrame, pd.Series)):
+        h.update(b"\x00pandas")
+        labels = list(part.columns) if isinstance(part, pd.DataFrame) else [part.name]
+        h.update(repr(labels).encode())
+        h.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+    elif isinstance(part, np.ndarray):
+        h.update(b"\x00ndarray")
+        h.update(str(part.dtype).encode())
+        h.update(np.ascontiguousarray(part).tobytes())
+    elif isinstance(part, dict):
+        h.update(b"\x00dict")
+        for k in sorted(part, key=repr):
+            _update_hash(h, k)
+            _update_hash(h, part[k])
+    elif isinstance(part, (list, tuple)):
+        h.update(b"\x00seq")
+        for item in part:
+            _update_hash(h, item)
+    else:
+        h.update(b"\x00repr")
+        h.update(repr(part).encode())
+
+def _estimate_bytes(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (list, tuple)):
+        return sum(_estimate_bytes(v) for v in value) + 64
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 1024
+
+def _evict_locked():
+    now = time.time()
+    for key in [k for k, (_, _, exp) in _ENTRIES.items() if exp <= now]:
+        del _ENTRIES[key]
+        _STATS['expired'] += 1
+    total = sum(size for _, size, _ in _ENTRIES.values())
+    while _ENTRIES and total > _CONFIG['max_bytes']:
+        _, (_, size, _) = _ENTRIES.popitem(last=False)
+        total -= size
+        _STATS['evictions'] += 1
+
+def _disk_path(key):
+    return os.path.join(_CONFIG['disk_dir'], f"{key}.pkl")
+
+def _disk_get(key):
+    if not _CONFIG['disk_dir']:
+        return None
+    path = _disk_path(key)
+    try:
+        if time.time() - os.path.getmtime(path) > _CONFIG['ttl']:
+            os.remove(path)
+            return None
+        with open(path, "rb") as f:
+            value = pickle.load(f)
+        os.utime(path, None)  # penanda LRU untuk eviction disk
+        return value
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+def _disk_put(key, value):
+    disk_dir = _CONFIG['disk_dir']
+    if not disk_dir:
+        return
+    try:
+        os.makedirs(disk_dir, exist_ok=True)
+        tmp = _disk_path(key) + f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, _disk_path(key))
+        _disk_evict(disk_dir)
+    except OSError:
+        pass
+
+def _disk_evict(disk_dir):
+    files = []
+    for name in os.listdir(disk_dir):
+        if name.endswith(".pkl"):
+            path = os.path.join(disk_dir, name)
+            try:
+                info = os.stat(path)
+            except OSError:
+                continue
+            files.append((info.st_mtime, info.st_size, path))
+    files.sort()
+    now = time.time()
+    total = sum(size for _, size, _ in files)
+    for mtime, size, path in files:
+        if total <= _CONFIG['disk_max_bytes'] and now - mtime <= _CONFIG['ttl']:
+            continue
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+def cache_get(key):
+    """Mengambil hasil dari cache (memori lalu disk). Mengembalikan None bila tidak ada/kedaluwarsa."""
+    with _LOCK:
+        entry = _ENTRIES.get(key)
+        if entry is not None:
+            value, _, expires_at = entry
+            if expires_at > time.time():
+                _ENTRIES.move_to_end(key)
+                _STATS['hits'] += 1
+                return value
+            del _ENTRIES[key]
+            _STATS['expired'] += 1
+
+    value = _disk_get(key)
+    with _LOCK:
+        if value is None:
+            _STATS['misses'] += 1
+            return None
+        _STATS['disk_hits'] += 1
+    _memory_put(key, value)
+    return value
+
+def _memory_put(key, value, ttl=None):
+    size = _estimate_bytes(value)
+    with _LOCK:
+        if size > _CONFIG['max_bytes']:
+            return
+        _ENTRIES[key] = (value, size, time.time() + (_CONFIG['ttl'] if ttl is None else ttl))
+        _ENTRIES.move_to_end(key)
+        _evict_locked()
+
+def cache_put(key, value, ttl_hours=None):
+    """
+    Menyimpan hasil ke cache memori (dan disk bila SLA_CACHE_DIR diset).
+    TTL dihitung per entry sejak disimpan (default: TTL global).
+    Nilai yang disimpan dipakai bersama antar sesi, jadi jangan dimodifikasi in-place.
+    """
+    _memory_put(key, value, None if ttl_hours is None else ttl_hours * 3600)
+    _disk_put(key, value)
+
+def cache_clear():
+    """Mengosongkan cache memori (file disk tetap, kedaluwarsa mengikuti TTL)."""
+    with _LOCK:
+        _ENTRIES.clear()
+
+def cache_stats():
+    """Statistik cache: hit/miss, jumlah entry, ukuran terpakai dan batasnya (MB)."""
+    with _LOCK:
+        used = sum(size for _, size, _ in _ENTRIES.values())
+        lookups = _STATS['hits'] + _STATS['disk_hits'] + _STATS['misses']
+        return {
+            **_STATS,
+            'hit_rate': (_STATS['hits'] + _STATS['disk_hits']) / lookups if lookups else 0.0,
+            'entries': len(_ENTRIES),
+            'used_mb': used / 2**20,
+            'max_mb': _CONFIG['max_bytes'] / 2**20,
+            'ttl_hours': _CONFIG['ttl'] / 3600,
+            'disk_dir': _CONFIG['disk_dir'],
+        }
@@ -0,0 +1,230 @@
+import pandas as pd
+import numpy as np
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from workbook_cache import read_workbook
+
+# Nama kolom baku yang dipakai semua halaman setelah file dibaca.
+TICKET_NO = 'No. Tiket'
+CREATED = 'Tiket Dibuat'
+RESOLVED = 'Tiket Ditutup'
+BC = 'Businesscriticality'
+SEVERITY = 'Severity'
+SERVICE = 'Service offering'
+CHANNEL = 'Contact type'
+LOCATION = 'Lokasi Pelapor'
+CATEGORY = 'Kategori'
+ITEM = 'Item'
+TITLE = 'Judul Permasalahan'
+DUE = 'Target Selesai'
+
+# Alias per field, urut berdasarkan prioritas. Nama baku selalu dicek pertama.
+SCHEMA_REGISTRY = {
+    TICKET_NO: ['No. Tiket', 'No Tiket', 'Ticket No', 'No Ticket', 'Ticket', 'Number'],
+    CREATED: ['Tiket Dibuat', 'Created', 'Created Date', 'CreatedAt', 'Created On', 'Opened', 'Dibuat'],
+    RESOLVED: ['Tiket Ditutup', 'Resolved', 'Closed', 'Closed At', 'Ditutup'],
+    BC: ['Businesscriticality', 'Business criticality', 'Business Critical'],
+    SEVERITY: ['Severity'],
+    SERVICE: ['Service offering', 'Service Offering', 'ServiceOffering'],
+    CHANNEL: ['Contact type', 'Contact Type', 'ContactType', 'Channel'],
+    LOCATION: ['Lokasi Pelapor', 'Lokasi', 'Location', 'Name', 'User Name'],
+    CATEGORY: ['Kategori', 'Category', 'Tipe'],
+    ITEM: ['Item'],
+    TITLE: ['Judul Permasalahan', 'Judul', 'Short description'],
+    DUE: ['Target Selesai', 'Due date', 'Due'],
+}
+
+# Urutan alias khusus halaman Incident dan Summary: sejak awal keduanya memakai 'Resolved' bila ada,
+# walaupun file juga punya kolom 'Tiket Ditutup'.
+RESOLVED_FIRST = {RESOLVED: ['Resolved', 'Tiket Ditutup', 'Closed', 'Closed At', 'Ditutup']}
+# Nama kolom baku yang tergeser oleh alias pilihan (prefer) disimpan dengan akhiran ini.
+DISPLACED_SUFFIX = " (kolom asli)"
+
+# Layout tanggal yang dikenal dari export tiket, urut prioritas (day-first lebih dulu).
+DATE_FORMATS = (
+    '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%d/%m/%Y',
+    '%d-%m-%Y %H:%M:%S', '%d-%m-%Y %H:%M', '%d-%m-%Y',
+    '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d',
+)
+EXCEL_EPOCH = pd.Timestamp('1899-12-30')
+EXCEL_SERIAL_RANGE = (20_000, 80_000)  # kira-kira tahun 1954-2119
+DATE_SAMPLE_SIZE = 200
+DATE_MIN_MATCH = 0.9
+DATE_LAYOUT_CACHE_SIZE = 256
+
+def _norm_header(name) -> str:
+    """Kunci pembanding header: huruf kecil tanpa spasi/tanda baca."""
+    return re.sub(r'[^0-9a-z]', '', str(name).lower())
+
+_ALIAS_KEYS = {
+    canonical: [_norm_header(a) for a in aliases]
+    for canonical, aliases in SCHEMA_REGISTRY.items()
+}
+
+@lru_cache(maxsize=256)
+def _resolve_signature(header: tuple, prefer: tuple = ()):
+    rename = {}
+    taken = set()
+    by_key = {}
+    for col in header:
+        by_key.setdefault(_norm_header(col), col)
+
+    preferred = {canonical: [_norm_header(a) for a in aliases] for canonical, aliases in prefer}
+    for canonical, keys in _ALIAS_KEYS.items():
+        if canonical in preferred:
+            for key in preferred[canonical]:
+                col = by_key.get(key)
+                if col is None or col in taken or col in rename:
+                    continue
+                taken.add(col)
+                if col != canonical:
+                    rename[col] = canonical
+                    if canonical in header:
+                        rename[canonical] = canonical + DISPLACED_SUFFIX
+                        taken.add(canonical)
+                break
+            continue
+        if canonical in header:
+            taken.add(canonical)
+            continue
+        for key in keys:
+            col = by_key.get(key)
+            if col is not None and col not in taken and col not in rename:
+                rename[col] = canonical
+                taken.add(col)
+                break
+    return tuple(rename.items())
+
+def resolve_schema(columns, prefer=None) -> dict:
+    """
+    Mencocokkan header workbook ke nama kolom baku.
+    prefer (opsional) {nama baku: alias urut prioritas} menggantikan urutan registry untuk field itu,
+    juga bila nama baku sendiri ada di file; kolom baku yang tergeser diberi DISPLACED_SUFFIX.
+    Hasil di-cache berdasarkan signature header sehingga file dengan layout sama tidak dipindai ulang.
+    """
+    prefer = tuple((k, tuple(v)) for k, v in (prefer or {}).items())
+    return dict(_resolve_signature(tuple(str(c) for c in columns), prefer))
+
+def apply_schema(df, prefer=None):
+    """Mengganti nama kolom DataFrame ke nama baku (in-place) dan mengembalikannya."""
+    df.columns = [str(c) for c in df.columns]
+    rename = resolve_schema(df.columns, prefer)
+    if rename:
+        df.rename(columns=rename, inplace=True)
+    return df
+
+def read_tickets(uploaded_file, prefer=None, **kwargs):
+    """Membaca file tiket Excel (lewat cache workbook, lihat workbook_cache) dan langsung menerapkan schema registry."""
+    return apply_schema(read_workbook(uploaded_file, **kwargs), prefer)
+
+# (signature header, kolom) -> layout tanggal terakhir yang cocok
+_DATE_LAYOUTS = {}
+
+def _as_serial_days(values):
+    numeric = pd.to_numeric(values, errors='coerce')
+    # dibulatkan ke detik: serial Excel membawa noise floating point
+    seconds = (numeric * 86400).round()
+    return EXCEL_EPOCH + pd.to_timedelta(seconds, unit='s')
+
+def _match_ratio(sample, layout):
+    """Proporsi sampel (non-null) yang bisa dibaca dengan layout ini."""
+    if layout == 'datetime':
+        ok = [isinstance(v, (datetime, date, np.datetime64)) for v in sample]
+    elif layout == 'serial':
+        low, high = EXCEL_SERIAL_RANGE
+        ok = [
+            isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, bool) and low <= v <= high
+            for v in sample
+        ]
+    else:
+        text = pd.Series([v if isinstance(v, str) else None for v in sample], dtype=object)
+        ok = pd.to_datetime(text, format=layout, errors='coerce').notna().tolist()
+    return sum(ok) / len(sample)
+
+def detect_date_layout(values, header=None):
+    """
+    Mendeteksi layout kolom tanggal dari sampel: 'datetime' (sudah objek tanggal), 'serial'
+    (angka serial Excel), salah satu DATE_FORMATS, atau None bila tidak dikenali.
+    Hasil di-cache per signature header + nama kolom; layout dari cache dicek ulang dengan sampel.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return 'datetime'
+    # string kosong tidak ikut sampel (tetap menjadi NaT saat parsing)
+    sample = [v for v in values.dropna().head(DATE_SAMPLE_SIZE * 2).tolist() if not (isinstance(v, str) and not v.strip())]
+    sample = sample[:DATE_SAMPLE_SIZE]
+    if not sample:
+        return None
+
+    key = (tuple(str(c) for c in header), str(values.name)) if header is not None else None
+    cached = _DATE_LAYOUTS.get(key) if key else None
+    candidates = ([cached] if cached else []) + ['datetime', 'serial', *DATE_FORMATS]
+    # beberapa nilai kotor di sampel tidak boleh menggagalkan deteksi seluruh kolom
+    layout = next((c for c in candidates if _match_ratio(sample, c) >= DATE_MIN_MATCH), None)
+    if key:
+        if len(_DATE_LAYOUTS) >= DATE_LAYOUT_CACHE_SIZE:
+            _DATE_LAYOUTS.clear()
+        _DATE_LAYOUTS[key] = layout
+    return layout
+
+def parse_dates(values, header=None):
+    """
+    Pengganti pd.to_datetime(..., errors='coerce') untuk kolom tanggal tiket.
+    Layout dideteksi sekali dari sampel, lalu seluruh kolom di-parse dengan format eksplisit
+    atau aritmetika serial Excel (tanpa inferensi format per elemen).
+    Layout yang tidak dikenali kembali ke pd.to_datetime biasa.
+    """
+    values = pd.Series(values)
+    layout = detect_date_layout(values, header)
+    if layout == 'serial':
+        return _as_serial_days(values)
+    if layout in (None, 'datetime'):
+        if pd.api.types.infer_dtype(values, skipna=True) in ('datetime64', 'datetime', 'date', 'empty'):
+            return pd.to_datetime(values, errors='coerce')
+        return _parse_mixed(values)
+    return _parse_text(values, layout)
+
+def _parse_text(values, layout):
+    if layout.startswith(('%d/%m/%Y', '%d-%m-%Y')):
+        return _parse_day_first(values, layout)
+    return pd.to_datetime(values, format=layout, errors='coerce')
+
+def _parse_mixed(values):
+    """
+    Kolom campuran (objek tanggal dari openpyxl, serial Excel, teks): tiap jenis di-parse sendiri.
+    Teks memakai layout DATE_FORMATS yang cocok dengan teks itu sendiri, bukan inferensi month-first
+    pd.to_datetime; teks tanpa layout dikenal dibaca day-first.
+    """
+    is_text = values.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+    is_number = values.map(
+        lambda v: isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, bool)
+    ).to_numpy(dtype=bool)
+    parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+
+    others = ~is_text & ~is_number
+    if others.any():
+        parsed[others] = pd.to_datetime(values[others], errors='coerce')
+    if is_number.any():
+        low, high = EXCEL_SERIAL_RANGE
+        numbers = pd.to_numeric(values[is_number], errors='coerce')
+        parsed[is_number] = _as_serial_days(numbers.where((numbers >= low) & (numbers <= high)))
+    if is_text.any():
+        text = values[is_text].astype(object).str.strip()
+        sample = text[text != ''].head(DATE_SAMPLE_SIZE).tolist()
+        layout = next((f for f in DATE_FORMATS if sample and _match_ratio(sample, f) >= DATE_MIN_MATCH), None)
+        if layout:
+            parsed[is_text] = _parse_text(text, layout)
+        else:
+            parsed[is_text] = pd.to_datetime(text, dayfirst=True, errors='coerce')
+    return parsed
+
+def _parse_day_first(values, layout):
+    # 'dd/mm/yyyy ...' disusun ulang menjadi ISO (parser ISO pandas jauh lebih cepat daripada strptime);
+    # baris yang tidak zero-padded gagal di sini lalu di-parse ulang dengan format aslinya
+    iso = values.str.slice(6, 10) + '-' + values.str.slice(3, 5) + '-' + values.str.slice(0, 2) + values.str.slice(10)
+    parsed = pd.to_datetime(iso, format='ISO8601', errors='coerce')
+    retry = parsed.isna() & values.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(values[retry], format=layout, errors='coerce')
+    return parsed
@@ -0,0 +1,163 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import json
+import os
+
+DEFAULT_CALENDAR_PATH = os.path.join(os.path.dirname(__file__), "sla_calendar.json")
+
+def _parse_hhmm(val):
+    jam, menit = str(val).split(":")[:2]
+    return int(jam) * 3600 + int(menit) * 60
+
+def load_calendar(path=None):
+    """Membaca kalender jam kerja & hari libur dari file JSON (default: sla_calendar.json)."""
+    path = path or DEFAULT_CALENDAR_PATH
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+
+    start_sec = _parse_hhmm(raw.get("start", "08:00"))
+    end_sec = _parse_hhmm(raw.get("end", "17:00"))
+    if end_sec <= start_sec:
+        raise ValueError("Jam selesai kerja harus setelah jam mulai kerja.")
+
+    return {
+        'name': raw.get("name", os.path.basename(path)),
+        'working_days': np.array(raw.get("working_days", [0, 1, 2, 3, 4]), dtype=np.int64),
+        'start_sec': start_sec,
+        'end_sec': end_sec,
+        'holidays': np.array(sorted(raw.get("holidays", [])), dtype='datetime64[D]'),
+    }
+
+def _working_table(cal, first_day, last_day):
+    """Array kumulatif detik kerja per hari untuk rentang [first_day, last_day]."""
+    days = np.arange(first_day, last_day + np.timedelta64(1, 'D'), dtype='datetime64[D]')
+    weekday = (days.astype(np.int64) + 3) % 7  # 1970-01-01 = Kamis, Senin = 0
+    is_work = np.isin(weekday, cal['working_days']) & ~np.isin(days, cal['holidays'])
+    day_secs = np.where(is_work, cal['end_sec'] - cal['start_sec'], 0).astype(np.int64)
+    cum_end = np.cumsum(day_secs)
+    return {
+        'first_day': first_day,
+        'days': days,
+        'is_work': is_work,
+        'cum_start': cum_end - day_secs,
+        'cum_end': cum_end,
+    }
+
+def _working_seconds_at(ts, table, cal):
+    """Detik kerja kumulatif sejak awal tabel sampai setiap timestamp (tanpa NaT)."""
+    day = ts.astype('datetime64[D]')
+    d = (day - table['first_day']).astype(np.int64)
+    sec_of_day = (ts - day).astype('timedelta64[s]').astype(np.int64)
+    within = np.clip(sec_of_day - cal['start_sec'], 0, cal['end_sec'] - cal['start_sec'])
+    within = np.where(table['is_work'][d], within, 0)
+    return table['cum_start'][d] + within
+
+def _table_for(ts_list, cal, margin_days=30):
+    """Membuat tabel jam kerja yang mencakup semua timestamp pada ts_list."""
+    valid = [t[~np.isnat(t)] for t in ts_list]
+    valid = [t for t in valid if len(t)]
+    first_day = min(t.min() for t in valid).astype('datetime64[D]') - np.timedelta64(1, 'D')
+    last_day = max(t.max() for t in valid).astype('datetime64[D]') + np.timedelta64(margin_days, 'D')
+    return _working_table(cal, first_day, last_day)
+
+def elapsed_hours(start, end, cal=None):
+    """
+    Durasi (jam) antara dua array datetime64 tanpa NaT.
+    Dengan kalender, hanya detik kerja yang dihitung.
+    """
+    start = np.asarray(start, dtype='datetime64[ns]')
+    end = np.asarray(end, dtype='datetime64[ns]')
+    if len(start) == 0:
+        return np.zeros(0)
+    if cal is None:
+        return (end - start) / np.timedelta64(1, 's') / 3600
+    table = _table_for([start, end], cal)
+    return (_working_seconds_at(end, table, cal) - _working_seconds_at(start, table, cal)) / 3600
+
+def compute_sla(created, resolved, sla_hours, cal=None, paused_hours=None):
+    """
+    Menghitung Target Selesai, status SLA (1/0/NA) dan Time Breach (jam) secara vektor.
+    cal=None memakai jam dinding (24 jam); selain itu hanya jam kerja di kalender yang dihitung.
+    paused_hours (opsional) adalah waktu jeda per tiket yang tidak ikut dihitung ke SLA.
+    """
+    created = pd.to_datetime(pd.Series(created), errors='coerce')
+    index = created.index
+    c_all = created.to_numpy(dtype='datetime64[ns]')
+    r_all = pd.to_datetime(pd.Series(resolved, index=index), errors='coerce').to_numpy(dtype='datetime64[ns]')
+    h_all = pd.to_numeric(pd.Series(sla_hours, index=index), errors='coerce').to_numpy(dtype='float64')
+    if paused_hours is None:
+        p_all = np.zeros(len(index))
+    else:
+        p_all = pd.to_numeric(pd.Series(paused_hours, index=index), errors='coerce').fillna(0).to_numpy(dtype='float64')
+
+    has_target = ~np.isnat(c_all) & ~np.isnan(h_all)
+    has_result = has_target & ~np.isnat(r_all)
+
+    target = np.full(len(index), np.datetime64('NaT'), dtype='datetime64[ns]')
+    breach = np.full(len(index), np.nan)
+
+    if cal is None:
+        secs = np.round((h_all[has_target] + p_all[has_target]) * 3600).astype(np.int64).astype('timedelta64[s]')
+        target[has_target] = c_all[has_target] + secs
+        breach[has_result] = (
+            (r_all[has_result] - c_all[has_result]) / np.timedelta64(1, 's') / 3600
+            - p_all[has_result]
+            - h_all[has_result]
+        )
+    elif has_target.any():
+        c = c_all[has_target]
+        r = r_all[has_target]
+        secs = np.round((h_all[has_target] + p_all[has_target]) * 3600).astype(np.int64)
+        r_valid = r[~np.isnat(r)]
+
+        # resolved bisa lebih awal dari created (data kotor); tabel harus mencakup keduanya
+        first_seen = min(c.min(), r_valid.min()) if len(r_valid) else c.min()
+        first_day = first_seen.astype('datetime64[D]') - np.timedelta64(1, 'D')
+        last_seen = max(c.max(), r_valid.max()) if len(r_valid) else c.max()
+        daily = max(1, (cal['end_sec'] - cal['start_sec']) * len(cal['working_days']) // 7)
+        margin = int(secs.max() // daily) + 30
+        while True:
+            table = _working_table(cal, first_day, last_seen.astype('datetime64[D]') + np.timedelta64(margin, 'D'))
+            start_w = _working_seconds_at(c, table, cal)
+            target_w = start_w + secs
+            if table['cum_end'][-1] >= target_w.max():
+                break
+            margin *= 2
+
+        d = np.searchsorted(table['cum_end'], target_w, side='left')
+        remaining = target_w - table['cum_start'][d]
+        target[has_target] = (
+            table['days'][d].astype('datetime64[ns]')
+            + (cal['start_sec'] + remaining).astype('timedelta64[s]')
+        )
+
+        done = ~np.isnat(r)
+        if done.any():
+            end_w = _working_seconds_at(r[done], table, cal)
+            breach_sub = np.full(len(c), np.nan)
+            breach_sub[done] = (end_w - start_w[done] - secs[done]) / 3600
+            breach[has_target] = breach_sub
+
+    sla = pd.array(np.where(breach <= 1e-9, 1, 0), dtype='Int64')
+    sla[~has_result] = pd.NA
+
+    return pd.DataFrame({'target': target, 'sla': sla, 'breach_hours': breach}, index=index)
+
+def sla_clock_selector(key):
+    """Widget pemilihan mode jam SLA. Mengembalikan kalender kerja, atau None untuk jam dinding."""
+    mode = st.radio(
+        "Mode perhitungan SLA:",
+        ["Wall Clock (24 jam)", "Jam Kerja (tanpa libur nasional)"],
+        horizontal=True,
+        key=key
+    )
+    if mode == "Wall Clock (24 jam)":
+        return None
+    try:
+        cal = load_calendar()
+    except Exception as e:
+        st.error(f"Gagal membaca kalender jam kerja: {e}. Kembali ke Wall Clock.")
+        return None
+    st.caption(f"Kalender: **{cal['name']}** — {len(cal['holidays'])} hari libur terdaftar.")
+    return cal
@@ -0,0 +1,132 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from sla_clock import elapsed_hours
+from schema import SCHEMA_REGISTRY, TICKET_NO, parse_dates
+
+POSSIBLE_TICKET_COLS = SCHEMA_REGISTRY[TICKET_NO]
+POSSIBLE_STATE_COLS = ['State', 'Status', 'Tahapan', 'New State', 'new_value']
+POSSIBLE_TIME_COLS = ['Timestamp', 'Waktu', 'Updated', 'Tanggal', 'Changed At', 'sys_updated_on']
+
+DEFAULT_PAUSE_KEYWORDS = ['pending', 'on hold', 'awaiting']
+
+def _find_column(df_cols, possible_names):
+    for col in possible_names:
+        if col in df_cols:
+            return col
+    return None
+
+def read_status_log(uploaded_file):
+    """
+    Membaca log perubahan status tiket (xlsx/csv) menjadi kolom baku:
+    'ticket', 'state', 'ts'. Mengembalikan None bila kolom wajib tidak ditemukan.
+    """
+    name = getattr(uploaded_file, "name", str(uploaded_file)).lower()
+    if name.endswith(".csv"):
+        raw = pd.read_csv(uploaded_file, sep=None, engine="python")
+    else:
+        raw = pd.read_excel(uploaded_file)
+
+    ticket_col = _find_column(raw.columns, POSSIBLE_TICKET_COLS)
+    state_col = _find_column(raw.columns, POSSIBLE_STATE_COLS)
+    time_col = _find_column(raw.columns, POSSIBLE_TIME_COLS)
+    if not all([ticket_col, state_col, time_col]):
+        return None
+
+    log = pd.DataFrame({
+        'ticket': raw[ticket_col].astype(str).str.strip(),
+        'state': raw[state_col].astype(str).str.strip(),
+        'ts': parse_dates(raw[time_col], raw.columns),
+    })
+    return log.dropna(subset=['ts'])
+
+def compute_paused_hours(log, ticket_no, created, resolved, pause_states, cal=None, ref_time=None):
+    """
+    Menghitung total waktu jeda (jam) per tiket dari log transisi status.
+
+    Setiap baris log membuka interval [ts, ts berikutnya) dengan state-nya sendiri;
+    interval terakhir ditutup oleh waktu resolved (atau ref_time untuk tiket open).
+    Interval dipotong ke [created, resolved], lalu durasi state jeda dijumlahkan per
+    tiket dengan cumsum setelah diurutkan berdasarkan tiket dan waktu.
+    Hasil berupa array sejajar dengan ticket_no (0 untuk tiket tanpa log).
+    """
+    ticket_no = pd.Series(ticket_no).astype(str).str.strip().to_numpy()
+    created = pd.to_datetime(pd.Series(created), errors='coerce').to_numpy(dtype='datetime64[ns]')
+    resolved = pd.to_datetime(pd.Series(resolved), errors='coerce').to_numpy(dtype='datetime64[ns]')
+    result = np.zeros(len(ticket_no))
+    if log is None or log.empty or len(ticket_no) == 0:
+        return result
+
+    # satu baris acuan per nomor tiket (kemunculan terakhir)
+    keep = ~pd.Index(ticket_no).duplicated(keep='last')
+    ticket_index = pd.Index(ticket_no[keep])
+    t_created = created[keep]
+    t_resolved = resolved[keep]
+    if ref_time is not None:
+        t_resolved = np.where(np.isnat(t_resolved), np.datetime64(pd.Timestamp(ref_time), 'ns'), t_resolved)
+
+    code = ticket_index.get_indexer(log['ticket'].to_numpy())
+    ts = log['ts'].to_numpy(dtype='datetime64[ns]')
+    is_pause = log['state'].isin(pause_states).to_numpy()
+    valid = code >= 0
+    code, ts, is_pause = code[valid], ts[valid], is_pause[valid]
+    if len(code) == 0:
+        return result
+
+    order = np.lexsort((ts, code))
+    code, ts, is_pause = code[order], ts[order], is_pause[order]
+
+    last_in_group = np.ones(len(code), dtype=bool)
+    last_in_group[:-1] = code[1:] != code[:-1]
+    next_ts = np.empty_like(ts)
+    next_ts[:-1] = ts[1:]
+    next_ts[last_in_group] = t_resolved[code[last_in_group]]
+
+    start = np.maximum(ts, t_created[code])
+    end = np.minimum(next_ts, t_resolved[code])
+    usable = is_pause & ~np.isnat(start) & ~np.isnat(end) & (end > start)
+
+    dur = np.zeros(len(code))
+    if usable.any():
+        dur[usable] = elapsed_hours(start[usable], end[usable], cal)
+
+    csum = np.cumsum(dur)
+    group_end = np.flatnonzero(last_in_group)
+    group_total = np.diff(np.concatenate([[0.0], csum[group_end]]))
+    per_ticket = np.zeros(len(ticket_index))
+    per_ticket[code[group_end]] = group_total
+
+    return per_ticket[ticket_index.get_indexer(ticket_no)]
+
+def status_log_uploader(key):
+    """
+    Uploader opsional untuk log status tiket plus pilihan state yang menghentikan jam SLA.
+    Mengembalikan (log, pause_states) atau None bila tidak dipakai.
+    """
+    with st.expander("⏸️ SLA Pause/Resume dari Status History (opsional)"):
+        log_file = st.file_uploader(
+            "Upload log status tiket (No. Tiket, State, Timestamp)",
+            type=["xlsx", "csv"],
+            key=f"{key}_file"
+        )
+        if not log_file:
+            return None
+        try:
+            log = read_status_log(log_file)
+        except Exception as e:
+            st.error(f"Gagal membaca log status: {e}")
+            return None
+        if log is None:
+            st.error("Kolom No. Tiket / State / Timestamp tidak ditemukan pada log status.")
+            return None
+
+        states = sorted(log['state'].unique().tolist())
+        default_states = [s for s in states if any(k in s.lower() for k in DEFAULT_PAUSE_KEYWORDS)]
+        pause_states = st.multiselect(
+            "State yang tidak menambah waktu SLA:",
+            states,
+            default=default_states,
+            key=f"{key}_states"
+        )
+        st.caption(f"{len(log):,} transisi status untuk {log['ticket'].nunique():,} tiket.")
+    return log, pause_states
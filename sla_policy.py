@@ -0,0 +1,159 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import json
+import os
+import re
+
+from result_cache import fingerprint
+
+DEFAULT_POLICY_PATH = os.environ.get("SLA_POLICY_PATH") or os.path.join(os.path.dirname(__file__), "sla_policy.json")
+
+_NO_START = np.iinfo(np.int64).min
+_NO_END = np.iinfo(np.int64).max
+
+def normalize_label(s: str) -> str:
+    if pd.isna(s):
+        return ""
+    s = str(s).strip()
+    s = re.sub(r'\s+', ' ', s)
+    s = re.sub(r'\s*-\s*', ' - ', s)
+    s = re.sub(r'(?<=\d)(?=[A-Za-z])', ' ', s)
+    s = re.sub(r'(?<=\D)(?=\d)', ' ', s)
+    s = re.sub(r'\s+', ' ', s).strip()
+    return s
+
+def _service_key(s) -> str:
+    return "" if pd.isna(s) else str(s).strip().casefold()
+
+def _date_ns(val, name, field):
+    if val in (None, ""):
+        return _NO_START if field == "effective_from" else _NO_END
+    try:
+        return pd.Timestamp(val).as_unit('ns').value
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Versi '{name}': {field} '{val}' bukan tanggal yang valid.") from e
+
+def compile_policy(raw, name=None):
+    """
+    Menyusun kebijakan SLA (dict hasil json.load) menjadi tabel lookup:
+    jam[versi, service, label], dengan service 0 = jam dasar versi tersebut dan
+    service berikutnya = override per Service offering (label yang tidak di-override memakai jam dasar).
+    Masa berlaku versi: effective_from (inklusif) s.d. effective_to (eksklusif), null = tanpa batas.
+    """
+    versions = sorted(
+        raw.get("versions", []),
+        key=lambda v: _date_ns(v.get("effective_from"), v.get("name", "?"), "effective_from")
+    )
+    if not versions:
+        raise ValueError("Kebijakan SLA tidak memiliki versi.")
+
+    names, starts, ends = [], [], []
+    for i, version in enumerate(versions):
+        vname = version.get("name") or f"Versi {i + 1}"
+        start = _date_ns(version.get("effective_from"), vname, "effective_from")
+        end = _date_ns(version.get("effective_to"), vname, "effective_to")
+        if end <= start:
+            raise ValueError(f"Versi '{vname}': effective_to harus setelah effective_from.")
+        if ends and start < ends[-1]:
+            raise ValueError(f"Masa berlaku versi '{names[-1]}' dan '{vname}' tumpang tindih.")
+        names.append(vname)
+        starts.append(start)
+        ends.append(end)
+
+    labels = sorted({normalize_label(k) for v in versions for k in v.get("hours", {})}
+                    | {normalize_label(k) for v in versions for o in v.get("service_overrides", {}).values() for k in o})
+    services = sorted({_service_key(s) for v in versions for s in v.get("service_overrides", {})})
+    label_pos = {label: i for i, label in enumerate(labels)}
+    service_pos = {service: i + 1 for i, service in enumerate(services)}
+
+    hours = np.full((len(versions), len(services) + 1, len(labels)), np.nan)
+    for v, version in enumerate(versions):
+        for label, value in version.get("hours", {}).items():
+            hours[v, :, label_pos[normalize_label(label)]] = float(value)
+        for service, overrides in version.get("service_overrides", {}).items():
+            for label, value in overrides.items():
+                hours[v, service_pos[_service_key(service)], label_pos[normalize_label(label)]] = float(value)
+
+    return {
+        'name': name or raw.get("name", "Kebijakan SLA"),
+        'versions': names,
+        'starts': np.array(starts, dtype=np.int64),
+        'ends': np.array(ends, dtype=np.int64),
+        'labels': pd.Index(labels),
+        'services': pd.Index(services),
+        'hours': hours,
+        'key': fingerprint(raw),
+    }
+
+def load_policy(path=None):
+    """Membaca kebijakan SLA berversi dari file JSON (default: sla_policy.json atau SLA_POLICY_PATH)."""
+    path = path or DEFAULT_POLICY_PATH
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    return compile_policy(raw, raw.get("name", os.path.basename(path)))
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _cached_policy(path, mtime):
+    return load_policy(path)
+
+def current_policy(path=None):
+    """load_policy() yang disusun ulang hanya bila file kebijakan berubah."""
+    path = os.path.abspath(path or DEFAULT_POLICY_PATH)
+    return _cached_policy(path, os.path.getmtime(path))
+
+def _codes(values, vocabulary, key=None):
+    """Posisi setiap nilai di vocabulary (-1 bila tidak ada), dihitung sekali per nilai unik."""
+    codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=True)
+    uniques = [key(u) for u in uniques] if key else list(uniques)
+    lookup = vocabulary.get_indexer(uniques) if len(uniques) else np.empty(0, dtype=np.intp)
+    return np.where(codes >= 0, lookup[codes] if len(lookup) else -1, -1)
+
+def apply_policy(policy, created, labels, services=None):
+    """
+    Jam target SLA per tiket menurut versi kebijakan yang berlaku pada tanggal tiket dibuat.
+    Versi dicari dengan searchsorted atas awal masa berlaku (interval join), label dan
+    service dipetakan per nilai unik, lalu jam diambil langsung dari tabel kebijakan.
+    labels sudah dinormalisasi (normalize_label). services (opsional) = Service offering.
+    Mengembalikan {'hours': float array (NaN bila tidak ada aturan), 'version': posisi versi (-1 bila
+    tanggal di luar semua masa berlaku)}.
+    """
+    created_ns = pd.to_datetime(pd.Series(created), errors='coerce').to_numpy(dtype='datetime64[ns]')
+    valid = ~np.isnat(created_ns)
+    ns = created_ns.view(np.int64)
+
+    version = np.searchsorted(policy['starts'], ns, side='right') - 1
+    in_force = valid & (version >= 0)
+    in_force[in_force] &= ns[in_force] < policy['ends'][version[in_force]]
+    version = np.where(in_force, version, -1)
+
+    label_codes = _codes(labels, policy['labels'])
+    service_codes = np.zeros(len(ns), dtype=np.intp)
+    if services is not None and len(policy['services']):
+        service_codes = _codes(services, policy['services'], key=_service_key) + 1
+
+    hours = np.full(len(ns), np.nan)
+    found = in_force & (label_codes >= 0)
+    hours[found] = policy['hours'][version[found], service_codes[found], label_codes[found]]
+    return {'hours': hours, 'version': version}
+
+def policy_caption(policy):
+    """Ringkasan versi kebijakan untuk caption halaman."""
+    def fmt(ns, open_text):
+        return open_text if ns in (_NO_START, _NO_END) else pd.Timestamp(ns).strftime('%d-%m-%Y')
+    parts = [
+        f"{name} ({fmt(start, 'awal')} s.d. {fmt(end, 'sekarang')})"
+        for name, start, end in zip(policy['versions'], policy['starts'], policy['ends'])
+    ]
+    overrides = f", override untuk {len(policy['services'])} service" if len(policy['services']) else ""
+    return f"Kebijakan SLA: **{policy['name']}** — {'; '.join(parts)}{overrides}."
+
+def sla_policy_status():
+    """Memuat kebijakan SLA untuk halaman; menampilkan error dan mengembalikan None bila file tidak valid."""
+    try:
+        policy = current_policy()
+    except (OSError, ValueError, KeyError) as e:
+        st.error(f"Gagal membaca kebijakan SLA: {e}")
+        return None
+    st.caption(policy_caption(policy))
+    return policy
@@ -0,0 +1,117 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from sla_clock import elapsed_hours
+from sla_pause import compute_paused_hours
+
+RISK_BUCKETS = ["Sudah Breach", "< 1 jam", "< 4 jam", "Aman"]
+
+def compute_sla_risk(created, sla_hours, ref_time, cal=None, paused_hours=None):
+    """
+    Sisa waktu SLA (jam) untuk tiket open terhadap ref_time, beserta bucket risikonya.
+    Semua input sejajar (hanya tiket open); perhitungan sepenuhnya vektor.
+    """
+    created = pd.to_datetime(pd.Series(created), errors='coerce')
+    index = created.index
+    c = created.to_numpy(dtype='datetime64[ns]')
+    h = pd.to_numeric(pd.Series(sla_hours, index=index), errors='coerce').to_numpy(dtype='float64')
+    p = np.zeros(len(c)) if paused_hours is None else np.nan_to_num(np.asarray(paused_hours, dtype='float64'))
+
+    ref = np.datetime64(pd.Timestamp(ref_time), 'ns')
+    valid = ~np.isnat(c) & ~np.isnan(h) & (c <= ref)
+
+    remaining = np.full(len(c), np.nan)
+    if valid.any():
+        used = elapsed_hours(c[valid], np.full(int(valid.sum()), ref), cal)
+        remaining[valid] = h[valid] + p[valid] - used
+
+    bucket = np.select(
+        [remaining <= 0, remaining < 1, remaining < 4, remaining >= 4],
+        RISK_BUCKETS,
+        default="Tanpa Target"
+    )
+    return pd.DataFrame({'Sisa SLA (jam)': remaining, 'Risiko SLA': bucket}, index=index)
+
+def render_sla_risk(df, created_col, resolved_col, hours_col, service_col, ticket_col=None,
+                    cal=None, status_log=None, key="sla_risk"):
+    """Menampilkan bagian SLA-at-risk: ringkasan bucket dan daftar ranking per Service Offering."""
+    st.header("SLA At-Risk (Tiket Open)")
+
+    if resolved_col and resolved_col in df.columns:
+        df_open = df[df[resolved_col].isna()]
+    else:
+        df_open = df
+    if df_open.empty or hours_col not in df_open.columns:
+        st.info("Tidak ada tiket open dengan target SLA untuk diproyeksikan.")
+        return
+
+    ref_mode = st.radio(
+        "Waktu acuan:",
+        ["Sekarang", "Tanggal terakhir di data"],
+        horizontal=True,
+        key=f"{key}_ref"
+    )
+    if ref_mode == "Sekarang":
+        ref_time = pd.Timestamp.now()
+    else:
+        latest = [pd.to_datetime(df[created_col], errors='coerce').max()]
+        if resolved_col and resolved_col in df.columns:
+            latest.append(df[resolved_col].max())
+        latest = [t for t in latest if pd.notna(t)]
+        if not latest:
+            st.info("Tidak ada tanggal valid di data untuk dijadikan acuan. Pilih acuan 'Sekarang'.")
+            return
+        ref_time = max(latest)
+
+    paused_hours = None
+    if status_log and ticket_col and ticket_col in df_open.columns:
+        log, pause_states = status_log
+        paused_hours = compute_paused_hours(
+            log, df_open[ticket_col], df_open[created_col],
+            pd.Series(pd.NaT, index=df_open.index), pause_states, cal, ref_time=ref_time
+        )
+
+    risk = compute_sla_risk(df_open[created_col], df_open[hours_col], ref_time, cal, paused_hours)
+    st.caption(f"Acuan: **{ref_time.strftime('%d/%m/%Y %H:%M')}** — {len(df_open):,} tiket open.")
+
+    counts = risk['Risiko SLA'].value_counts()
+    cols = st.columns(len(RISK_BUCKETS))
+    for col, bucket in zip(cols, RISK_BUCKETS):
+        col.metric(bucket, f"{int(counts.get(bucket, 0)):,}")
+
+    if not service_col or service_col not in df_open.columns:
+        return
+
+    risk_df = pd.DataFrame({
+        'Service Offering': df_open[service_col].fillna('N/A').to_numpy(),
+        'Sisa SLA (jam)': risk['Sisa SLA (jam)'].to_numpy(),
+        'Risiko SLA': risk['Risiko SLA'].to_numpy(),
+    })
+    if ticket_col and ticket_col in df_open.columns:
+        risk_df.insert(0, 'No. Tiket', df_open[ticket_col].to_numpy())
+    risk_df = risk_df[risk_df['Risiko SLA'] != "Tanpa Target"]
+    if risk_df.empty:
+        return
+
+    per_service = pd.crosstab(risk_df['Service Offering'], risk_df['Risiko SLA'])
+    per_service = per_service.reindex(columns=RISK_BUCKETS, fill_value=0)
+    per_service['Sisa Terkecil (jam)'] = risk_df.groupby('Service Offering')['Sisa SLA (jam)'].min().round(2)
+    per_service = per_service.sort_values(
+        by=RISK_BUCKETS[:3] + ['Sisa Terkecil (jam)'],
+        ascending=[False, False, False, True]
+    ).reset_index()
+    per_service.insert(0, 'No', range(1, len(per_service) + 1))
+
+    col_left, col_right = st.columns([1, 1])
+    with col_left:
+        st.markdown("**Ranking Service Offering berdasarkan risiko**")
+        st.dataframe(per_service, hide_index=True, use_container_width=True)
+    with col_right:
+        selected = st.selectbox(
+            "Detail tiket untuk Service Offering:",
+            per_service['Service Offering'].tolist(),
+            key=f"{key}_service"
+        )
+        detail = risk_df[risk_df['Service Offering'] == selected].sort_values('Sisa SLA (jam)')
+        detail['Sisa SLA (jam)'] = detail['Sisa SLA (jam)'].round(2)
+        st.dataframe(detail.head(50), hide_index=True, use_container_width=True)
@@ -6,6 +6,56 @@ import re
 from datetime import time, timedelta, datetime
 import numpy as np
 import calendar
+from ticket_index import build_time_index, date_range_picker, apply_range
+from sla_clock import compute_sla, sla_clock_selector
+from sla_pause import compute_paused_hours, status_log_uploader
+from sla_risk import render_sla_risk
+from schema import read_tickets, parse_dates, RESOLVED_FIRST, TICKET_NO, CREATED, RESOLVED, BC, SEVERITY, SERVICE, CHANNEL, LOCATION, CATEGORY, ITEM
+from chart_data import chart_figure, top_n_with_others
+from jobs import submit_job, clear_job, report_progress, job_status, render_job_progress
+from result_cache import fingerprint, cache_get, cache_put, cache_stats
+from report_snapshot import new_snapshot, snapshot_save_panel, snapshot_browser
+from report_export import report_table, build_report_workbook, export_download
+from data_quality import check_dates, record_rejects, render_quality_panel, REASON_UNKNOWN_COMBO, REASON_NO_POLICY
+from ticket_store import (
+    history_rows, history_save_panel, history_months, history_stats, monthly_volume, monthly_sla,
+    max_breach_per_service, occurrence_counts, DEFAULT_DB_PATH
+)
+from sla_policy import normalize_label, apply_policy, sla_policy_status
+from partition_pool import worker_count, map_partitions, pack_frame, unpack_frame, spool_directory
+from breach_sketch import sketch_by_group, merge_grouped, render_breach_distribution
+from time import perf_counter
+
+REGIONAL_3_LOCATIONS = [
+    "P. Lembar", "Regional 3", "P. Batulicin", "R. Jawa", "Terminal Celukan Bawang",
+    "Sub Regional BBN", "P. Tg. Emas", "P. Bumiharjo", "Tanjung Perak", "R. Bali Nusra",
+    "P. Badas", "TANJUNGPERAK", "TANJUNGEMAS/KEUANGAN", "TANJUNGEMAS", "P. Tg. Intan",
+    "BANJARMASIN/TPK", "KOTABARU/MEKARPUTIH", "P. Waingapu", "R. Kalimantan", "Terminal Nilam",
+    "Terminal Kumai", "P. Kalimas", "P. Tg. Wangi", "P. Gresik", "P. Kotabaru",
+    "BANJARMASIN/KOMERSIAL", "TANJUNGWANGI/TEKNIK", "Sub Regional Kalimantan", "GRESIK/TERMINAL",
+    "Terminal Kota Baru", "P. Sampit", "BANJARMASIN/TMP", "P. Bagendang", "BANJARMASIN/PDS",
+    "TENAU/KALABAHI", "P. Bima", "P. Tenau Kupang", "Terminal Lembar", "P. Tegal",
+    "Terminal Trisakti", "BENOA/OPKOM", "P. Benoa", "BANJARMASIN/TEKNIK", "BANJARMASIN/PBJ",
+    "TANJUNGINTAN", "KOTABARU", "TENAU", "Sub Regional Jawa Timur", "KUMAI/OPKOM",
+    "Terminal Batulicin", "Terminal Gresik", "KUMAI/KEUPER", "LEMBAR/KEUPER", "P. Kalabahi",
+    "BIMA/BADAS", "Terminal Jamrud", "TENAU/WAINGAPU", "Terminal Benoa", "P. Tg. Tembaga",
+    "BIMA/PDS", "BENOA/SUK", "P. Clk. Bawang", "KUMAI/BUMIHARJO", "P. Pulang Pisau",
+    "Terminal Labuan Bajo", "P. Maumere", "BENOA/KEUANGAN", "BENOA/PKWT", "Terminal Kalimas",
+    "BANJARMASIN/KEUANGAN", "BENOA/PEMAGANG", "GRESIK/KEUANGAN", "Terminal Petikemas Banjarmasin",
+    "CELUKANBAWANG", "P. Ende-Ippi", "SAMPIT/BAGENDANG", "Terminal Bima", "KOTABARU/KEPANDUAN",
+    "Terminal Sampit", "Terminal Kupang", "BENOA/TEKNIK", "Terminal Maumere", "PROBOLINGGO/PLS",
+    "SAMPIT/PKWT", "P. Labuan Bajo", "P. Kalianget", "Banjarmasin", "Terminal Waingapu", "MAUMERE/ENDE"
+]
+
+# Label sumber sementara saat hasil per file diproses; diganti nama file milik sesi saat diambil,
+# sehingga hasil di cache bersama tidak membawa nama file pengunggah pertama.
+SOURCE_PLACEHOLDER = "{sumber}"
+
+# Naikkan bila logika process_sla_dataframe berubah agar hasil lama di cache tidak dipakai lagi.
+SLA_RESULT_VERSION = 9
+
+# Kolom yang dipakai agregasi Summary; kolom lain tidak ikut diproses.
+ANALYTICS_COLUMNS = [TICKET_NO, CREATED, RESOLVED, BC, SEVERITY, SERVICE, CHANNEL, LOCATION, CATEGORY, ITEM]
 
 def get_table_css():
     return """
@@ -57,17 +107,6 @@ def find_column(df_cols, possible_names):
             return col
     return None
 
-def normalize_label(s: str) -> str:
-    if pd.isna(s):
-        return ""
-    s = str(s).strip()
-    s = re.sub(r'\s+', ' ', s)
-    s = re.sub(r'\s*-\s*', ' - ', s)
-    s = re.sub(r'(?<=\d)(?=[A-Za-z])', ' ', s)
-    s = re.sub(r'(?<=\D)(?=\d)', ' ', s)
-    s = re.sub(r'\s+', ' ', s).strip()
-    return s
-
 def format_hari_jam_menit(total_hours_decimal):
     """Mengubah jam desimal menjadi format 'X hari Y jam Z menit'."""
     if pd.isna(total_hours_decimal):
@@ -85,87 +124,345 @@ def format_hari_jam_menit(total_hours_decimal):
         
     return f"{days} hari {hours} jam {minutes} menit"
 
-def map_to_hours(label: str, sla_mapping_hours: dict):
-    """Mencocokkan label yang dinormalisasi ke jam SLA."""
-    if not label:
-        return None
-    norm_label = normalize_label(label)
-    for key in sla_mapping_hours.keys():
-        if norm_label == normalize_label(key):
-            return sla_mapping_hours[key]
-    return None
+def _notify(messages, level, text):
+    if messages is None:
+        getattr(st, level)(text)
+    else:
+        messages.append((level, text))
 
-def process_sla_dataframe(df, type_name: str, sla_mapping_hours: dict):
+def process_sla_dataframe(df, type_name: str, sla_policy: dict, sla_calendar=None, status_log=None, messages=None, quality=None):
     """
     Fungsi inti untuk menghitung SLA & Time Breach.
+    sla_policy (lihat sla_policy.compile_policy) menentukan target jam per tiket
+    menurut versi kebijakan yang berlaku pada tanggal tiket dibuat.
+    sla_calendar (opsional) mengaktifkan perhitungan berdasarkan jam kerja.
+    status_log (opsional) berupa (log, pause_states) untuk mengurangi waktu jeda dari SLA.
+    messages (opsional) menampung peringatan sebagai (level, teks) alih-alih langsung ditampilkan,
+    untuk pemanggilan dari background job.
+    quality (opsional) berupa list yang diisi rekap baris yang ditolak (lihat data_quality).
     """
     
-    possible_bc_cols = ['Businesscriticality', 'Business criticality', 'Business Criticality', 'BusinessCriticality']
-    possible_sev_cols = ['Severity', 'severity', 'SEVERITY']
-    possible_created_cols = ['Tiket Dibuat', 'Tiket dibuat', 'Created', 'Created Date', 'CreatedAt']
-    possible_resolved_cols = ['Resolved', 'Tiket Ditutup', 'Closed', 'Closed At', 'Tiket ditutup']
-
-    bc_col = find_column(df.columns, possible_bc_cols)
-    sev_col = find_column(df.columns, possible_sev_cols)
-    date_created_col = find_column(df.columns, possible_created_cols)
-    date_resolved_col = find_column(df.columns, possible_resolved_cols)
-    
-    df_calc = df.copy() 
+    bc_col = BC if BC in df.columns else None
+    sev_col = SEVERITY if SEVERITY in df.columns else None
+    date_created_col = CREATED if CREATED in df.columns else None
+    date_resolved_col = RESOLVED if RESOLVED in df.columns else None
+    ticket_col = TICKET_NO if TICKET_NO in df.columns else None
 
     if not all([bc_col, sev_col, date_created_col]):
-        st.warning(f"**[{type_name}]**: Kolom penting (BC, Severity, Created) tidak ditemukan. Tidak dapat menghitung SLA.")
-        return df_calc 
+        _notify(messages, 'warning', f"**[{type_name}]**: Kolom penting (BC, Severity, Created) tidak ditemukan. Tidak dapat menghitung SLA.")
+        return df[[c for c in ANALYTICS_COLUMNS if c in df.columns]]
     
     if not date_resolved_col:
-        st.warning(f"**[{type_name}]**: Kolom 'Resolved'/'Tiket Ditutup' tidak ditemukan.")
+        _notify(messages, 'warning', f"**[{type_name}]**: Kolom 'Resolved'/'Tiket Ditutup' tidak ditemukan.")
         date_resolved_col = 'Resolved_Placeholder' 
-        if date_resolved_col not in df_calc.columns:
-            df_calc[date_resolved_col] = pd.NaT
 
     try:
-        df_calc[date_created_col] = pd.to_datetime(df_calc[date_created_col], errors='coerce')
-        df_calc[date_resolved_col] = pd.to_datetime(df_calc[date_resolved_col], errors='coerce')
-
-        df_calc = df_calc.dropna(subset=[date_created_col]) 
-        df_calc['Month'] = df_calc[date_created_col].dt.strftime('%Y-%m (%B)')
-
-        df_calc['_bc_raw'] = df_calc[bc_col].astype(str).fillna('').str.strip()
-        df_calc['_sev_raw'] = df_calc[sev_col].astype(str).fillna('').str.strip()
+        created = parse_dates(df[date_created_col], df.columns)
+        valid = created.notna()
+        tickets = df[ticket_col] if ticket_col else None
+        check_dates(quality, type_name, date_created_col, df[date_created_col], created, tickets)
+
+        # proyeksi kolom + filter baris sekaligus: hanya kolom analitik yang disalin
+        df_calc = df.loc[valid, [c for c in ANALYTICS_COLUMNS if c in df.columns]]
+        df_calc[date_created_col] = created[valid]
+        calc_tickets = df_calc[ticket_col] if ticket_col else None
+        if date_resolved_col in df.columns:
+            resolved_raw = df_calc[date_resolved_col]
+            df_calc[date_resolved_col] = parse_dates(resolved_raw, df.columns)
+            check_dates(quality, type_name, date_resolved_col, resolved_raw, df_calc[date_resolved_col], calc_tickets, allow_empty=True)
+        else:
+            df_calc[date_resolved_col] = pd.NaT
+        # label bulan diformat sekali per bulan unik, bukan per baris
+        month_key = df_calc[date_created_col].to_numpy(dtype='datetime64[M]')
+        months, month_pos = np.unique(month_key, return_inverse=True)
+        month_labels = pd.DatetimeIndex(months).strftime('%Y-%m (%B)').to_numpy(dtype=object)
+        df_calc['Month'] = month_labels[month_pos.ravel()]
+
+        bc_raw = df_calc[bc_col].astype(str).fillna('').str.strip()
+        sev_raw = df_calc[sev_col].astype(str).fillna('').str.strip()
         
-        df_calc['Businesscriticality-Severity'] = (df_calc['_bc_raw'] + " - " + df_calc['_sev_raw']).apply(normalize_label)
+        combo = bc_raw + " - " + sev_raw
+        label_map = {v: normalize_label(v) for v in combo.unique()}
+        df_calc['Businesscriticality-Severity'] = combo.map(label_map)
         
-        df_calc['Target SLA (jam)'] = df_calc['Businesscriticality-Severity'].apply(lambda x: map_to_hours(x, sla_mapping_hours))
-
-        df_calc['Target Selesai'] = df_calc.apply(
-            lambda r: (r[date_created_col] + pd.to_timedelta(r['Target SLA (jam)'], unit='h'))
-            if pd.notna(r[date_created_col]) and pd.notna(r['Target SLA (jam)']) else pd.NaT,
-            axis=1
+        policy = apply_policy(
+            sla_policy, df_calc[date_created_col], df_calc['Businesscriticality-Severity'],
+            df_calc[SERVICE] if SERVICE in df_calc.columns else None
         )
-
-        df_calc['SLA'] = df_calc.apply(
-            lambda r: 1 if (pd.notna(r['Target Selesai']) and pd.notna(r[date_resolved_col]) and r[date_resolved_col] <= r['Target Selesai'])
-            else (0 if (pd.notna(r['Target Selesai']) and pd.notna(r[date_resolved_col])) else pd.NA),
-            axis=1
+        df_calc['Target SLA (jam)'] = policy['hours']
+        in_force = policy['version'] >= 0
+        record_rejects(
+            quality, type_name, REASON_NO_POLICY, date_created_col,
+            ~in_force, df_calc[date_created_col], calc_tickets
+        )
+        record_rejects(
+            quality, type_name, REASON_UNKNOWN_COMBO, 'Businesscriticality-Severity',
+            in_force & np.isnan(policy['hours']), df_calc['Businesscriticality-Severity'], calc_tickets
         )
-        
-        def calculate_time_breach(row):
-            sla_val = row.get('SLA')
-            if pd.isna(sla_val): return pd.NA 
 
-            if pd.notna(row[date_resolved_col]) and pd.notna(row[date_created_col]) and pd.notna(row['Target SLA (jam)']):
-                resolution_duration = row[date_resolved_col] - row[date_created_col]
-                sla_timedelta = pd.to_timedelta(row['Target SLA (jam)'], unit='h')
-                breach = resolution_duration - sla_timedelta
-                return breach.total_seconds() / 3600 
-            return pd.NA
+        paused_hours = None
+        if status_log and ticket_col:
+            log, pause_states = status_log
+            # tiket open: jeda dihitung sampai waktu file diproses (ikut di-cache bersama hasilnya), bukan nol
+            paused_hours = compute_paused_hours(
+                log, df_calc[ticket_col], df_calc[date_created_col], df_calc[date_resolved_col], pause_states, sla_calendar,
+                ref_time=pd.Timestamp.now()
+            )
+            df_calc['Waktu Jeda (jam)'] = paused_hours
+        elif status_log:
+            _notify(messages, 'warning', f"**[{type_name}]**: Kolom 'No. Tiket' tidak ditemukan, log status tidak dapat dipakai.")
 
-        df_calc['Time Breach'] = df_calc.apply(calculate_time_breach, axis=1)
+        sla_result = compute_sla(
+            df_calc[date_created_col], df_calc[date_resolved_col], df_calc['Target SLA (jam)'], sla_calendar, paused_hours
+        )
+        df_calc['Target Selesai'] = sla_result['target']
+        df_calc['SLA'] = sla_result['sla']
+        df_calc['Time Breach'] = sla_result['breach_hours']
 
         return df_calc
 
     except Exception as e:
-        st.error(f"Error saat menghitung SLA untuk {type_name}: {e}")
-        return df
+        _notify(messages, 'error', f"Error saat menghitung SLA untuk {type_name}: {e}")
+        return df[[c for c in ANALYTICS_COLUMNS if c in df.columns]]
+
+def carry_over_mask(df_all, ticket_col, resolved_col=None):
+    """
+    Mask baris yang dipertahankan saat menggabungkan tiket carry-over antar bulan:
+    satu baris per No. Tiket, yaitu state terakhir (tiket yang sudah ditutup
+    diutamakan, lalu file/baris paling akhir). Baris tanpa No. Tiket selalu dipertahankan.
+    """
+    n = len(df_all)
+    if not ticket_col or ticket_col not in df_all.columns or n == 0:
+        return np.ones(n, dtype=bool)
+
+    codes, _ = pd.factorize(df_all[ticket_col], use_na_sentinel=True)
+    if resolved_col and resolved_col in df_all.columns:
+        is_closed = df_all[resolved_col].notna().to_numpy()
+    else:
+        is_closed = np.zeros(n, dtype=bool)
+
+    position = np.arange(n)
+    order = np.lexsort((position, is_closed, codes))
+    sorted_codes = codes[order]
+    is_last = np.ones(n, dtype=bool)
+    is_last[:-1] = sorted_codes[1:] != sorted_codes[:-1]
+
+    keep = np.zeros(n, dtype=bool)
+    keep[order[is_last]] = True
+    keep[codes < 0] = True
+    return keep
+
+def combine_processed(list_df_processed, regional_only=False, regional_locations=None, merged_rows=None,
+                      names=None, messages=None):
+    """
+    Menggabungkan frame hasil process_sla_dataframe menjadi satu frame.
+    Filter Regional 3 dan penggabungan carry-over diterapkan sebagai satu mask,
+    sehingga hanya ada satu concat dan satu take baris.
+    Filter lokasi diterapkan per frame; frame tanpa kolom lokasi ikut utuh dan dilaporkan (names = nama file).
+    merged_rows (opsional, list) diisi mask baris yang dibuang karena carry-over, satu per frame.
+    Mengembalikan (DataFrame, jumlah baris setelah filter lokasi, jumlah carry-over digabung).
+    """
+    if not list_df_processed:
+        return pd.DataFrame(), 0, 0
+
+    # mask dihitung dari kolom kunci saja; frame lengkap hanya di-concat sekali setelah difilter
+    key_cols = [c for c in (TICKET_NO, RESOLVED) if all(c in d.columns for d in list_df_processed)]
+    keys = pd.concat([d[key_cols] for d in list_df_processed], ignore_index=True)
+
+    keep = np.ones(len(keys), dtype=bool)
+    if regional_only:
+        masks, unfiltered = [], []
+        for i, d in enumerate(list_df_processed):
+            if LOCATION in d.columns:
+                masks.append(d[LOCATION].astype(str).str.strip().isin(regional_locations or []).to_numpy())
+            else:
+                masks.append(np.ones(len(d), dtype=bool))
+                unfiltered.append(names[i] if names else f"File {i + 1}")
+        keep &= np.concatenate(masks)
+        if unfiltered:
+            _notify(
+                messages, 'warning',
+                f"Kolom lokasi tidak ditemukan di {', '.join(unfiltered)}: filter Regional 3 tidak diterapkan "
+                f"pada file tersebut (semua barisnya ikut dihitung)."
+            )
+
+    rows_after_filter = int(keep.sum())
+    # state terakhir dipilih hanya di antara baris yang lolos filter lokasi
+    kept_pos = np.flatnonzero(keep)
+    keep[kept_pos] = carry_over_mask(keys.iloc[kept_pos], TICKET_NO, RESOLVED)
+    merged = rows_after_filter - int(keep.sum())
+    del keys
+
+    bounds = np.cumsum([0] + [len(d) for d in list_df_processed])
+    if merged_rows is not None:
+        carried = np.zeros(len(keep), dtype=bool)
+        carried[kept_pos] = ~keep[kept_pos]
+        merged_rows.extend(carried[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:]))
+    parts = []
+    for d, lo, hi in zip(list_df_processed, bounds[:-1], bounds[1:]):
+        part_keep = keep[lo:hi]
+        parts.append(d if part_keep.all() else d[part_keep])
+    return pd.concat(parts, ignore_index=True), rows_after_filter, merged
+
+def is_regional(df):
+    """Mask baris dengan lokasi Regional 3 (sama dengan filter lokasi di combine_processed); None bila tanpa kolom lokasi."""
+    if LOCATION not in df.columns:
+        return None
+    return df[LOCATION].astype(str).str.strip().isin(REGIONAL_3_LOCATIONS).to_numpy()
+
+def breach_sketches(df_processed):
+    """
+    Sketch Time Breach satu partisi per (bulan tiket dibuat 'YYYY-MM', lokasi Regional 3) -> {service: sketch}.
+    Dihitung sekali saat partisi diproses dan di-cache bersama hasilnya; hanya tiket selesai yang masuk.
+    """
+    if not {CREATED, SERVICE, 'Time Breach'} <= set(df_processed.columns):
+        return {}
+    done = df_processed['Time Breach'].notna().to_numpy()
+    df = df_processed[done]
+    months = df[CREATED].dt.strftime('%Y-%m').to_numpy()
+    services = df[SERVICE].to_numpy()
+    hours = df['Time Breach'].to_numpy()
+    regional = is_regional(df)
+    if regional is None:
+        # tanpa kolom lokasi: tidak bisa difilter, kunci lokasi None
+        return {
+            (month, None): sketch_by_group(services[rows], hours[rows])
+            for month, rows in pd.Series(months).groupby(months, sort=True).indices.items()
+        }
+    keys = pd.DataFrame({'month': months, 'regional': regional})
+    return {
+        (month, bool(reg)): sketch_by_group(services[rows], hours[rows])
+        for (month, reg), rows in keys.groupby(['month', 'regional'], sort=True).indices.items()
+    }
+
+def monthly_breach_sketches(list_df_processed, list_sketches, merged_rows, regional_only=False, months=None):
+    """
+    Sketch Time Breach per bulan {'YYYY-MM': {service: sketch}} untuk hasil combine_processed,
+    digabung dari sketch partisi tanpa membaca ulang Time Breach. Hanya partisi yang kehilangan
+    tiket selesai karena carry-over yang dihitung ulang dari baris yang dipertahankan.
+    Dengan regional_only, partisi tanpa kolom lokasi (kunci None) ikut utuh seperti di combine_processed.
+    months (opsional) adalah hasil sebelumnya yang ikut digabung (mis. Incident lalu Request).
+    """
+    months = {} if months is None else months
+    for df, sketches, merged in zip(list_df_processed, list_sketches, merged_rows):
+        if merged.any() and 'Time Breach' in df.columns and (merged & df['Time Breach'].notna().to_numpy()).any():
+            sketches = breach_sketches(df[~merged])
+        for (month, regional), grouped in sketches.items():
+            if regional_only and regional is False:
+                continue
+            months[month] = merge_grouped(months[month], grouped) if month in months else grouped
+    return months
+
+def process_upload_partition(data, type_name, file_no, name, sla_policy, sla_calendar=None, status_log=None, spool=None):
+    """
+    Satu partisi Summary (satu file upload = satu bulan x tipe) untuk worker process pool:
+    membaca workbook dari bytes, menghitung SLA, lalu mengemas hasil sebagai Arrow IPC
+    (file di folder spool bila diberikan, lihat partition_pool.pack_frame).
+    Mengembalikan (frame terkemas, jumlah baris mentah, pesan, rekap kualitas data, sketch breach).
+    """
+    try:
+        df_raw = read_tickets(io.BytesIO(data), prefer=RESOLVED_FIRST)
+    except Exception as e:
+        raise ValueError(f"{type_name} (File {file_no}) — {name}: {e}") from e
+    rows = len(df_raw)
+    file_messages, file_quality = [], []
+    df_processed = process_sla_dataframe(
+        df_raw, SOURCE_PLACEHOLDER, sla_policy, sla_calendar, status_log, messages=file_messages, quality=file_quality
+    )
+    return pack_frame(df_processed, spool), rows, file_messages, file_quality, breach_sketches(df_processed)
+
+def load_and_process_uploads(job, incident_files, request_files, sla_policy, sla_calendar=None, status_log=None, workers=None):
+    """
+    Background job Summary: membaca lalu menghitung SLA setiap file upload sambil melaporkan progres.
+    File yang belum ada di cache diproses paralel di process pool (satu file per worker, lihat
+    partition_pool) bila tersedia lebih dari satu worker; bila tidak, satu per satu di proses ini.
+    Urutan hasil selalu mengikuti urutan upload. Pesan dan rekap kualitas di cache disimpan tanpa
+    nama file (SOURCE_PLACEHOLDER) dan diberi nama file upload sesi ini saat dikembalikan.
+    Frame hasil dipakai bersama lewat cache antar sesi: perlakukan sebagai read-only
+    (combine_processed selalu membuat frame baru).
+    Mengembalikan (list Incident terproses, list Request terproses, daftar pesan, rekap kualitas data,
+    sketch breach per file {'Incident': [...], 'Request': [...]}).
+    """
+    uploads = [("Incident", i, f) for i, f in enumerate(incident_files)]
+    uploads += [("Request", i, f) for i, f in enumerate(request_files)]
+    total = 2 * len(uploads)
+    done = 0
+
+    # hasil per file dibagi antar sesi: kunci = isi file + kebijakan SLA + mode jam + log jeda
+    settings_key = fingerprint(
+        SLA_RESULT_VERSION, sla_policy['key'], sla_calendar,
+        (status_log[0], sorted(status_log[1])) if status_log else None
+    )
+    keys = [fingerprint(uploaded, type_name, settings_key) for type_name, _, uploaded in uploads]
+    results = [cache_get(key) for key in keys]
+    for step, (type_name, i, uploaded) in enumerate(uploads):
+        if results[step] is not None:
+            done += 2
+            report_progress(job, done, total, f"{type_name} ({uploaded.name}): diambil dari cache", files=1, rows=len(results[step][0]))
+
+    missing = [step for step, result in enumerate(results) if result is None]
+    workers = min(worker_count(workers), len(missing))
+    if workers > 1:
+        def collect(pos, result):
+            nonlocal done
+            step = missing[pos]
+            type_name, _, uploaded = uploads[step]
+            packed, rows, file_messages, file_quality, sketches = result
+            results[step] = (unpack_frame(packed), file_messages, file_quality, sketches)
+            cache_put(keys[step], results[step])
+            done += 2
+            report_progress(job, done, total, f"Selesai {type_name} ({uploaded.name}), {rows:,} baris", files=1, rows=rows)
+            return results[step]
+
+        report_progress(job, done, total, f"Memproses {len(missing)} file di {workers} proses paralel")
+        with spool_directory() as spool:
+            map_partitions(
+                process_upload_partition,
+                [
+                    (uploads[step][2].getvalue(), uploads[step][0], uploads[step][1] + 1, uploads[step][2].name,
+                     sla_policy, sla_calendar, status_log, spool)
+                    for step in missing
+                ],
+                workers, on_done=collect
+            )
+    else:
+        for step in missing:
+            type_name, i, uploaded = uploads[step]
+            report_progress(job, done, total, f"Membaca {type_name} (File {i+1}): {uploaded.name}")
+            try:
+                df_raw = read_tickets(io.BytesIO(uploaded.getvalue()), prefer=RESOLVED_FIRST)
+            except Exception as e:
+                raise ValueError(f"{type_name} (File {i+1}) — {uploaded.name}: {e}") from e
+
+            report_progress(job, done + 1, total, f"Menghitung SLA {type_name} ({uploaded.name}) ({len(df_raw):,} baris)", files=1, rows=len(df_raw))
+            file_messages, file_quality = [], []
+            df_processed = process_sla_dataframe(
+                df_raw, SOURCE_PLACEHOLDER, sla_policy, sla_calendar, status_log, messages=file_messages, quality=file_quality
+            )
+            del df_raw
+            results[step] = (df_processed, file_messages, file_quality, breach_sketches(df_processed))
+            cache_put(keys[step], results[step])
+            done += 2
+
+    processed = {"Incident": [], "Request": []}
+    sketches = {"Incident": [], "Request": []}
+    messages = []
+    quality = []
+    for (type_name, _, uploaded), (df_processed, file_messages, file_quality, file_sketches) in zip(uploads, results):
+        label = f"{type_name} ({uploaded.name})"
+        processed[type_name].append(df_processed)
+        sketches[type_name].append(file_sketches)
+        messages.extend((level, text.replace(SOURCE_PLACEHOLDER, label)) for level, text in file_messages)
+        quality.extend({**record, 'Sumber': label} for record in file_quality)
+
+    report_progress(job, total, total, "Selesai")
+    return processed["Incident"], processed["Request"], messages, quality, sketches
+
+def _slug_period(label):
+    return re.sub(r'[^0-9A-Za-z]+', '_', str(label)).strip('_') or "all"
+
+def _upload_signature(uploaded_files):
+    return tuple(getattr(f, "file_id", None) or (f.name, f.size) for f in uploaded_files)
 
 def get_sla_summary(df_processed):
     """Mengambil ringkasan SLA dari DataFrame yang sudah diproses."""
@@ -188,6 +485,24 @@ def get_sla_summary(df_processed):
         'total_closed': total_closed
     }
 
+def occurrence_table(df_slice, data_col, group_by_col, static_type=None, limit=None):
+    """
+    Agregasi Occurrence (jumlah kasus per Type dan data_col), dipakai tabel HTML maupun export Excel.
+    Mengembalikan (DataFrame [Type, data_col, Number of Case], judul kolom).
+    """
+    if static_type:
+        agg = df_slice.groupby(data_col).size().reset_index(name='Number of Case')
+        agg.insert(0, 'Type', static_type)
+    else:
+        type_key = df_slice[group_by_col].fillna('N/A').rename('Type')
+        agg = df_slice.groupby([type_key, df_slice[data_col]]).size().reset_index(name='Number of Case')
+
+    agg = agg.sort_values(by=['Type', 'Number of Case'], ascending=[True, False])
+
+    if limit:
+        return agg.groupby('Type').head(limit).reset_index(drop=True), f"Top {limit} Occurrence"
+    return agg.reset_index(drop=True), "Occurrence (All)"
+
 def display_occurrence_table(df_slice, data_col, group_by_col, static_type=None, limit=None):
     """
     Membuat tabel HTML untuk Occurrence dengan STYLE BARU.
@@ -200,27 +515,14 @@ def display_occurrence_table(df_slice, data_col, group_by_col, static_type=None,
         return f"<p>Error: Kolom Kategori ('{group_by_col}') tidak ditemukan.</p>"
 
     try:
-        df_agg = df_slice.copy()
-        if static_type:
-            df_agg['Type'] = static_type
-            group_cols = ['Type', data_col]
-        else:
-            df_agg['Type'] = df_agg[group_by_col].fillna('N/A')
-            group_cols = ['Type', data_col]
-        
-        agg = df_agg.groupby(group_cols).size().reset_index(name='Number of Case')
-        agg = agg.sort_values(by=['Type', 'Number of Case'], ascending=[True, False])
-        
-        if limit:
-            final_df = agg.groupby('Type').head(limit).reset_index(drop=True)
-            header_text = f"Top {limit} Occurrence"
-        else:
-            final_df = agg.reset_index(drop=True)
-            header_text = "Occurrence (All)"
-
+        final_df, header_text = occurrence_table(df_slice, data_col, group_by_col, static_type, limit)
     except Exception as e:
         return f"<p>Error saat agregasi data: {e}</p>"
 
+    return occurrence_html(final_df, data_col, header_text)
+
+def occurrence_html(final_df, data_col, header_text):
+    """Tabel HTML Occurrence dari hasil occurrence_table() (atau query riwayat berkolom sama)."""
     html_table = '<table class="manual-sla-table"><thead><tr>'
     html_table += "<th>Type</th>"
     html_table += f"<th>{header_text} ({data_col})</th>"
@@ -241,10 +543,35 @@ def display_occurrence_table(df_slice, data_col, group_by_col, static_type=None,
                 html_table += f"<td>{row[data_col]}</td>"
                 html_table += f"<td class='text-center'>{row['Number of Case']}</td>"
                 html_table += "</tr>"
-    
+
     html_table += "</tbody></table>"
     return html_table
 
+def max_breach_html(bottom3_sla):
+    """Tabel HTML Top 3 Service Offering dengan Max Time Breach (jam) terbesar."""
+    html_bottom = '<table class="manual-sla-table"><thead><tr>'
+    html_bottom += "<th>No</th>"
+    html_bottom += "<th>Service Offering</th>"
+    html_bottom += "<th>Max Time Breach</th>"
+    html_bottom += "<th>∑Total Tiket</th>"
+    html_bottom += "<th>∑ Tiket Breach</th>"
+    html_bottom += "</tr></thead><tbody>"
+
+    if bottom3_sla.empty:
+        html_bottom += "<tr class='row-data'><td colspan='5' style='text-align:center;'>Tidak ada data breach untuk ditampilkan.</td></tr>"
+    else:
+        for _, row in bottom3_sla.iterrows():
+            html_bottom += "<tr class='row-data'>"
+            html_bottom += f"<td class='col-no'>{row['No']}</td>"
+            html_bottom += f"<td><b>{row['Service Offering']}</b></td>"
+            html_bottom += f"<td class='text-center'>{format_hari_jam_menit(row['Max Time Breach'])}</td>"
+            html_bottom += f"<td class='text-center'>{row['∑Total Tiket']}</td>"
+            html_bottom += f"<td class='text-center'>{row['∑ Tiket Breach']}</td>"
+            html_bottom += "</tr>"
+
+    html_bottom += "</tbody></table>"
+    return html_bottom
+
 def make_simple_html_table(df):
     """Konversi DataFrame sederhana ke Tabel HTML dengan Style Baru."""
     html = '<table class="manual-sla-table"><thead><tr>'
@@ -263,6 +590,177 @@ def make_simple_html_table(df):
     return html
 
 
+def render_summary_snapshot(bundle):
+    """Merender ulang laporan Summary dari snapshot tersimpan (tanpa file mentah maupun perhitungan ulang)."""
+    meta, metrics, figures, html = bundle['meta'], bundle['metrics'], bundle['figures'], bundle['html']
+
+    st.markdown(f"### 🗂️ {meta.get('title', 'Snapshot')}")
+    st.caption(
+        f"Disimpan {meta.get('created_at', '-')} — bulan: {', '.join(meta.get('months', []))} — "
+        f"lokasi: {meta.get('regional', 'All')} — mode SLA: {meta.get('sla_clock', '-')}"
+        f"{' + jeda status' if meta.get('status_log') else ''} — {meta.get('rows', 0):,} baris diolah."
+    )
+    with st.expander("File sumber"):
+        st.write("Incident:", ", ".join(meta.get('incident_files', [])))
+        st.write("Request:", ", ".join(meta.get('request_files', [])))
+
+    def show_figure(name, empty_msg="Tidak ada data untuk chart ini."):
+        if name in figures:
+            st.plotly_chart(figures[name], use_container_width=True)
+        else:
+            st.info(empty_msg)
+
+    st.subheader("Volume Tiket")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Tiket Insiden", f"{metrics.get('total_incident', 0):,}")
+    col2.metric("Total Tiket Request", f"{metrics.get('total_request', 0):,}")
+    col3.metric("Total Semua Tiket", f"{metrics.get('total_incident', 0) + metrics.get('total_request', 0):,}")
+    col1, col2 = st.columns(2)
+    col1.metric("Tiket Insiden Aktif/Pending", f"{metrics.get('active_incident', 0):,}")
+    col2.metric("Tiket Request Aktif/Pending", f"{metrics.get('active_request', 0):,}")
+
+    st.divider()
+    st.markdown("<h4>Rincian per Bulan</h4>", unsafe_allow_html=True)
+    col_chart1, col_chart2 = st.columns(2)
+    with col_chart1:
+        st.markdown("**Total Tiket Dibuat (per Bulan)**")
+        show_figure('monthly_total')
+    with col_chart2:
+        st.markdown("**Total Tiket Aktif/Pending (per Bulan)**")
+        show_figure('monthly_active')
+
+    st.markdown("#### **Total Tiket (Drill-down)**")
+    show_figure('sunburst')
+    st.divider()
+
+    c1, c2 = st.columns(2)
+    with c1:
+        st.subheader("Analisis Self-Service (ESS)")
+        if 'ess_tickets' in metrics:
+            st.metric("Tiket ESS (Self-Service)", f"{metrics['ess_tickets']:,}", f"{metrics['ess_percent']:.1f}%")
+        st.subheader("Top 3 Service Offering dengan Max Breach Terbesar")
+        st.caption(f"Periode: {meta.get('period', 'All')}")
+        if 'top3_service_breach' in html:
+            st.markdown(html['top3_service_breach'], unsafe_allow_html=True)
+        else:
+            st.info("Tidak ada data breach untuk dianalisis.")
+    with c2:
+        st.subheader("Distribusi Channel")
+        tabs = st.tabs(["Semua Tiket", "Incident", "Request"])
+        for tab, title in zip(tabs, ["Semua Tiket", "Incident", "Request"]):
+            with tab:
+                show_figure(f"channel_{title}", "Tidak ada data channel.")
+
+    st.divider()
+    st.subheader("Performa SLA")
+    col_sla1, col_sla2 = st.columns(2)
+    with col_sla1:
+        st.markdown("##### Incident")
+        show_figure('sla_incident', "Tidak ada data Incident untuk ditampilkan.")
+    with col_sla2:
+        st.markdown("##### Request")
+        show_figure('sla_request', "Tidak ada data Request untuk ditampilkan.")
+
+    st.divider()
+    st.caption("SLA At-Risk tidak disimpan di snapshot karena proyeksinya bergantung pada waktu acuan saat dibuka.")
+
+    st.subheader("Occurrence Analysis by Category")
+    view_mode = st.radio("Pilih Tampilan Jumlah Data:", ["Top 3", "All"], horizontal=True, key="snapshot_view_mode")
+    limit_name = "top3" if view_mode == "Top 3" else "all"
+    for type_name, label in [("incident", "Incident Analysis"), ("request", "Request Analysis")]:
+        st.markdown(f"<h4>{label}</h4>", unsafe_allow_html=True)
+        table = html.get(f"occurrence_{type_name}_{limit_name}")
+        if table:
+            st.markdown(table, unsafe_allow_html=True)
+        else:
+            st.warning(f"Tidak ada data untuk periode: {meta.get('period', 'All')}")
+
+    st.subheader("Solved vs Active/Pending Status")
+    if 'status' in html:
+        st.markdown(html['status'], unsafe_allow_html=True)
+    else:
+        st.warning("Tidak ada data untuk ditampilkan.")
+
+def render_summary_history():
+    """Laporan Summary langsung dari riwayat SQLite lokal: agregasi dijalankan sebagai SQL, lintas semua upload tersimpan."""
+    try:
+        months = history_months()
+    except Exception as e:
+        st.error(f"Gagal membuka database riwayat: {e}")
+        return
+    if not months:
+        st.info("Riwayat database masih kosong. Olah file lalu gunakan 'Simpan ke Riwayat Database'.")
+        return
+
+    if len(months) > 1:
+        first_month, last_month = st.select_slider(
+            "Rentang bulan:", options=months, value=(months[0], months[-1]), key="summary_history_range"
+        )
+    else:
+        first_month = last_month = months[0]
+    view_mode = st.radio("Pilih Tampilan Jumlah Data:", ["Top 3", "All"], horizontal=True, key="history_view_mode")
+    limit_val = 3 if view_mode == "Top 3" else None
+
+    started = perf_counter()
+    volume = monthly_volume(first_month, last_month)
+    sla_monthly = monthly_sla(first_month, last_month)
+    top_breach = max_breach_per_service(first_month, last_month, top=3)
+    occ_incident, occ_request = occurrence_counts(first_month, last_month, limit=limit_val)
+    elapsed = perf_counter() - started
+
+    stats = history_stats()
+    st.caption(
+        f"Riwayat {DEFAULT_DB_PATH}: {int(stats['n'].sum()):,} tiket, {months[0]} s/d {months[-1]} "
+        f"— query rentang ini {elapsed * 1000:.0f} ms."
+    )
+
+    st.subheader("Volume Tiket")
+    totals = volume.groupby('Type')[['Total', 'Aktif']].sum()
+    total_incident = int(totals['Total'].get('Incident', 0))
+    total_request = int(totals['Total'].get('Request', 0))
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Tiket Insiden", f"{total_incident:,}")
+    col2.metric("Total Tiket Request", f"{total_request:,}")
+    col3.metric("Total Semua Tiket", f"{total_incident + total_request:,}")
+    col1, col2 = st.columns(2)
+    col1.metric("Tiket Insiden Aktif/Pending", f"{int(totals['Aktif'].get('Incident', 0)):,}")
+    col2.metric("Tiket Request Aktif/Pending", f"{int(totals['Aktif'].get('Request', 0)):,}")
+
+    col_chart1, col_chart2 = st.columns(2)
+    with col_chart1:
+        st.markdown("**Total Tiket Dibuat (per Bulan)**")
+        st.plotly_chart(px.bar(volume, x="Month", y="Total", color="Type", barmode="group", text_auto=True), use_container_width=True)
+    with col_chart2:
+        st.markdown("**Total Tiket Aktif/Pending (per Bulan)**")
+        st.plotly_chart(
+            px.bar(volume, x="Month", y="Aktif", color="Type", barmode="group", text_auto=True,
+                   color_discrete_sequence=['#FF4B4B', '#8B0000']),
+            use_container_width=True
+        )
+
+    st.divider()
+    c1, c2 = st.columns(2)
+    with c1:
+        st.subheader("Top 3 Service Offering dengan Max Breach Terbesar")
+        st.markdown(max_breach_html(top_breach), unsafe_allow_html=True)
+    with c2:
+        st.subheader("Performa SLA")
+        chart_df = sla_monthly[sla_monthly['Total Closed'] > 0]
+        if chart_df.empty:
+            st.info("Belum ada tiket tertutup dengan SLA pada rentang ini.")
+        else:
+            fig_sla = px.line(chart_df, x='Month', y='SLA (%)', color='Type', markers=True, hover_data=['Achieved', 'Total Closed'])
+            fig_sla.update_layout(yaxis_range=[0, 105], yaxis_title="SLA Achievement (%)", xaxis_title="Bulan", margin=dict(t=20, b=20, l=40, r=20))
+            st.plotly_chart(fig_sla, use_container_width=True)
+
+    st.divider()
+    st.subheader("Occurrence Analysis by Category")
+    header_text = f"Top {limit_val} Occurrence" if limit_val else "Occurrence (All)"
+    st.markdown("<h4>Incident Analysis</h4>", unsafe_allow_html=True)
+    st.markdown(occurrence_html(occ_incident, SERVICE, header_text), unsafe_allow_html=True)
+    st.markdown("<h4>Request Analysis</h4>", unsafe_allow_html=True)
+    st.markdown(occurrence_html(occ_request, 'Item', header_text), unsafe_allow_html=True)
+
 def run():
     st.markdown(get_table_css(), unsafe_allow_html=True)
 
@@ -276,43 +774,22 @@ def run():
         """,
         unsafe_allow_html=True
     )
-    
-    sla_mapping_hours = {
-        '1 - Critical - 1 - High': 4.0,
-        '1 - Critical - 2 - Medium': 6.0,
-        '1 - Critical - 3 - Low': 8.0,
-        '2 - High - 1 - High': 6.0,
-        '2 - High - 2 - Medium': 8.0,
-        '2 - High - 3 - Low': 12.0,
-        '3 - Medium - 1 - High': 8.0,
-        '3 - Medium - 2 - Medium': 12.0,
-        '3 - Medium - 3 - Low': 16.0,
-        '4 - Low - 1 - High': 16.0,
-        '4 - Low - 2 - Medium': 24.0,
-        '4 - Low - 3 - Low': 48.0
-    }
-
-    regional_3_locations = [
-        "P. Lembar", "Regional 3", "P. Batulicin", "R. Jawa", "Terminal Celukan Bawang",
-        "Sub Regional BBN", "P. Tg. Emas", "P. Bumiharjo", "Tanjung Perak", "R. Bali Nusra",
-        "P. Badas", "TANJUNGPERAK", "TANJUNGEMAS/KEUANGAN", "TANJUNGEMAS", "P. Tg. Intan",
-        "BANJARMASIN/TPK", "KOTABARU/MEKARPUTIH", "P. Waingapu", "R. Kalimantan", "Terminal Nilam",
-        "Terminal Kumai", "P. Kalimas", "P. Tg. Wangi", "P. Gresik", "P. Kotabaru",
-        "BANJARMASIN/KOMERSIAL", "TANJUNGWANGI/TEKNIK", "Sub Regional Kalimantan", "GRESIK/TERMINAL",
-        "Terminal Kota Baru", "P. Sampit", "BANJARMASIN/TMP", "P. Bagendang", "BANJARMASIN/PDS",
-        "TENAU/KALABAHI", "P. Bima", "P. Tenau Kupang", "Terminal Lembar", "P. Tegal",
-        "Terminal Trisakti", "BENOA/OPKOM", "P. Benoa", "BANJARMASIN/TEKNIK", "BANJARMASIN/PBJ",
-        "TANJUNGINTAN", "KOTABARU", "TENAU", "Sub Regional Jawa Timur", "KUMAI/OPKOM",
-        "Terminal Batulicin", "Terminal Gresik", "KUMAI/KEUPER", "LEMBAR/KEUPER", "P. Kalabahi",
-        "BIMA/BADAS", "Terminal Jamrud", "TENAU/WAINGAPU", "Terminal Benoa", "P. Tg. Tembaga",
-        "BIMA/PDS", "BENOA/SUK", "P. Clk. Bawang", "KUMAI/BUMIHARJO", "P. Pulang Pisau",
-        "Terminal Labuan Bajo", "P. Maumere", "BENOA/KEUANGAN", "BENOA/PKWT", "Terminal Kalimas",
-        "BANJARMASIN/KEUANGAN", "BENOA/PEMAGANG", "GRESIK/KEUANGAN", "Terminal Petikemas Banjarmasin",
-        "CELUKANBAWANG", "P. Ende-Ippi", "SAMPIT/BAGENDANG", "Terminal Bima", "KOTABARU/KEPANDUAN",
-        "Terminal Sampit", "Terminal Kupang", "BENOA/TEKNIK", "Terminal Maumere", "PROBOLINGGO/PLS",
-        "SAMPIT/PKWT", "P. Labuan Bajo", "P. Kalianget", "Banjarmasin", "Terminal Waingapu", "MAUMERE/ENDE"
-    ]
 
+    source = st.radio(
+        "Sumber laporan:",
+        ["Olah File Baru", "Buka Snapshot", "Riwayat Database"],
+        horizontal=True,
+        key="summary_source"
+    )
+    if source == "Buka Snapshot":
+        bundle = snapshot_browser("summary_snapshot")
+        if bundle:
+            render_summary_snapshot(bundle)
+        return
+    if source == "Riwayat Database":
+        render_summary_history()
+        return
+    
     st.subheader("Upload File")
     num_months = st.selectbox(
         "Pilih jumlah periode/bulan yang akan dianalisis:",
@@ -346,32 +823,58 @@ def run():
         st.info("Harap lengkapi semua file uploader di atas untuk melanjutkan.")
         return
 
-    try:
-        list_df_inc_raw = [pd.read_excel(f) for f in uploaded_incident_files]
-        list_df_req_raw = [pd.read_excel(f) for f in uploaded_request_files]
-    except Exception as e:
-        st.error(f"Gagal membaca salah satu file Excel: {e}")
+    sla_policy = sla_policy_status()
+    if sla_policy is None:
         return
+    sla_calendar = sla_clock_selector("summary_sla_clock")
+    status_log = status_log_uploader("summary_status_log")
+
+    # job hanya dimulai ulang bila file, kebijakan SLA, mode jam SLA atau log status berubah
+    signature = (
+        _upload_signature(uploaded_incident_files),
+        _upload_signature(uploaded_request_files),
+        sla_policy['key'],
+        fingerprint(sla_calendar),
+        fingerprint(status_log[0], sorted(status_log[1])) if status_log else None,
+    )
+    job = submit_job(
+        "summary_job", signature, load_and_process_uploads,
+        uploaded_incident_files, uploaded_request_files, sla_policy, sla_calendar, status_log
+    )
 
-    st.success(f"Berhasil memuat {len(list_df_inc_raw)} file Incident dan {len(list_df_req_raw)} file Request.")
-
-    list_df_inc_processed = []
-    list_df_req_processed = []
-
-    for i, df_raw in enumerate(list_df_inc_raw):
-        df_processed = process_sla_dataframe(df_raw, f"Incident (File {i+1})", sla_mapping_hours)
-        list_df_inc_processed.append(df_processed)
+    status = job_status(job)
+    if status == 'running':
+        render_job_progress("summary_job")
+        return
+    if status != 'done':
+        if status == 'cancelled':
+            st.warning("Proses dibatalkan.")
+        else:
+            st.error(f"Gagal membaca salah satu file Excel: {job['future'].exception()}")
+        if st.button("Proses ulang", key="summary_job_retry"):
+            clear_job("summary_job")
+            st.rerun()
+        return
 
-    for i, df_raw in enumerate(list_df_req_raw):
-        df_processed = process_sla_dataframe(df_raw, f"Request (File {i+1})", sla_mapping_hours)
-        list_df_req_processed.append(df_processed)
+    list_df_inc_processed, list_df_req_processed, messages, quality, partition_sketches = job['future'].result()
+    elapsed = job['finished'] - job['started']
+    st.success(
+        f"Berhasil memuat {len(list_df_inc_processed)} file Incident dan {len(list_df_req_processed)} file Request "
+        f"({job['progress']['rows']:,} baris, {elapsed:.1f} detik)."
+    )
+    stats = cache_stats()
+    st.caption(
+        f"Cache hasil SLA (bersama antar pengguna): {stats['hits'] + stats['disk_hits']:,} hit / "
+        f"{stats['misses']:,} miss ({stats['hit_rate']:.0%}) — {stats['entries']} entry, "
+        f"{stats['used_mb']:.0f}/{stats['max_mb']:.0f} MB, TTL {stats['ttl_hours']:g} jam."
+    )
+    for level, text in messages:
+        getattr(st, level)(text)
+    render_quality_panel(quality)
 
     st.subheader("Data Filter")
     
-    df_combined_raw = pd.concat(list_df_inc_raw + list_df_req_raw, ignore_index=True)
-
-    possible_loc_cols = ['Lokasi Pelapor', 'Name', 'User Name', 'Lokasi']
-    loc_col = find_column(df_combined_raw.columns, possible_loc_cols)
+    loc_col = LOCATION if any(LOCATION in d.columns for d in list_df_inc_processed + list_df_req_processed) else None
     regional_option = "All"
 
     if loc_col:
@@ -384,38 +887,61 @@ def run():
     else:
         st.warning("Kolom Lokasi tidak ditemukan. Filter Regional dinonaktifkan.")
 
-    list_df_inc_filtered = []
-    list_df_req_filtered = []
-    total_rows_after_filter = 0
-
-    for df_proc in list_df_inc_processed:
-        list_df_inc_filtered.append(df_proc.copy())
-        total_rows_after_filter += len(df_proc)
+    inc_carried, req_carried = [], []
+    regional_only = regional_option == "Regional 3 (Request)"
+    df_inc_all, inc_rows, inc_merged = combine_processed(list_df_inc_processed, merged_rows=inc_carried)
+    df_req_all, req_rows, req_merged = combine_processed(
+        list_df_req_processed,
+        regional_only=regional_only,
+        regional_locations=REGIONAL_3_LOCATIONS,
+        merged_rows=req_carried,
+        names=[f"Request (File {i + 1}) — {f.name}" for i, f in enumerate(uploaded_request_files)]
+    )
+    # sketch per bulan hanya bergantung pada hasil job dan filter lokasi: digabung sekali, dipakai ulang tiap rerun
+    breach_memo = job.setdefault('breach_months', {})
+    if regional_option not in breach_memo:
+        breach_months = monthly_breach_sketches(list_df_inc_processed, partition_sketches["Incident"], inc_carried)
+        breach_memo[regional_option] = monthly_breach_sketches(
+            list_df_req_processed, partition_sketches["Request"], req_carried,
+            regional_only=regional_only,
+            months=breach_months
+        )
+    breach_months = breach_memo[regional_option]
+    del list_df_inc_processed, list_df_req_processed, inc_carried, req_carried
 
-    for df_proc in list_df_req_processed:
-        df_filtered = df_proc.copy()
-        if regional_option == "Regional 3 (Request)":
-            loc_col_in_df = find_column(df_filtered.columns, possible_loc_cols)
-            if loc_col_in_df:
-                df_filtered = df_filtered[
-                    df_filtered[loc_col_in_df].astype(str).str.strip().isin(regional_3_locations)
-                ]
-        list_df_req_filtered.append(df_filtered)
-        total_rows_after_filter += len(df_filtered)
+    st.markdown(f"**Total data yang diolah:** {inc_rows + req_rows} baris")
 
-    st.markdown(f"**Total data yang diolah:** {total_rows_after_filter} baris")
-    del df_combined_raw
+    if inc_merged or req_merged:
+        st.info(
+            f"Tiket carry-over antar bulan digabung: **{inc_merged:,}** Incident dan **{req_merged:,}** Request "
+            f"(hanya state terakhir per No. Tiket yang dihitung)."
+        )
 
-    df_inc_all = pd.concat(list_df_inc_filtered, ignore_index=True)
-    df_req_all = pd.concat(list_df_req_filtered, ignore_index=True)
-    df_combined_full = pd.concat([df_inc_all, df_req_all], ignore_index=True)
+    # semua agregat yang dirender dikumpulkan di sini untuk fitur snapshot
+    snap = new_snapshot()
+    export_sheets = {}  # nama sheet -> [report_table]; tabel yang tampil ikut diekspor ke Excel
+    snap['meta'].update({
+        'incident_files': [f.name for f in uploaded_incident_files],
+        'request_files': [f.name for f in uploaded_request_files],
+        'regional': regional_option,
+        'sla_clock': sla_calendar['name'] if sla_calendar else "Wall Clock (24 jam)",
+        'status_log': bool(status_log),
+        'rows': inc_rows + req_rows,
+        'carry_over_merged': inc_merged + req_merged,
+    })
+
+    inc_time_index = build_time_index(df_inc_all, CREATED) if CREATED in df_inc_all.columns else None
+    req_time_index = build_time_index(df_req_all, CREATED) if CREATED in df_req_all.columns else None
+    # frame terurut milik index dipakai langsung agar tidak ada dua salinan di memori
+    if inc_time_index:
+        df_inc_all = inc_time_index['df']
+    if req_time_index:
+        df_req_all = req_time_index['df']
 
     st.subheader("Volume Tiket")
 
-    possible_resolved_cols = ['Resolved', 'Tiket Ditutup', 'Closed', 'Closed At', 'Tiket ditutup']
-    
-    inc_res_col = find_column(df_inc_all.columns, possible_resolved_cols)
-    req_res_col = find_column(df_req_all.columns, possible_resolved_cols)
+    inc_res_col = RESOLVED if RESOLVED in df_inc_all.columns else None
+    req_res_col = RESOLVED if RESOLVED in df_req_all.columns else None
 
     total_incident = len(df_inc_all)
     total_request = len(df_req_all)
@@ -432,6 +958,12 @@ def run():
     col1, col2 = st.columns(2)
     col1.metric("Tiket Insiden Aktif/Pending", f"{total_active_incident:,}")
     col2.metric("Tiket Request Aktif/Pending", f"{total_active_request:,}")
+    snap['metrics'].update({
+        'total_incident': int(total_incident),
+        'total_request': int(total_request),
+        'active_incident': int(total_active_incident),
+        'active_request': int(total_active_request),
+    })
 
     st.divider()
 
@@ -461,6 +993,7 @@ def run():
         id_vars='Month', var_name='Type', value_name='Count'
     )
     month_order = df_monthly_summary.index.tolist()
+    snap['meta']['months'] = month_order
 
     if df_monthly_summary.empty:
         st.warning("Tidak ada data bulanan untuk ditampilkan.")
@@ -479,6 +1012,7 @@ def run():
                 category_orders={"Month": month_order} 
             )
             st.plotly_chart(fig_monthly_total, use_container_width=True)
+            snap['figures']['monthly_total'] = fig_monthly_total
 
         with col_chart2:
             st.markdown("**Total Tiket Aktif/Pending (per Bulan)**")
@@ -493,31 +1027,23 @@ def run():
                 color_discrete_sequence=['#FF4B4B', '#8B0000'] 
             )
             st.plotly_chart(fig_monthly_active, use_container_width=True)
+            snap['figures']['monthly_active'] = fig_monthly_active
             
     st.markdown("#### **Total Tiket (Drill-down)**")
     st.write("Klik lingkaran bagian dalam (Incident/Request) untuk melihat detail status Active/Solved.")
 
-    if not df_inc_all.empty and inc_res_col:
-        df_inc_sb = df_inc_all.copy()
-        df_inc_sb['Status'] = df_inc_sb[inc_res_col].apply(lambda x: 'Active/Pending' if pd.isna(x) else 'Solved')
-        df_inc_sb['Type'] = 'Incident'
-        df_inc_sb = df_inc_sb[['Type', 'Status']]
-    else:
-        df_inc_sb = pd.DataFrame(columns=['Type', 'Status'])
-
-    if not df_req_all.empty and req_res_col:
-        df_req_sb = df_req_all.copy()
-        df_req_sb['Status'] = df_req_sb[req_res_col].apply(lambda x: 'Active/Pending' if pd.isna(x) else 'Solved')
-        df_req_sb['Type'] = 'Request'
-        df_req_sb = df_req_sb[['Type', 'Status']]
-    else:
-        df_req_sb = pd.DataFrame(columns=['Type', 'Status'])
+    sunburst_rows = []
+    for type_name, df_all, res_col in [("Incident", df_inc_all, inc_res_col), ("Request", df_req_all, req_res_col)]:
+        if df_all.empty or not res_col:
+            continue
+        n_active = int(df_all[res_col].isna().sum())
+        sunburst_rows.append({'Type': type_name, 'Status': 'Active/Pending', 'Count': n_active})
+        sunburst_rows.append({'Type': type_name, 'Status': 'Solved', 'Count': len(df_all) - n_active})
 
-    df_sunburst_raw = pd.concat([df_inc_sb, df_req_sb], ignore_index=True)
+    df_sunburst_agg = pd.DataFrame(sunburst_rows, columns=['Type', 'Status', 'Count'])
+    df_sunburst_agg = df_sunburst_agg[df_sunburst_agg['Count'] > 0]
 
-    if not df_sunburst_raw.empty:
-            df_sunburst_agg = df_sunburst_raw.groupby(['Type', 'Status']).size().reset_index(name='Count')
-            
+    if not df_sunburst_agg.empty:
             sunburst_colors = {
                 'Incident': '#0074D9',
                 'Request': '#1E90FF', 
@@ -547,63 +1073,58 @@ def run():
 
             fig_sunburst.update_layout(margin=dict(t=10, l=10, r=10, b=10))
             st.plotly_chart(fig_sunburst, use_container_width=True)
+            snap['figures']['sunburst'] = fig_sunburst
     else:
         st.info("Tidak ada data untuk menampilkan chart komposisi.")
 
     st.divider()
 
-    contact_col_incident_names = ['Channel', 'Contact Type', 'ContactType', 'Contact type']
-    contact_col_request_names = ['Contact Type', 'ContactType', 'Contact type', 'Channel']
-
-    col_inc = find_column(df_inc_all.columns, contact_col_incident_names)
-    col_req = find_column(df_req_all.columns, contact_col_request_names)
+    col_inc = CHANNEL if CHANNEL in df_inc_all.columns else None
+    col_req = CHANNEL if CHANNEL in df_req_all.columns else None
     
-    df_combined_channel = pd.DataFrame(columns=['Channel']) 
+    channel_counts = pd.Series(dtype='int64')
 
     if total_all > 0 and col_inc and col_req:
-        df_inc_slim = df_inc_all[[col_inc]].copy().rename(columns={col_inc: 'Channel'})
-        df_req_slim = df_req_all[[col_req]].copy().rename(columns={col_req: 'Channel'})
-
-        df_combined_channel = pd.concat([df_inc_slim, df_req_slim], ignore_index=True)
-        df_combined_channel['Channel'] = df_combined_channel['Channel'].fillna('Unknown').astype(str).str.strip()
+        # value_counts per frame lalu dijumlahkan; kolom channel tidak disalin/di-concat
+        for df_all, col in [(df_inc_all, col_inc), (df_req_all, col_req)]:
+            counts = df_all[col].fillna('Unknown').astype(str).str.strip().value_counts()
+            channel_counts = channel_counts.add(counts, fill_value=0)
+        channel_counts = channel_counts.astype(int).sort_values(ascending=False)
 
     c1, c2 = st.columns(2)
 
     with c1:
         st.subheader("Analisis Self-Service (ESS)")
-        if not df_combined_channel.empty:
+        if not channel_counts.empty:
             ess_keywords = ['ess', 'self-service', 'self service']
-            is_ess = df_combined_channel['Channel'].str.lower().isin(ess_keywords)
-            total_ess_tickets = int(is_ess.sum())
+            is_ess = channel_counts.index.str.lower().isin(ess_keywords)
+            total_ess_tickets = int(channel_counts[is_ess].sum())
             ess_percentage = (total_ess_tickets / total_all) * 100 if total_all > 0 else 0.0
 
             st.metric("Tiket ESS (Self-Service)", f"{total_ess_tickets:,}", f"{ess_percentage:.1f}%")
+            snap['metrics'].update({'ess_tickets': total_ess_tickets, 'ess_percent': ess_percentage})
         else:
             st.warning("Tidak ada data channel untuk dianalisis.")
 
         st.subheader("Top 3 Service Offering dengan Max Breach Terbesar")
         
-        unique_months = sorted(df_combined_full['Month'].dropna().unique().tolist())
-        time_filter_options = ["All"] + unique_months
-        
-        time_filter_selection = st.radio(
-            "Pilih periode waktu:", 
-            time_filter_options, 
-            horizontal=True, 
+        range_selection = date_range_picker(
+            [inc_time_index, req_time_index],
             key="time_period_filter_summary"
         )
+        time_filter_selection = range_selection['label']
+        snap['meta']['period'] = time_filter_selection
 
-        if time_filter_selection == "All":
-            inc_df_slice = df_inc_all
-            req_df_slice = df_req_all
-        else:
-            inc_df_slice = df_inc_all[df_inc_all['Month'] == time_filter_selection]
-            req_df_slice = df_req_all[df_req_all['Month'] == time_filter_selection]
+        inc_df_slice = apply_range(inc_time_index, range_selection) if inc_time_index else df_inc_all
+        req_df_slice = apply_range(req_time_index, range_selection) if req_time_index else df_req_all
 
-        df_combined_full_slice = pd.concat([inc_df_slice, req_df_slice], ignore_index=True)
+        slice_cols = [TICKET_NO, CREATED, RESOLVED, SERVICE, 'Target SLA (jam)', 'Time Breach', 'SLA']
+        df_combined_full_slice = pd.concat(
+            [d[[c for c in slice_cols if c in d.columns]] for d in (inc_df_slice, req_df_slice)],
+            ignore_index=True
+        )
         
-        possible_service_cols = ['Service offering', 'Service Offering', 'ServiceOffering']
-        service_col = find_column(df_combined_full_slice.columns, possible_service_cols)
+        service_col = SERVICE if SERVICE in df_combined_full_slice.columns else None
         
         if not service_col:
             st.error("Kolom 'Service Offering' tidak ditemukan.")
@@ -625,88 +1146,65 @@ def run():
             bottom3_sla = sla_service_agg[sla_service_agg['No'] <= 3].sort_values(by=['No', service_col])
             bottom3_sla = bottom3_sla[['No', service_col, 'Max_Time_Breach', 'Total_Tiket', 'Tiket_Breach']]
             bottom3_sla.columns = ['No', 'Service Offering', 'Max Time Breach', '∑Total Tiket', '∑ Tiket Breach']
+            export_sheets['Max Breach'] = [report_table(
+                f"Top 3 Service Offering dengan Max Breach Terbesar ({time_filter_selection})",
+                bottom3_sla.assign(**{'Max Time Breach': bottom3_sla['Max Time Breach'].map(format_hari_jam_menit)}),
+                group_col='No', bold_cols=['Service Offering']
+            )]
 
-            html_bottom = '<table class="manual-sla-table"><thead><tr>'
-            html_bottom += "<th>No</th>"
-            html_bottom += "<th>Service Offering</th>"
-            html_bottom += "<th>Max Time Breach</th>"
-            html_bottom += "<th>∑Total Tiket</th>"
-            html_bottom += "<th>∑ Tiket Breach</th>"
-            html_bottom += "</tr></thead><tbody>"
-
-            if bottom3_sla.empty:
-                html_bottom += "<tr class='row-data'><td colspan='5' style='text-align:center;'>Tidak ada data breach untuk ditampilkan.</td></tr>"
-            else:
-                for _, row in bottom3_sla.iterrows():
-                    html_bottom += "<tr class='row-data'>"
-                    html_bottom += f"<td class='col-no'>{row['No']}</td>"
-                    html_bottom += f"<td><b>{row['Service Offering']}</b></td>"
-                    html_bottom += f"<td class='text-center'>{format_hari_jam_menit(row['Max Time Breach'])}</td>"
-                    html_bottom += f"<td class='text-center'>{row['∑Total Tiket']}</td>"
-                    html_bottom += f"<td class='text-center'>{row['∑ Tiket Breach']}</td>"
-                    html_bottom += "</tr>"
-
-            html_bottom += "</tbody></table>"
+            html_bottom = max_breach_html(bottom3_sla)
             st.markdown(html_bottom, unsafe_allow_html=True)
+            snap['html']['top3_service_breach'] = html_bottom
 
     with c2:
         st.subheader("Distribusi Channel")
         
         tab_all, tab_inc, tab_req = st.tabs(["Semua Tiket", "Incident", "Request"])
 
-        with tab_all:
-            if not df_combined_channel.empty:
-                channel_summary = df_combined_channel['Channel'].value_counts().reset_index()
-                channel_summary.columns = ['Channel', 'Count']
-                
-                fig_channel_all = px.pie(
-                    channel_summary,
-                    names='Channel',
-                    values='Count',
-                    title='Semua Tiket',
-                    hole=0.4
-                )
-                fig_channel_all.update_traces(textinfo='percent+label')
-                fig_channel_all.update_layout(margin=dict(t=30, b=0, l=0, r=0))
-                st.plotly_chart(fig_channel_all, use_container_width=True)
-            else:
-                st.warning("Tidak ada data channel.")
-
-        with tab_inc:
-            if col_inc and not df_inc_all.empty:
-                inc_channel_summary = df_inc_all[col_inc].fillna('Unknown').value_counts().reset_index()
-                inc_channel_summary.columns = ['Channel', 'Count']
-                
-                fig_channel_inc = px.pie(
-                    inc_channel_summary,
-                    names='Channel',
-                    values='Count',
-                    title='Incident',
-                    hole=0.4
-                )
-                fig_channel_inc.update_traces(textinfo='percent+label')
-                fig_channel_inc.update_layout(margin=dict(t=30, b=0, l=0, r=0))
-                st.plotly_chart(fig_channel_inc, use_container_width=True)
-            else:
-                st.info("Tidak ada data Incident.")
-
-        with tab_req:
-            if col_req and not df_req_all.empty:
-                req_channel_summary = df_req_all[col_req].fillna('Unknown').value_counts().reset_index()
-                req_channel_summary.columns = ['Channel', 'Count']
-                
-                fig_channel_req = px.pie(
-                    req_channel_summary,
+        channel_tabs = [
+            (tab_all, 'Semua Tiket', channel_counts, "Tidak ada data channel."),
+            (tab_inc, 'Incident', df_inc_all[col_inc].fillna('Unknown').value_counts() if col_inc else None, "Tidak ada data Incident."),
+            (tab_req, 'Request', df_req_all[col_req].fillna('Unknown').value_counts() if col_req else None, "Tidak ada data Request."),
+        ]
+        for tab, title, counts, empty_msg in channel_tabs:
+            with tab:
+                if counts is None or counts.empty:
+                    st.info(empty_msg)
+                    continue
+                channel_summary = counts.rename_axis('Channel').reset_index(name='Count')
+                channel_summary = top_n_with_others(channel_summary, 'Channel', 'Count', n=8)
+
+                fig_channel = chart_figure(
+                    'pie', channel_summary,
                     names='Channel',
                     values='Count',
-                    title='Request',
-                    hole=0.4
+                    title=title,
+                    hole=0.4,
+                    traces=dict(textinfo='percent+label'),
+                    layout=dict(margin=dict(t=30, b=0, l=0, r=0))
                 )
-                fig_channel_req.update_traces(textinfo='percent+label')
-                fig_channel_req.update_layout(margin=dict(t=30, b=0, l=0, r=0))
-                st.plotly_chart(fig_channel_req, use_container_width=True)
-            else:
-                st.info("Tidak ada data Request.")
+                st.plotly_chart(fig_channel, use_container_width=True)
+                snap['figures'][f"channel_{title}"] = fig_channel
+
+    if SERVICE in inc_df_slice.columns or SERVICE in req_df_slice.columns:
+        st.divider()
+        st.subheader(f"Distribusi Time Breach per Service Offering ({time_filter_selection})")
+        if range_selection['start'] is None:
+            grouped = merge_grouped(*breach_months.values())
+        elif range_selection.get('month'):
+            grouped = breach_months.get("%04d-%02d" % range_selection['month'], {})
+        else:
+            # rentang hari bebas tidak sejajar dengan sketch per bulan: dihitung dari tiket di rentang
+            grouped = merge_grouped(*[
+                sketch_by_group(d[SERVICE], d['Time Breach'])
+                for d in (inc_df_slice, req_df_slice) if SERVICE in d.columns and 'Time Breach' in d.columns
+            ])
+        breach_table = render_breach_distribution(grouped, key="summary_breach_dist")
+        if not breach_table.empty:
+            export_sheets['Distribusi Breach'] = [report_table(
+                f"Persentil Time Breach per Service Offering ({time_filter_selection})",
+                breach_table, bold_cols=['Service Offering']
+            )]
 
     st.divider()
 
@@ -778,6 +1276,7 @@ def run():
                     margin=dict(t=20, b=20, l=40, r=20)
                 )
                 st.plotly_chart(fig_inc, use_container_width=True)
+                snap['figures']['sla_incident'] = fig_inc
             else:
                 st.info("Tidak ada data Incident untuk ditampilkan.")
 
@@ -803,6 +1302,7 @@ def run():
                     margin=dict(t=20, b=20, l=40, r=20)
                 )
                 st.plotly_chart(fig_req, use_container_width=True)
+                snap['figures']['sla_request'] = fig_req
             else:
                 st.info("Tidak ada data Request untuk ditampilkan.")
 
@@ -810,6 +1310,14 @@ def run():
         st.info("Grafik performa SLA tidak dapat dibuat (data kosong atau belum ada tiket yang ditutup).")
 
     st.divider()
+
+    if service_col:
+        risk_resolved_col = RESOLVED if RESOLVED in df_combined_full_slice.columns else None
+        render_sla_risk(
+            df_combined_full_slice, CREATED, risk_resolved_col, 'Target SLA (jam)', service_col, TICKET_NO,
+            cal=sla_calendar, status_log=status_log, key="summary_sla_risk"
+        )
+        st.divider()
     
     st.subheader("Occurrence Analysis by Category")
     
@@ -822,9 +1330,8 @@ def run():
     
     limit_val = 3 if view_mode == "Top 3" else None
     
-    possible_kategori_cols = ['Kategori', 'Category', 'Item', 'Tipe']
-    kategori_col = find_column(df_inc_all.columns, possible_kategori_cols)
-    item_col = find_column(df_req_all.columns, possible_kategori_cols)
+    kategori_col = find_column(df_inc_all.columns, [CATEGORY, ITEM])
+    item_col = find_column(df_req_all.columns, [CATEGORY, ITEM])
 
     st.markdown("<h4>Incident Analysis</h4>", unsafe_allow_html=True)
     if not kategori_col:
@@ -899,7 +1406,69 @@ def run():
         
         df_status = df_status.reindex(columns=all_table_cols, fill_value=0)
         
-        st.markdown(make_simple_html_table(df_status), unsafe_allow_html=True)
+        html_status = make_simple_html_table(df_status)
+        st.markdown(html_status, unsafe_allow_html=True)
+        snap['html']['status'] = html_status
+        export_sheets['Solved vs Active'] = [report_table(
+            f"Solved vs Active/Pending Status ({time_filter_selection})",
+            df_status.rename_axis('Status').reset_index(), group_col='Status'
+        )]
+
+    def finalize_snapshot(bundle):
+        # kedua mode tampilan Occurrence disimpan agar pilihan Top 3/All tetap berfungsi di snapshot
+        for limit_name, limit in [("top3", 3), ("all", None)]:
+            if kategori_col and service_col and not inc_df_slice.empty:
+                bundle['html'][f"occurrence_incident_{limit_name}"] = display_occurrence_table(
+                    inc_df_slice, service_col, kategori_col, static_type=None, limit=limit
+                )
+            if item_col and not req_df_slice.empty:
+                bundle['html'][f"occurrence_request_{limit_name}"] = display_occurrence_table(
+                    req_df_slice, item_col, item_col, static_type="Request", limit=limit
+                )
+
+    def build_workbook():
+        occurrence = []
+        if kategori_col and service_col and not inc_df_slice.empty:
+            table, header = occurrence_table(inc_df_slice, service_col, kategori_col, limit=limit_val)
+            occurrence.append(report_table(
+                "Incident Analysis", table.rename(columns={service_col: f"{header} ({service_col})"}),
+                group_col='Type'
+            ))
+        if item_col and not req_df_slice.empty:
+            table, header = occurrence_table(req_df_slice, item_col, item_col, static_type="Request", limit=limit_val)
+            occurrence.append(report_table(
+                "Request Analysis", table.rename(columns={item_col: f"{header} ({item_col})"}),
+                group_col='Type'
+            ))
+        sheets = {**export_sheets, 'Occurrence': occurrence}
+        return build_report_workbook(
+            [(name, sheets[name]) for name in ['Max Breach', 'Distribusi Breach', 'Occurrence', 'Solved vs Active'] if sheets.get(name)],
+            [('Detail Incident', inc_df_slice), ('Detail Request', req_df_slice)]
+        )
+
+    st.divider()
+    st.subheader("Export Laporan")
+    st.caption("Tabel ringkasan (sesuai filter periode & tampilan di atas) dan data per tiket dalam satu workbook.")
+    export_download(
+        "Laporan Excel (.xlsx)", key="summary_report",
+        signature=(signature, regional_option, range_selection['start'], range_selection['end'], limit_val),
+        build=build_workbook,
+        file_name=f"summary_sla_{_slug_period(time_filter_selection)}.xlsx"
+    )
+
+    st.divider()
+    if len(month_order) > 1:
+        default_title = f"Summary {month_order[0][:7]} s/d {month_order[-1][:7]}"
+    else:
+        default_title = f"Summary {month_order[0][:7] if month_order else ''}"
+    snapshot_save_panel(snap, default_title, key="summary_snapshot", finalize=finalize_snapshot)
+    history_save_panel(
+        lambda: [
+            history_rows(df_inc_all, "Incident", category_col=kategori_col),
+            history_rows(df_req_all, "Request", category_col=item_col),
+        ],
+        source=default_title, key="summary"
+    )
 
 if __name__ == "__main__":
     run()
\ No newline at end of file
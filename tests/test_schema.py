@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import pandas as pd
+
+from schema import apply_schema, parse_dates, RESOLVED, RESOLVED_FIRST, DISPLACED_SUFFIX
+
+def _both_closed_columns():
+    return pd.DataFrame({
+        'Resolved': pd.to_datetime(['2024-01-02 10:00']),
+        'Tiket Ditutup': pd.to_datetime(['2024-01-05 10:00']),
+    })
+
+def test_resolved_preferred_when_both_columns_present():
+    df = apply_schema(_both_closed_columns(), prefer=RESOLVED_FIRST)
+    assert df[RESOLVED].iloc[0] == pd.Timestamp('2024-01-02 10:00')
+    assert df[RESOLVED + DISPLACED_SUFFIX].iloc[0] == pd.Timestamp('2024-01-05 10:00')
+
+def test_canonical_name_wins_without_prefer():
+    df = apply_schema(_both_closed_columns())
+    assert df[RESOLVED].iloc[0] == pd.Timestamp('2024-01-05 10:00')
+    assert 'Resolved' in df.columns
+
+def test_prefer_falls_back_to_later_aliases():
+    df = apply_schema(pd.DataFrame({'Closed At': [1], 'Tiket Dibuat': [2]}), prefer=RESOLVED_FIRST)
+    assert list(df.columns) == [RESOLVED, 'Tiket Dibuat']
+
+def test_text_dates_in_datetime_column_read_day_first():
+    values = pd.Series([datetime(2024, 1, d, 8) for d in range(1, 20)] + ['05/01/2024 10:00', '13/01/2024 09:00'], dtype=object)
+    parsed = parse_dates(values)
+    assert parsed.iloc[-2] == pd.Timestamp('2024-01-05 10:00')
+    assert parsed.iloc[-1] == pd.Timestamp('2024-01-13 09:00')
+
+def test_mixed_fallback_parses_each_kind():
+    values = pd.Series([datetime(2024, 1, 1)] * 3 + [45300.5, '02/03/2024', 'bukan tanggal'], dtype=object)
+    parsed = parse_dates(values)
+    assert parsed.iloc[3] == pd.Timestamp('2024-01-09 12:00')
+    assert parsed.iloc[4] == pd.Timestamp('2024-03-02')
+    assert pd.isna(parsed.iloc[5])
@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+
+from sla_clock import compute_sla, load_calendar
+
+CREATED = pd.Series([pd.Timestamp("2025-03-10 09:00")])
+
+def _business_hours(resolved):
+    return compute_sla(CREATED, pd.Series([pd.Timestamp(resolved)]), [4], cal=load_calendar())
+
+def test_resolved_before_created_small_gap_is_negative_breach():
+    result = _business_hours("2025-03-07 10:00")
+    assert result['breach_hours'].iloc[0] < 0
+    assert result['sla'].iloc[0] == 1
+
+def test_resolved_before_created_large_gap_does_not_raise():
+    result = _business_hours("2024-12-01 10:00")
+    assert np.isfinite(result['breach_hours'].iloc[0])
+    assert result['breach_hours'].iloc[0] < 0
+    assert result['sla'].iloc[0] == 1
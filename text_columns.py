@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    ARROW_STRING = pd.StringDtype("pyarrow")
+except ImportError:
+    ARROW_STRING = None
+
+# kolom teks panjang yang hanya ditampilkan di preview/export, tidak pernah dipakai agregasi
+FREE_TEXT_COLUMNS = ['Comments and Work notes', 'Deskripsi Permasalahan', 'Root Cause and Solution', 'Komentar Tambahan']
+ROW_KEY = '_row'
+
+def compact_strings(series):
+    """
+    String berbasis Arrow (satu buffer per kolom, bukan satu objek Python per sel) bila pyarrow tersedia.
+    Kolom yang sudah bertipe string (default pandas 3) dibiarkan.
+    """
+    if ARROW_STRING is None or isinstance(series.dtype, pd.StringDtype):
+        return series
+    return series.astype(ARROW_STRING)
+
+def split_free_text(df, columns=FREE_TEXT_COLUMNS):
+    """
+    Memisahkan kolom teks bebas dari frame kerja. Frame kerja mendapat kolom ROW_KEY (posisi baris asli)
+    sehingga copy, merge dan filter berikutnya tidak ikut menyalin teks panjang.
+    Mengembalikan (frame_kerja, frame_teks) dengan frame_teks ber-index posisi baris.
+    """
+    text_cols = [c for c in columns if c in df.columns]
+    text = pd.DataFrame({c: compact_strings(df[c].reset_index(drop=True)) for c in text_cols}, index=pd.RangeIndex(len(df)))
+    work = df.drop(columns=text_cols)
+    work[ROW_KEY] = np.arange(len(work))
+    return work, text
+
+def attach_free_text(df, text, column_order=None):
+    """
+    Memasang kembali kolom teks bebas ke df (yang masih membawa ROW_KEY), hanya untuk baris df.
+    column_order (opsional) menentukan urutan kolom hasil; ROW_KEY selalu dibuang.
+    """
+    if ROW_KEY not in df.columns:
+        return df
+    rows = text.iloc[df[ROW_KEY].to_numpy()].set_index(df.index)
+    out = pd.concat([df.drop(columns=ROW_KEY), rows], axis=1)
+    if column_order is not None:
+        out = out[[c for c in column_order if c in out.columns]]
+    return out
@@ -0,0 +1,143 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from datetime import timedelta
+
+def build_time_index(df, date_col):
+    """
+    Mengurutkan tiket sekali berdasarkan kolom tanggal dibuat, lalu menyiapkan
+    offset bucket per hari dan per bulan. Baris dengan tanggal kosong (NaT)
+    diletakkan di akhir dan tidak pernah ikut dalam potongan rentang tanggal.
+    """
+    created = pd.to_datetime(df[date_col], errors='coerce')
+    keys_all = created.to_numpy(dtype='datetime64[ns]')
+    order = np.argsort(keys_all, kind='stable')
+
+    df_sorted = df.iloc[order].reset_index(drop=True)
+    keys = keys_all[order]
+    n_valid = int((~np.isnat(keys)).sum())
+    keys = keys[:n_valid]
+
+    if n_valid:
+        days = keys.astype('datetime64[D]')
+        day_starts = np.unique(days)
+        months = keys.astype('datetime64[M]')
+        month_starts = np.unique(months)
+        day_offsets = np.searchsorted(days, day_starts, side='left')
+        month_offsets = np.searchsorted(months, month_starts, side='left')
+    else:
+        day_starts = np.array([], dtype='datetime64[D]')
+        month_starts = np.array([], dtype='datetime64[M]')
+        day_offsets = np.array([], dtype=np.int64)
+        month_offsets = np.array([], dtype=np.int64)
+
+    return {
+        'df': df_sorted,
+        'date_col': date_col,
+        'keys': keys,
+        'n_valid': n_valid,
+        'day_starts': day_starts,
+        'day_offsets': np.append(day_offsets, n_valid),
+        'month_starts': month_starts,
+        'month_offsets': np.append(month_offsets, n_valid),
+    }
+
+def _bound(index, ts):
+    """Posisi baris pertama dengan tanggal >= ts (binary search)."""
+    if ts is None:
+        return None
+    ts = np.datetime64(pd.Timestamp(ts), 'ns')
+    return int(np.searchsorted(index['keys'], ts, side='left'))
+
+def slice_range(index, start=None, end=None):
+    """
+    Potongan tiket dengan start <= Tiket Dibuat < end, tanpa menyalin data.
+    start/end None berarti tidak dibatasi di sisi tersebut.
+    """
+    lo = _bound(index, start)
+    hi = _bound(index, end)
+    lo = 0 if lo is None else lo
+    hi = index['n_valid'] if hi is None else hi
+    return index['df'].iloc[lo:max(lo, hi)]
+
+def slice_month(index, year, month):
+    """Potongan tiket untuk satu bulan memakai offset bucket bulanan."""
+    target = np.datetime64(f"{int(year):04d}-{int(month):02d}", 'M')
+    pos = int(np.searchsorted(index['month_starts'], target))
+    if pos >= len(index['month_starts']) or index['month_starts'][pos] != target:
+        return index['df'].iloc[0:0]
+    lo, hi = index['month_offsets'][pos], index['month_offsets'][pos + 1]
+    return index['df'].iloc[lo:hi]
+
+def slice_last_days(index, n_days, ref=None):
+    """Potongan tiket N hari terakhir, dihitung mundur dari tanggal terakhir (atau ref)."""
+    if index['n_valid'] == 0:
+        return index['df'].iloc[0:0]
+    ref_day = pd.Timestamp(index['keys'][-1]).normalize() if ref is None else pd.Timestamp(ref).normalize()
+    end = ref_day + timedelta(days=1)
+    return slice_range(index, end - timedelta(days=int(n_days)), end)
+
+def bucket_counts(index, freq='M'):
+    """Jumlah tiket per bucket ('D' harian, 'M' bulanan) langsung dari offset."""
+    if freq == 'D':
+        starts, offsets = index['day_starts'], index['day_offsets']
+    else:
+        starts, offsets = index['month_starts'], index['month_offsets']
+    return pd.Series(np.diff(offsets), index=pd.to_datetime(starts))
+
+def date_range_picker(indexes, key, month_label_format='%Y-%m (%B)'):
+    """
+    Widget pemilih rentang tanggal yang dipakai bersama oleh semua halaman.
+    Mengembalikan dict {'start', 'end', 'label', 'month'}; start/end None berarti semua data.
+    """
+    indexes = [idx for idx in indexes if idx is not None and idx['n_valid'] > 0]
+    if not indexes:
+        return {'start': None, 'end': None, 'label': "All", 'month': None}
+
+    min_day = min(pd.Timestamp(idx['keys'][0]) for idx in indexes).date()
+    max_day = max(pd.Timestamp(idx['keys'][-1]) for idx in indexes).date()
+    month_starts = np.unique(np.concatenate([idx['month_starts'] for idx in indexes]))
+    month_labels = [pd.Timestamp(m).strftime(month_label_format) for m in month_starts]
+
+    mode = st.radio(
+        "Rentang waktu:",
+        ["All", "Per Bulan", "N Hari Terakhir", "Rentang Tanggal"],
+        horizontal=True,
+        key=f"{key}_mode"
+    )
+
+    if mode == "Per Bulan":
+        label = st.radio("Pilih bulan:", month_labels, horizontal=True, key=f"{key}_month")
+        m = pd.Timestamp(month_starts[month_labels.index(label)])
+        return {'start': m, 'end': m + pd.offsets.MonthBegin(1), 'label': label, 'month': (m.year, m.month)}
+
+    if mode == "N Hari Terakhir":
+        n_days = st.number_input("Jumlah hari:", min_value=1, value=7, step=1, key=f"{key}_ndays")
+        end = pd.Timestamp(max_day) + timedelta(days=1)
+        return {'start': end - timedelta(days=int(n_days)), 'end': end, 'label': f"{int(n_days)} hari terakhir", 'month': None}
+
+    if mode == "Rentang Tanggal":
+        picked = st.date_input(
+            "Pilih rentang tanggal:",
+            value=(min_day, max_day),
+            min_value=min_day,
+            max_value=max_day,
+            key=f"{key}_range"
+        )
+        if isinstance(picked, (list, tuple)) and len(picked) == 2:
+            start, end = pd.Timestamp(picked[0]), pd.Timestamp(picked[1]) + timedelta(days=1)
+        else:
+            start = pd.Timestamp(picked[0] if isinstance(picked, (list, tuple)) else picked)
+            end = start + timedelta(days=1)
+        label = f"{start.strftime('%d/%m/%Y')} - {(end - timedelta(days=1)).strftime('%d/%m/%Y')}"
+        return {'start': start, 'end': end, 'label': label, 'month': None}
+
+    return {'start': None, 'end': None, 'label': "All", 'month': None}
+
+def apply_range(index, selection):
+    """Menerapkan hasil date_range_picker ke satu indeks."""
+    if selection['start'] is None and selection['end'] is None:
+        return index['df']
+    if selection.get('month'):
+        return slice_month(index, *selection['month'])
+    return slice_range(index, selection['start'], selection['end'])
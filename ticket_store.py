@@ -0,0 +1,253 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import os
+import sqlite3
+import time
+from contextlib import closing
+from schema import TICKET_NO, CREATED, RESOLVED, SERVICE, CHANNEL, LOCATION
+
+DEFAULT_DB_PATH = os.environ.get("SLA_DB_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "history", "tickets.sqlite")
+UPSERT_CHUNK_ROWS = 50_000
+
+STORE_COLUMNS = [
+    'ticket_no', 'type', 'created', 'resolved', 'month', 'is_open', 'service', 'channel', 'location',
+    'category', 'bc_sev', 'target_hours', 'sla', 'time_breach', 'source', 'loaded_at',
+]
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS tickets (
+    ticket_no    TEXT PRIMARY KEY,
+    type         TEXT NOT NULL,
+    created      TEXT NOT NULL,
+    resolved     TEXT,
+    month        TEXT NOT NULL,
+    is_open      INTEGER NOT NULL,
+    service      TEXT,
+    channel      TEXT,
+    location     TEXT,
+    category     TEXT,
+    bc_sev       TEXT,
+    target_hours REAL,
+    sla          INTEGER,
+    time_breach  REAL,
+    source       TEXT,
+    loaded_at    TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tickets_month ON tickets (month);
+-- rekap per bulan/tipe/service/kategori; semua agregasi Summary (count, sum, max) bisa digabung dari sini
+CREATE TABLE IF NOT EXISTS ticket_rollup (
+    month      TEXT NOT NULL,
+    type       TEXT NOT NULL,
+    service    TEXT,
+    category   TEXT,
+    total      INTEGER NOT NULL,
+    open       INTEGER NOT NULL,
+    achieved   INTEGER NOT NULL,
+    breached   INTEGER NOT NULL,
+    max_breach REAL
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_month ON ticket_rollup (month, type);
+"""
+
+# state tiket yang sudah ditutup tidak ditimpa oleh upload lama yang tiketnya masih open
+UPSERT_SQL = f"""
+INSERT INTO tickets ({', '.join(STORE_COLUMNS)}) VALUES ({', '.join('?' * len(STORE_COLUMNS))})
+ON CONFLICT(ticket_no) DO UPDATE SET {', '.join(f"{c} = excluded.{c}" for c in STORE_COLUMNS[1:])}
+WHERE tickets.is_open = 1 OR excluded.is_open = 0
+"""
+
+# hanya bulan yang disentuh upsert yang direkap ulang
+# dijalankan satu per satu dengan execute (bukan executescript, yang commit dulu) agar tetap satu transaksi dengan upsert
+REFRESH_ROLLUP_SQL = [
+    "DELETE FROM ticket_rollup WHERE month IN (SELECT month FROM touched_months)",
+    """
+    INSERT INTO ticket_rollup
+    SELECT month, type, service, category, COUNT(*), TOTAL(is_open), TOTAL(sla = 1), TOTAL(sla = 0), MAX(time_breach)
+    FROM tickets WHERE month IN (SELECT month FROM touched_months)
+    GROUP BY month, type, service, category
+    """,
+    "DELETE FROM touched_months",
+]
+
+def connect(path=None):
+    """Koneksi SQLite ke file riwayat tiket (dibuat bila belum ada). Satu koneksi per operasi."""
+    path = path or DEFAULT_DB_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA_SQL)
+    return conn
+
+def _text(df, col):
+    if col is None or col not in df.columns:
+        return pd.Series(None, index=df.index, dtype=object)
+    return df[col].astype(str).str.strip().where(df[col].notna())
+
+def _iso(values):
+    return pd.to_datetime(values, errors='coerce').dt.strftime('%Y-%m-%d %H:%M:%S')
+
+def history_rows(df, type_name, target_hours=None, breach_hours=None, sla=None, category_col=None):
+    """
+    Menyamakan frame hasil olah halaman mana pun ke kolom tabel riwayat.
+    Default kolom mengikuti hasil process_sla_dataframe ('Target SLA (jam)', 'Time Breach' dalam jam, 'SLA');
+    halaman dengan nama/satuan lain mengirim Series-nya sendiri (sejajar dengan df).
+    Baris tanpa No. Tiket atau tanggal dibuat tidak bisa disimpan dan dibuang.
+    """
+    if TICKET_NO not in df.columns or CREATED not in df.columns:
+        return pd.DataFrame(columns=STORE_COLUMNS)
+    created = pd.to_datetime(df[CREATED], errors='coerce')
+    keep = (df[TICKET_NO].notna() & created.notna()).to_numpy()
+    df, created = df[keep], created[keep]
+
+    def numeric(values, default_col):
+        if values is None:
+            if default_col not in df.columns:
+                return pd.Series(np.nan, index=df.index)
+            return pd.to_numeric(df[default_col], errors='coerce')
+        return pd.to_numeric(pd.Series(np.asarray(values, dtype=object)[keep], index=df.index), errors='coerce')
+
+    resolved = df[RESOLVED] if RESOLVED in df.columns else pd.Series(pd.NaT, index=df.index)
+    month_col = df['Month'] if 'Month' in df.columns else created.dt.strftime('%Y-%m (%B)')
+    bc_sev = next((c for c in ['Businesscriticality-Severity', 'Business criticality-Severity'] if c in df.columns), None)
+
+    rows = pd.DataFrame({
+        'ticket_no': df[TICKET_NO].astype(str).str.strip(),
+        'type': type_name,
+        'created': _iso(created),
+        'resolved': _iso(resolved),
+        'month': month_col.astype(str),
+        'is_open': pd.to_datetime(resolved, errors='coerce').isna().astype(int),
+        'service': _text(df, SERVICE),
+        'channel': _text(df, CHANNEL),
+        'location': _text(df, LOCATION),
+        'category': _text(df, category_col),
+        'bc_sev': _text(df, bc_sev),
+        'target_hours': numeric(target_hours, 'Target SLA (jam)'),
+        'sla': numeric(sla, 'SLA'),
+        'time_breach': numeric(breach_hours, 'Time Breach'),
+    })
+    # satu state per tiket dalam satu batch: yang terakhir menang (sama seperti carry-over)
+    return rows.drop_duplicates(subset='ticket_no', keep='last')
+
+def upsert_tickets(rows, source, path=None):
+    """
+    Menyimpan baris hasil history_rows() ke SQLite dengan upsert berdasarkan No. Tiket,
+    per potongan dalam satu transaksi, lalu merekap ulang ticket_rollup untuk bulan yang tersentuh.
+    Mengembalikan jumlah baris yang dikirim.
+    """
+    if rows.empty:
+        return 0
+    rows = rows.assign(source=source, loaded_at=pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'))[STORE_COLUMNS]
+    with closing(connect(path)) as conn, conn:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS touched_months (month TEXT PRIMARY KEY)")
+        conn.executemany("INSERT OR IGNORE INTO touched_months VALUES (?)", ((m,) for m in rows['month'].unique()))
+        for start in range(0, len(rows), UPSERT_CHUNK_ROWS):
+            chunk = rows.iloc[start:start + UPSERT_CHUNK_ROWS]
+            # kosong -> None (NULL); tolist() mengubah tipe numpy menjadi tipe Python yang dikenali sqlite3
+            columns = [chunk[c].astype(object).where(chunk[c].notna(), None).tolist() for c in STORE_COLUMNS]
+            # bulan lama dari tiket yang akan ditimpa ikut direkap ulang
+            conn.executemany(
+                "INSERT OR IGNORE INTO touched_months SELECT month FROM tickets WHERE ticket_no = ?", ((t,) for t in columns[0])
+            )
+            conn.executemany(UPSERT_SQL, zip(*columns))
+        for sql in REFRESH_ROLLUP_SQL:
+            conn.execute(sql)
+    return len(rows)
+
+def _query(sql, params=(), path=None):
+    with closing(connect(path)) as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+def history_months(path=None):
+    """Daftar label bulan yang ada di riwayat, terurut."""
+    df = _query("SELECT DISTINCT month FROM ticket_rollup ORDER BY month", path=path)
+    return df['month'].tolist()
+
+def history_stats(path=None):
+    """Jumlah tiket per tipe di seluruh riwayat."""
+    return _query("SELECT type, SUM(total) AS n FROM ticket_rollup GROUP BY type", path=path)
+
+def monthly_volume(first_month, last_month, path=None):
+    """Jumlah tiket dan tiket aktif per bulan per tipe."""
+    return _query(
+        """
+        SELECT month AS Month, type AS Type, SUM(total) AS Total, SUM(open) AS Aktif
+        FROM ticket_rollup WHERE month BETWEEN ? AND ?
+        GROUP BY month, type ORDER BY month, type
+        """,
+        (first_month, last_month), path
+    )
+
+def monthly_sla(first_month, last_month, path=None):
+    """SLA tercapai / total tiket tertutup ber-SLA per bulan per tipe (sama dengan get_sla_summary)."""
+    df = _query(
+        """
+        SELECT month AS Month, type AS Type,
+               SUM(achieved) AS Achieved, SUM(breached) AS "Not Achieved", SUM(achieved + breached) AS "Total Closed"
+        FROM ticket_rollup WHERE month BETWEEN ? AND ?
+        GROUP BY month, type ORDER BY month, type
+        """,
+        (first_month, last_month), path
+    )
+    df['SLA (%)'] = (df['Achieved'] / df['Total Closed'].where(df['Total Closed'] > 0) * 100).fillna(0.0)
+    return df
+
+def max_breach_per_service(first_month, last_month, top=3, path=None):
+    """Max Time Breach per Service Offering; peringkat dense seperti tabel Top 3 di Summary."""
+    df = _query(
+        """
+        SELECT service AS "Service Offering", MAX(max_breach) AS "Max Time Breach",
+               SUM(total) AS "∑Total Tiket", SUM(breached) AS "∑ Tiket Breach"
+        FROM ticket_rollup WHERE month BETWEEN ? AND ? AND service IS NOT NULL
+        GROUP BY service
+        """,
+        (first_month, last_month), path
+    )
+    df['Max Time Breach'] = df['Max Time Breach'].fillna(0)
+    df.insert(0, 'No', df['Max Time Breach'].rank(method='dense', ascending=False).astype(int))
+    df = df.sort_values(by=['No', 'Service Offering'], ignore_index=True)
+    return df[df['No'] <= top] if top else df
+
+def occurrence_counts(first_month, last_month, limit=None, path=None):
+    """
+    Occurrence seperti di Summary: Incident per Kategori lalu Service Offering,
+    Request per Item. Mengembalikan (incident_df, request_df) berkolom [Type, <data>, Number of Case].
+    """
+    incident = _query(
+        """
+        SELECT COALESCE(category, 'N/A') AS Type, service AS "Service offering", SUM(total) AS "Number of Case"
+        FROM ticket_rollup WHERE month BETWEEN ? AND ? AND type = 'Incident' AND service IS NOT NULL
+        GROUP BY 1, 2 ORDER BY 1, 3 DESC
+        """,
+        (first_month, last_month), path
+    )
+    request = _query(
+        """
+        SELECT 'Request' AS Type, category AS Item, SUM(total) AS "Number of Case"
+        FROM ticket_rollup WHERE month BETWEEN ? AND ? AND type = 'Request' AND category IS NOT NULL
+        GROUP BY 2 ORDER BY 3 DESC
+        """,
+        (first_month, last_month), path
+    )
+    if limit:
+        incident = incident.groupby('Type').head(limit).reset_index(drop=True)
+        request = request.head(limit)
+    return incident, request
+
+def history_save_panel(build, source, key):
+    """
+    Tombol untuk menyimpan tiket yang sedang ditampilkan ke riwayat SQLite lokal.
+    build() mengembalikan list frame hasil history_rows() dan baru dipanggil saat tombol ditekan.
+    """
+    with st.expander("🗄️ Simpan ke Riwayat Database"):
+        st.caption(f"Tiket di-upsert berdasarkan No. Tiket ke {DEFAULT_DB_PATH}.")
+        if st.button("Simpan ke riwayat", key=f"{key}_history_save"):
+            start = time.perf_counter()
+            try:
+                total = sum(upsert_tickets(rows, source) for rows in build())
+            except (sqlite3.Error, OSError) as e:
+                st.error(f"Gagal menyimpan ke database riwayat: {e}")
+                return
+            st.success(f"{total:,} tiket tersimpan ke riwayat ({time.perf_counter() - start:.1f} detik).")
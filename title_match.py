@@ -0,0 +1,146 @@
+import re
+import difflib
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from result_cache import fingerprint
+
+TITLE_MATCH_THRESHOLD = 0.85
+TITLE_MAX_CANDIDATES = 10
+TITLE_NGRAM = 3
+TITLE_INDEX_CACHE_SIZE = 8
+TITLE_MEMO_SIZE = 50_000
+
+MATCH_EXACT = "Persis"
+MATCH_NORMALIZED = "Normalisasi"
+MATCH_FUZZY = "Fuzzy"
+MATCH_NONE = "Tidak cocok"
+
+_TITLE_INDEXES = OrderedDict()  # fingerprint Map_Item -> index
+
+def normalize_title(text) -> str:
+    """Kunci pembanding judul: huruf kecil tanpa aksen/tanda baca, '&' dibaca 'dan', spasi tunggal."""
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode()
+    text = text.lower().replace('&', ' dan ')
+    return ' '.join(re.findall(r'[0-9a-z]+', text))
+
+def _ngrams(text):
+    padded = f" {text} "
+    return {padded[i:i + TITLE_NGRAM] for i in range(len(padded) - TITLE_NGRAM + 1)}
+
+def build_title_index(titles, ids):
+    """
+    Index judul Map_Item: lookup persis (judul asli dan hasil normalize_title) dan
+    inverted index n-gram karakter -> posisi judul, untuk membatasi kandidat fuzzy.
+    Judul ganda: yang pertama dipakai.
+    """
+    entries, exact, normalized, postings = [], {}, {}, {}
+    for title, id_ in zip(titles, ids):
+        if pd.isna(title) or not str(title).strip():
+            continue
+        title = str(title).strip()
+        norm = normalize_title(title)
+        if title in exact or not norm:
+            continue
+        pos = len(entries)
+        entries.append((title, id_, norm))
+        exact[title] = pos
+        normalized.setdefault(norm, pos)
+        for gram in _ngrams(norm):
+            postings.setdefault(gram, []).append(pos)
+
+    return {
+        'entries': entries,
+        'exact': exact,
+        'normalized': normalized,
+        'postings': {gram: np.array(pos, dtype=np.int32) for gram, pos in postings.items()},
+        'sizes': np.array([len(_ngrams(norm)) for _, _, norm in entries], dtype=np.float64),
+        'memo': {},
+    }
+
+def title_index_for(titles, ids):
+    """build_title_index() yang dipakai ulang selama isi Map_Item sama (termasuk memo hasil match)."""
+    titles, ids = list(titles), list(ids)
+    key = fingerprint(titles, ids)
+    index = _TITLE_INDEXES.get(key)
+    if index is None:
+        index = build_title_index(titles, ids)
+        _TITLE_INDEXES[key] = index
+        if len(_TITLE_INDEXES) > TITLE_INDEX_CACHE_SIZE:
+            _TITLE_INDEXES.popitem(last=False)
+    else:
+        _TITLE_INDEXES.move_to_end(key)
+    return index
+
+def _match_one(value, index, threshold):
+    """(posisi entry atau None, skor, metode) untuk satu judul."""
+    pos = index['exact'].get(value)
+    if pos is not None:
+        return pos, 1.0, MATCH_EXACT
+    norm = normalize_title(value)
+    if not norm:
+        return None, 0.0, MATCH_NONE
+    pos = index['normalized'].get(norm)
+    if pos is not None:
+        return pos, 1.0, MATCH_NORMALIZED
+
+    grams = _ngrams(norm)
+    hits = [index['postings'][g] for g in grams if g in index['postings']]
+    if not hits:
+        return None, 0.0, MATCH_NONE
+    # koefisien Dice n-gram sebagai saringan murah, hanya untuk entry yang berbagi n-gram
+    # (bukan seluruh Map_Item); hanya kandidat teratas yang dinilai ulang dengan difflib
+    positions, shared = np.unique(np.concatenate(hits), return_counts=True)
+    dice = 2 * shared / (len(grams) + index['sizes'][positions])
+    if len(positions) > TITLE_MAX_CANDIDATES:
+        # semua entry yang seri dengan kandidat ke-N ikut, lalu dipilih yang posisinya paling awal
+        kth = np.partition(dice, len(dice) - TITLE_MAX_CANDIDATES)[len(dice) - TITLE_MAX_CANDIDATES]
+        top = np.flatnonzero(dice >= kth)
+        positions, dice = positions[top], dice[top]
+    candidates = positions[np.lexsort((positions, -dice))[:TITLE_MAX_CANDIDATES]]
+
+    scored = sorted(
+        ((difflib.SequenceMatcher(None, norm, index['entries'][c][2]).ratio(), c) for c in candidates),
+        reverse=True
+    )
+    if not scored or scored[0][0] < threshold:
+        return None, scored[0][0] if scored else 0.0, MATCH_NONE
+    best_score, best = scored[0]
+    # skor sama ke ID berbeda: ambigu, lebih aman tidak dipetakan
+    if len(scored) > 1 and scored[1][0] == best_score and index['entries'][scored[1][1]][1] != index['entries'][best][1]:
+        return None, best_score, MATCH_NONE
+    return int(best), best_score, MATCH_FUZZY
+
+def match_titles(values, index, threshold=TITLE_MATCH_THRESHOLD):
+    """
+    Memetakan setiap judul ke judul Map_Item: persis, lalu normalisasi, lalu fuzzy
+    (kandidat dari index n-gram, skor difflib >= threshold). Setiap judul unik hanya
+    dinilai sekali dan hasilnya disimpan di memo index.
+    Mengembalikan DataFrame sejajar values: ID, Judul Map, Skor, Metode.
+    """
+    values = pd.Series(values)
+    codes, uniques = pd.factorize(values.fillna('').astype(str), sort=False)
+    memo = index['memo']
+    if len(memo) > TITLE_MEMO_SIZE:
+        memo.clear()
+
+    results = []
+    for value in uniques:
+        key = (value, threshold)
+        result = memo.get(key)
+        if result is None:
+            result = memo[key] = _match_one(value, index, threshold)
+        results.append(result)
+
+    entries = index['entries']
+    ids = np.array([entries[p][1] if p is not None else None for p, _, _ in results], dtype=object)
+    titles = np.array([entries[p][0] if p is not None else None for p, _, _ in results], dtype=object)
+    scores = np.array([s for _, s, _ in results], dtype=np.float64)
+    methods = np.array([m for _, _, m in results], dtype=object)
+    return pd.DataFrame(
+        {'ID': ids[codes], 'Judul Map': titles[codes], 'Skor': scores[codes], 'Metode': methods[codes]},
+        index=values.index
+    )
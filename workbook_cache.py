@@ -0,0 +1,263 @@
+import datetime
+import io
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from result_cache import fingerprint
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+DEFAULT_WORKBOOK_CACHE_DIR = os.environ.get("SLA_WORKBOOK_CACHE_DIR") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "workbook_cache"
+)
+# 0 = cache workbook tidak dipakai
+DEFAULT_WORKBOOK_CACHE_MAX_MB = int(os.environ.get("SLA_WORKBOOK_CACHE_MAX_MB", "2048"))
+
+# naikkan bila format file cache berubah agar file lama tidak dibaca
+WORKBOOK_CACHE_VERSION = 3
+_META_KEY = b"workbook_cache_meta"
+_SUFFIX = ".arrow"
+
+_STATS = {'hits': 0, 'misses': 0, 'evictions': 0}
+_EVICT_LOCK = threading.Lock()
+
+def _source_bytes(source):
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    if hasattr(source, "read"):
+        data = source.read()
+        source.seek(0)
+        return data
+    with open(source, "rb") as f:
+        return f.read()
+
+def _cache_path(cache_dir, key):
+    return os.path.join(cache_dir, f"{key}{_SUFFIX}")
+
+# kode jenis nilai pada kolom campuran; urutan tidak boleh berubah tanpa menaikkan WORKBOOK_CACHE_VERSION
+_MIXED_FIELDS = ['text', 'int', 'float', 'datetime', 'time', 'duration']
+_TAG_NONE, _TAG_NAN, _TAG_NAT, _TAG_TEXT, _TAG_INT, _TAG_FLOAT, _TAG_BOOL, _TAG_DATETIME, _TAG_TIMESTAMP, \
+    _TAG_DATE, _TAG_TIME, _TAG_TIMEDELTA, _TAG_PD_TIMEDELTA = range(13)
+
+class _Unsupported(Exception):
+    """Kolom berisi nilai yang tidak bisa disimpan tanpa pickle; workbook tidak di-cache."""
+
+def _is_nan(value):
+    return isinstance(value, float) and value != value
+
+def _encode_value(value):
+    """(tag, field, nilai) untuk satu sel kolom campuran."""
+    if value is None:
+        return _TAG_NONE, None, None
+    if value is pd.NaT:
+        return _TAG_NAT, None, None
+    if isinstance(value, (bool, np.bool_)):
+        return _TAG_BOOL, 'int', int(value)
+    if isinstance(value, (int, np.integer)):
+        if not -2**63 <= value < 2**63:
+            raise _Unsupported(value)
+        return _TAG_INT, 'int', int(value)
+    if isinstance(value, (float, np.floating)):
+        return (_TAG_NAN, None, None) if value != value else (_TAG_FLOAT, 'float', float(value))
+    if isinstance(value, str):
+        return _TAG_TEXT, 'text', value
+    if isinstance(value, pd.Timestamp):
+        if value.tz is not None or value.nanosecond:
+            raise _Unsupported(value)
+        return _TAG_TIMESTAMP, 'datetime', value.to_pydatetime()
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            raise _Unsupported(value)
+        return _TAG_DATETIME, 'datetime', value
+    if isinstance(value, datetime.date):
+        return _TAG_DATE, 'datetime', datetime.datetime.combine(value, datetime.time())
+    if isinstance(value, datetime.time):
+        if value.tzinfo is not None:
+            raise _Unsupported(value)
+        return _TAG_TIME, 'time', value
+    if isinstance(value, pd.Timedelta):
+        if value.nanoseconds:
+            raise _Unsupported(value)
+        return _TAG_PD_TIMEDELTA, 'duration', value.to_pytimedelta()
+    if isinstance(value, datetime.timedelta):
+        return _TAG_TIMEDELTA, 'duration', value
+    raise _Unsupported(value)
+
+def _encode_mixed(values):
+    """Kolom object campuran -> kolom struct Arrow: tag jenis nilai + satu field bertipe per jenis."""
+    fields = {name: [None] * len(values) for name in _MIXED_FIELDS}
+    tags = np.empty(len(values), dtype=np.int8)
+    for i, value in enumerate(values):
+        tags[i], field, encoded = _encode_value(value)
+        if field is not None:
+            fields[field][i] = encoded
+    types = {'text': pa.string(), 'int': pa.int64(), 'float': pa.float64(), 'datetime': pa.timestamp('us'),
+             'time': pa.time64('us'), 'duration': pa.duration('us')}
+    arrays = [pa.array(tags)] + [pa.array(fields[name], type=types[name]) for name in _MIXED_FIELDS]
+    return pa.StructArray.from_arrays(arrays, names=['tag'] + _MIXED_FIELDS)
+
+def _decode_mixed(column):
+    column = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    tags = column.field('tag').to_numpy()
+    out = np.empty(len(tags), dtype=object)
+    out[tags == _TAG_NONE] = None
+    out[tags == _TAG_NAN] = np.nan
+    out[tags == _TAG_NAT] = pd.NaT
+    decoders = {
+        _TAG_TEXT: ('text', None),
+        _TAG_INT: ('int', None),
+        _TAG_FLOAT: ('float', None),
+        _TAG_BOOL: ('int', bool),
+        _TAG_DATETIME: ('datetime', None),
+        _TAG_TIMESTAMP: ('datetime', pd.Timestamp),
+        _TAG_DATE: ('datetime', lambda v: v.date()),
+        _TAG_TIME: ('time', None),
+        _TAG_TIMEDELTA: ('duration', None),
+        _TAG_PD_TIMEDELTA: ('duration', pd.Timedelta),
+    }
+    for tag, (field, convert) in decoders.items():
+        rows = np.flatnonzero(tags == tag)
+        if len(rows):
+            values = column.field(field).take(pa.array(rows)).to_pylist()
+            out[rows] = values if convert is None else [convert(v) for v in values]
+    return out
+
+def _is_text_column(values):
+    """Kolom object yang hanya berisi teks dan sel kosong (NaN) bisa disimpan sebagai kolom string Arrow."""
+    return all(isinstance(v, str) or _is_nan(v) for v in values)
+
+def _to_table(df):
+    """
+    Frame hasil read_excel -> tabel Arrow. Kolom bertipe (teks, angka, tanggal) disimpan sebagai
+    kolom Arrow biasa; kolom object yang hanya berisi teks menjadi kolom string Arrow.
+    Kolom object berisi nilai campuran (mis. tanggal teks bercampur datetime/serial Excel, durasi time
+    bercampur angka) akan dipaksa Arrow ke satu tipe, jadi disimpan sebagai struct bertipe (jenis nilai
+    + nilai per jenis) agar parse_dates dan mapping tetap melihat nilai asli. Tidak ada pickle.
+    """
+    encodings = {}
+    for col in df.columns:
+        if df[col].dtype == object:
+            encodings[col] = 'text' if _is_text_column(df[col].to_numpy()) else 'mixed'
+    table = pa.Table.from_pandas(df.drop(columns=list(encodings)), preserve_index=True)
+    for col, encoding in encodings.items():
+        values = df[col].to_numpy()
+        array = pa.array(values, type=pa.string(), from_pandas=True) if encoding == 'text' else _encode_mixed(values)
+        table = table.append_column(col, array)
+    meta = {'version': WORKBOOK_CACHE_VERSION, 'columns': list(df.columns), 'encodings': encodings}
+    return table.replace_schema_metadata({**table.schema.metadata, _META_KEY: json.dumps(meta).encode()})
+
+def _from_table(table):
+    meta = json.loads(table.schema.metadata[_META_KEY])
+    if meta.get('version') != WORKBOOK_CACHE_VERSION:
+        return None
+    encodings = meta['encodings']
+    df = table.drop_columns(list(encodings)).to_pandas(split_blocks=True)
+    for col, encoding in encodings.items():
+        if encoding == 'text':
+            values = table.column(col).to_numpy(zero_copy_only=False)
+            values[pd.isna(values)] = np.nan  # sel kosong read_excel = NaN
+        else:
+            values = _decode_mixed(table.column(col))
+        df[col] = pd.Series(values, index=df.index, dtype=object)
+    return df[meta['columns']]
+
+def _cache_get(path):
+    try:
+        # mmap: kolom teks (Arrow) langsung memakai halaman file, tanpa parse ulang workbook
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        df = _from_table(table)
+        if df is not None:
+            os.utime(path, None)  # penanda LRU untuk eviction
+        return df
+    except (OSError, pa.ArrowException, KeyError, ValueError):
+        return None
+
+def _cache_put(cache_dir, path, df, max_mb):
+    try:
+        table = _to_table(df)
+    except (_Unsupported, pa.ArrowException):
+        return
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with pa.OSFile(tmp, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+        evict_workbook_cache(cache_dir, max_mb)
+    except (OSError, pa.ArrowException):
+        pass
+
+def evict_workbook_cache(cache_dir=None, max_mb=None):
+    """Menghapus file cache yang paling lama tidak dipakai (mtime) sampai total ukuran di bawah batas."""
+    cache_dir = cache_dir or DEFAULT_WORKBOOK_CACHE_DIR
+    max_bytes = (DEFAULT_WORKBOOK_CACHE_MAX_MB if max_mb is None else max_mb) * 2**20
+    if not os.path.isdir(cache_dir):
+        return
+    with _EVICT_LOCK:
+        files = []
+        for entry in os.scandir(cache_dir):
+            if entry.name.endswith(_SUFFIX):
+                try:
+                    info = entry.stat()
+                except OSError:
+                    continue
+                files.append((info.st_mtime, info.st_size, entry.path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)  # frame yang sedang memakai mmap file ini tetap valid
+                total -= size
+                _STATS['evictions'] += 1
+            except OSError:
+                pass
+
+def read_workbook(source, cache_dir=None, max_mb=None, **kwargs):
+    """
+    pd.read_excel() dengan cache hasil parse di disk, dinamai hash isi file + argumen baca.
+    Upload ulang file yang sama (juga setelah server restart) membaca file Arrow yang di-mmap,
+    bukan mem-parse workbook lagi dengan openpyxl. Ukuran cache dibatasi max_mb (LRU).
+    sheet_name=None atau list menghasilkan dict per sheet; setiap sheet di-cache terpisah.
+    """
+    max_mb = DEFAULT_WORKBOOK_CACHE_MAX_MB if max_mb is None else max_mb
+    data = _source_bytes(source)
+    sheet_name = kwargs.get('sheet_name', 0)
+    if sheet_name is None or isinstance(sheet_name, (list, tuple)):
+        # beberapa sheet: dict {sheet: frame} seperti pd.read_excel, setiap sheet di-cache sendiri
+        sheets = pd.ExcelFile(io.BytesIO(data)).sheet_names if sheet_name is None else sheet_name
+        return {
+            sheet: read_workbook(io.BytesIO(data), cache_dir, max_mb, **{**kwargs, 'sheet_name': sheet})
+            for sheet in sheets
+        }
+    if pa is None or max_mb <= 0:
+        return pd.read_excel(io.BytesIO(data), **kwargs)
+
+    cache_dir = cache_dir or DEFAULT_WORKBOOK_CACHE_DIR
+    path = _cache_path(cache_dir, fingerprint(data, sorted(kwargs.items())))
+    df = _cache_get(path) if os.path.exists(path) else None
+    if df is not None:
+        _STATS['hits'] += 1
+        return df
+
+    _STATS['misses'] += 1
+    df = pd.read_excel(io.BytesIO(data), **kwargs)
+    df.columns = [str(c) for c in df.columns]
+    _cache_put(cache_dir, path, df, max_mb)
+    return df
+
+def workbook_cache_stats(cache_dir=None):
+    """Statistik cache workbook proses ini beserta jumlah dan ukuran file di disk."""
+    cache_dir = cache_dir or DEFAULT_WORKBOOK_CACHE_DIR
+    sizes = []
+    if os.path.isdir(cache_dir):
+        sizes = [e.stat().st_size for e in os.scandir(cache_dir) if e.name.endswith(_SUFFIX)]
+    return {**_STATS, 'files': len(sizes), 'used_mb': sum(sizes) / 2**20, 'max_mb': DEFAULT_WORKBOOK_CACHE_MAX_MB}